@@ -1,11 +1,43 @@
 # python main.py
 
-from fastapi import FastAPI
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+import numpy as np
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from services.real_influx_streamer_4 import ScheduledInfluxInference
-import threading
+from services.inference_executor import parse_cpu_list
+from services.sensor_window import FEATURE_NAMES, datetime_to_epoch_ns
+from services.push_ingest import parse_line_protocol, parse_json_readings, PushFormatError
+from services.snapshot_cache import SnapshotCache, etag_matches
+from services.fast_json import FastJSONResponse
+from services.response_formats import JSON, MEDIA_TYPES, Columns, UnsupportedFormatError, negotiate, encode
 
-app = FastAPI()
+# LOG_LEVEL=DEBUG prints the full per-step pipeline trace; INFO keeps the inference path quiet
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Run the scheduled inference process as asyncio tasks for the lifetime of the app.
+    Data collection every 10 seconds, inference every 3 minutes; the model loads in the
+    background and /health/ready reports when it is done. Tasks are cancelled on shutdown.
+    """
+    await streamer.start_async()
+    print("Background inference scheduler started (runs every 3 minutes).")
+    try:
+        yield
+    finally:
+        await streamer.stop_async()
+
+# Responses are encoded NumPy-aware with orjson when installed (services/fast_json.py)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -20,12 +52,114 @@ app.add_middleware(
 # - Data collection every 10 seconds into rolling buffer
 # - Inference every 3 minutes (180 seconds) using last 240 points
 # - Predicts next 60 data points
+# - Zero-phase Butterworth smoothing (set "causal" to smooth each new point once as it arrives)
+# - Ingestion from INGESTION_MODE: delta (default, only rows newer than the last buffered point), full,
+#   or push (no polling, readings arrive on POST /ingest; INGEST_WRITE_THROUGH=true also writes them to InfluxDB)
+# - Model variant under AI-Model-Artifacts/ from MODEL_VARIANT (default CustomLoss), hot-swappable via /models
+# - Model forward backend from INFERENCE_ENGINE: eager (default), torchscript, compile or onnx
+# - Numeric precision from INFERENCE_PRECISION: fp32 (default), int8 or bf16 (CPU, eager engine)
+# - Inference worker CPU budget from INFERENCE_THREADS / INFERENCE_INTEROP_THREADS / INFERENCE_CPUS ("2,3")
+#   / INFERENCE_NICE; unset keeps torch defaults
+# - Buffered points are resampled onto a SAMPLE_INTERVAL_SECONDS grid (default 10) before inference; gaps up to
+#   MAX_GAP_SECONDS are interpolated and a machine is skipped when under MIN_WINDOW_COVERAGE of its window is real
+# - InfluxDB request timeout from INFLUX_QUERY_TIMEOUT_SECONDS (default 10); after INFLUX_BREAKER_FAILURES failed
+#   queries (default 3) the circuit breaker skips queries with backoff up to INFLUX_BREAKER_MAX_BACKOFF_SECONDS
+# - Inference runs at a fixed rate on the monotonic clock; INFERENCE_TRIGGER_POINTS (unset = timer only) also runs
+#   it as soon as a machine has that many new points
+# - Identical in-flight Influx window queries share one round-trip; QUERY_SHARE_TTL_SECONDS (default 2) lets other
+#   consumers (prefill, collection, inference backfill) reuse a result briefly
 streamer = ScheduledInfluxInference(
     inference_interval_seconds=180,  # 3 minutes
-    data_collection_interval_seconds=10  # Collect data every 10 seconds
+    data_collection_interval_seconds=10,  # Collect data every 10 seconds
+    smoothing_mode="zero_phase",
+    ingestion_mode=os.getenv("INGESTION_MODE", "delta"),
+    write_through=os.getenv("INGEST_WRITE_THROUGH", "false").lower() == "true",
+    sample_interval_seconds=float(os.getenv("SAMPLE_INTERVAL_SECONDS") or 10),
+    max_gap_seconds=float(os.getenv("MAX_GAP_SECONDS") or 60),
+    min_coverage=float(os.getenv("MIN_WINDOW_COVERAGE") or 0.9),
+    query_timeout_seconds=float(os.getenv("INFLUX_QUERY_TIMEOUT_SECONDS") or 10),
+    breaker_failure_threshold=int(os.getenv("INFLUX_BREAKER_FAILURES") or 3),
+    breaker_max_backoff_seconds=float(os.getenv("INFLUX_BREAKER_MAX_BACKOFF_SECONDS") or 300),
+    inference_trigger_points=int(os.getenv("INFERENCE_TRIGGER_POINTS") or 0) or None,
+    query_share_ttl_seconds=float(os.getenv("QUERY_SHARE_TTL_SECONDS") or 2),
+    machine_ids=[machine_id.strip() for machine_id in os.getenv("MACHINE_IDS", "").split(",") if machine_id.strip()] or None,
+    model_variant=os.getenv("MODEL_VARIANT") or None,
+    engine=os.getenv("INFERENCE_ENGINE", "eager"),
+    precision=os.getenv("INFERENCE_PRECISION", "fp32"),
+    inference_threads=int(os.getenv("INFERENCE_THREADS") or 0) or None,
+    interop_threads=int(os.getenv("INFERENCE_INTEROP_THREADS") or 0) or None,
+    inference_cpus=parse_cpu_list(os.getenv("INFERENCE_CPUS")),
+    inference_nice=int(os.getenv("INFERENCE_NICE") or 0) or None
 )
 
 
+# Read endpoints are rendered to JSON bytes once per data version and revalidated with ETag / If-None-Match
+snapshots = SnapshotCache()
+
+
+def cached_json(request, name, version, render, fmt=JSON):
+    """
+    Serve an endpoint from the snapshot cache: 304 if the client's If-None-Match matches, else the cached bytes.
+    fmt: response format from negotiate(); render(fmt) builds the document for the non-JSON formats.
+    """
+    if fmt == JSON:
+        snapshot = snapshots.get(name, version, render)
+    else:
+        snapshot = snapshots.get(f"{name}.{fmt}", version, lambda: render(fmt), lambda content: encode(content, fmt))
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        snapshots.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def parse_since(value):
+    """
+    ?since= cursor: a sequence number ('seq' of a previous response) or an ISO-8601 timestamp.
+    
+    Raises:
+        ValueError: Neither
+    """
+    if value.isdigit():
+        return int(value)
+    datetime_to_epoch_ns(value)
+    return value
+
+
+def window_document(window, seq, fmt, resync=None):
+    """
+    Response body of a window of points (lookback, buffer): rows of dicts, or columns for the other formats.
+    seq is the cursor for the next ?since= request; resync (incremental requests only) tells the
+    client to replace the points it holds instead of appending.
+    """
+    document = {"status": "success", "points_collected": len(window), "seq": seq}
+    if resync is not None:
+        document["resync"] = resync
+    if fmt != JSON:
+        document["machine_id"] = window.machine_id
+        document["data"] = Columns.from_matrix(window.values, FEATURE_NAMES, window.timestamps)
+    else:
+        document["data"] = window.to_points()
+    return document
+
+
+def incremental_response(lookup, since, fmt):
+    """Uncached response to a ?since= request: lookup(cursor) -> (window, seq, resync)."""
+    try:
+        cursor = parse_since(since)
+    except ValueError:
+        return FastJSONResponse(status_code=400, content={
+            "status": "error", "message": f"Invalid since '{since}': expected a seq number or an ISO-8601 timestamp"})
+    window, seq, resync = lookup(cursor)
+    return Response(content=encode(window_document(window, seq, fmt, resync), fmt), media_type=MEDIA_TYPES[fmt],
+                    headers={"Cache-Control": "no-cache", "Vary": "Accept"})
+
+
+@app.exception_handler(UnsupportedFormatError)
+async def unsupported_format(request, error):
+    return FastJSONResponse(status_code=406, content={"status": "error", "message": str(error)})
+
+
 @app.get("/sensor/means-history-db")
 def get_means_history_from_db():
     """
@@ -40,24 +174,22 @@ def get_means_history_from_db():
     #     "data": data
     # }
 
-@app.on_event("startup")
-def start_background_inference():
-    """
-    Start the scheduled inference process in the background.
-    Runs inference every 3 minutes automatically.
-    """
-    thread = threading.Thread(target=streamer.start_stream, daemon=True)
-    thread.start()
-    print("Background inference scheduler started (runs every 3 minutes).")
-
 @app.get("/inference/last-prediction")
-def get_last_prediction():
+def get_last_prediction(request: Request, format: str = Query(None)):
     """
     Get the most recent prediction results including:
     - Raw forecast (direct model output in scaled space)
     - Scaled forecast (fitted to scaled input range)
     - Alerts and anomaly detection results
+    Rendered once per inference result (and model version); supports If-None-Match.
+    format: json (default), columnar, msgpack or arrow (forecast steps as columns, see services/response_formats.py)
     """
+    fmt = negotiate(format, request.headers.get("accept"))
+    model_version = streamer.inference_service.model_version if streamer.model_ready.is_set() else None
+    return cached_json(request, "last-prediction", (streamer.inference_version, model_version), render_last_prediction, fmt)
+
+
+def render_last_prediction(fmt=JSON):
     prediction_data = streamer.get_last_prediction()
     
     if prediction_data is None:
@@ -69,19 +201,6 @@ def get_last_prediction():
             "alerts": None
         }
     
-    # Generate future timestamps for forecast (matching data collection interval)
-    import datetime
-    last_lookback = streamer.get_last_lookback()
-    data_interval = streamer.data_collection_interval  # 10 seconds
-    if last_lookback and len(last_lookback) > 0:
-        last_timestamp = datetime.datetime.fromisoformat(last_lookback[-1]['timestamp'].replace('Z', '+00:00'))
-        future_timestamps = [
-            (last_timestamp + datetime.timedelta(seconds=data_interval * (i + 1))).isoformat()
-            for i in range(60)  # 60 prediction steps
-        ]
-    else:
-        future_timestamps = None
-    
     # Format scaled forecast (predictions in scaled space fitted to input range)
     scaled_forecast_array = prediction_data["scaled_forecast"]
     
@@ -92,20 +211,37 @@ def get_last_prediction():
         print(f"⚠️ [API] Scaler not available, using predictions without inverse transform")
         forecast_raw = scaled_forecast_array
     
-    scaled_forecast_formatted = {
-        "predictions": [
+    data_interval = streamer.sample_interval  # 10 seconds
+    if fmt != JSON:
+        # Columnar formats: one array per feature, timestamps continue the lookback on the sample grid
+        lookback = streamer.get_last_lookback_window()
+        steps = np.arange(1, forecast_raw.shape[0] + 1)
+        future_ns = lookback.timestamps[-1] + steps * int(data_interval * 1_000_000_000) if len(lookback) else None
+        predictions = Columns.from_matrix(forecast_raw, FEATURE_NAMES, future_ns, step=steps)
+    else:
+        # Generate future timestamps for forecast: the lookback is on the resampling grid,
+        # so the forecast steps continue it at the sample interval
+        import datetime
+        last_lookback = streamer.get_last_lookback()
+        if last_lookback and len(last_lookback) > 0:
+            last_timestamp = datetime.datetime.fromisoformat(last_lookback[-1]['timestamp'].replace('Z', '+00:00'))
+            future_timestamps = [
+                (last_timestamp + datetime.timedelta(seconds=data_interval * (i + 1))).isoformat()
+                for i in range(60)  # 60 prediction steps
+            ]
+        else:
+            future_timestamps = None
+        predictions = [
             {
                 "step": i + 1,
                 "timestamp": future_timestamps[i] if future_timestamps else None,
-                "current": float(forecast_raw[i, 0]),
-                "tempA": float(forecast_raw[i, 1]),
-                "tempB": float(forecast_raw[i, 2]),
-                "accX": float(forecast_raw[i, 3]),
-                "accY": float(forecast_raw[i, 4]),
-                "accZ": float(forecast_raw[i, 5])
+                **dict(zip(FEATURE_NAMES, row))
             }
-            for i in range(forecast_raw.shape[0])
-        ],
+            for i, row in enumerate(forecast_raw.tolist())
+        ]
+    
+    scaled_forecast_formatted = {
+        "predictions": predictions,
         "forecast_horizon": forecast_raw.shape[0],
         "num_features": forecast_raw.shape[1]
     }
@@ -117,8 +253,8 @@ def get_last_prediction():
         "timestamp": prediction_data["timestamp"],
         "alerts": prediction_data["alerts"],
         "scaled_forecast": scaled_forecast_formatted,
-        "scaled_forecast_array": scaled_forecast_array.tolist(),
-        "raw_forecast_array": prediction_data["raw_forecast"].tolist()
+        "scaled_forecast_array": scaled_forecast_array,  # arrays are encoded natively by FastJSONResponse
+        "raw_forecast_array": prediction_data["raw_forecast"]
     }
     #     "raw_forecast": raw_forecast_formatted,
     #     "scaled_forecast": scaled_forecast_formatted,
@@ -130,11 +266,94 @@ def get_inference_status():
     Get the status of the inference scheduler including timing information.
     """
     status_data = streamer.get_inference_status()
+    status_data["snapshot_cache"] = snapshots.stats()
     return {
         "status": "success",
         "data": status_data
     }
 
+@app.post("/ingest")
+async def ingest_readings(request: Request, precision: str = "ns"):
+    """
+    Push sensor readings straight into the in-memory buffers, without waiting for the next InfluxDB poll.
+    Body: InfluxDB line protocol (text/plain) or JSON ({"<machine_id>": [readings]} or [readings with machine_id]).
+    precision: unit of numeric timestamps (ns, us, ms or s).
+    """
+    body = await request.body()
+    try:
+        if "json" in request.headers.get("content-type", ""):
+            windows = parse_json_readings(json.loads(body), precision)
+        else:
+            windows = parse_line_protocol(body.decode("utf-8"), precision)
+    except (PushFormatError, ValueError) as e:
+        return FastJSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+    
+    result = streamer.ingest_windows(windows)
+    write_through = streamer.schedule_write_through(result.pop("windows"))
+    return {"status": "success", **result, "write_through": write_through}
+
+@app.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-sent events, pushed as they happen (services/event_broadcaster.py):
+    - points: newly buffered points of a machine ({"machine_id", "points": [...]})
+    - prediction: each stored inference result (status, message, scaled_forecast_array)
+    - alert: a machine's status changed ({"machine_id", "previous_status", "status", ...})
+    - resync: events were missed after a reconnect; reload through the REST endpoints
+    New connections first get the latest prediction and alert per machine.
+    """
+    return StreamingResponse(
+        streamer.events.stream(request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/machines")
+def get_machines(request: Request):
+    """
+    Per-machine buffer, ingestion cursor and last inference status for all ingested machines.
+    Rendered once per ingest/inference version; supports If-None-Match.
+    """
+    return cached_json(request, "machines", (streamer.ingest_version, streamer.inference_version),
+                       lambda: {"status": "success", "data": streamer.get_machines_status()})
+
+@app.get("/models")
+def get_models():
+    """
+    List the model variants under AI-Model-Artifacts/ and the active model version.
+    """
+    return {
+        "status": "success",
+        "data": streamer.model_registry.status()
+    }
+
+@app.post("/models/{variant}/activate")
+def activate_model(variant: str):
+    """
+    Hot-swap the active model. The variant loads in the background while inference keeps
+    running on the current model; poll /models for the new active_version.
+    """
+    known = {entry["name"] for entry in streamer.model_registry.discover()}
+    if variant not in known:
+        return FastJSONResponse(status_code=404, content={"status": "error", "message": f"Unknown model variant '{variant}'"})
+    if not streamer.switch_model(variant):
+        return FastJSONResponse(status_code=409, content={
+            "status": "error",
+            "message": "Initial model not ready yet or another model load is in progress"
+        })
+    return FastJSONResponse(status_code=202, content={"status": "loading", "variant": variant})
+
+@app.get("/health/ready")
+def get_readiness():
+    """
+    Readiness probe: 200 once the model and scaler are loaded and warmed up, 503 while loading or after a failed load.
+    """
+    readiness = streamer.get_readiness()
+    return FastJSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content={"status": "ready" if readiness["ready"] else "not_ready", "data": readiness}
+    )
+
 @app.get("/sensor/latest")
 def get_latest_sensor_point():
     """
@@ -200,27 +419,41 @@ def get_means_history():
     # }
 
 @app.get("/sensor/last-lookback")
-def get_last_lookback():
+def get_last_lookback(request: Request, format: str = Query(None), since: str = Query(None)):
     """
     Retrieve the last 240 data points used for inference (lookback window).
+    Rendered once per inference result; supports If-None-Match.
+    format: json (default), columnar, msgpack or arrow (points as columns, see services/response_formats.py)
+    since: only the points after a previous response's seq (or after an ISO timestamp); "resync": true
+    means the client must replace its points with the returned full window
     """
-    data = streamer.get_last_lookback()
-    return {
-        "status": "success",
-        "points_collected": len(data),
-        "data": data
-    }
+    fmt = negotiate(format, request.headers.get("accept"))
+    if since is not None:
+        return incremental_response(streamer.get_last_lookback_since, since, fmt)
+    return cached_json(request, "last-lookback", streamer.inference_version, render_last_lookback, fmt)
+
+
+def render_last_lookback(fmt=JSON):
+    window, seq, _ = streamer.get_last_lookback_since()
+    return window_document(window, seq, fmt)
 
 @app.get("/inference/previous-forecast")
-def get_previous_forecast():
+def get_previous_forecast(request: Request, format: str = Query(None)):
     """
     Retrieve the forecast from the previous inference run.
     This can be overlaid with the last 60 lookback points to show prediction accuracy.
+    Rendered once per inference result; supports If-None-Match.
+    format: json (default), columnar, msgpack or arrow (see services/response_formats.py)
     
     Returns:
         - previous_forecast: 60 points x 6 features array from previous inference
         - null if no previous forecast exists yet
     """
+    fmt = negotiate(format, request.headers.get("accept"))
+    return cached_json(request, "previous-forecast", streamer.inference_version, render_previous_forecast, fmt)
+
+
+def render_previous_forecast(fmt=JSON):
     previous_forecast = streamer.get_previous_forecast()
     
     if previous_forecast is None:
@@ -231,21 +464,20 @@ def get_previous_forecast():
             "previous_forecast": None
         }
     
-    # Convert numpy array to list of dicts for JSON serialization
-    forecast_list = []
-    feature_names = ["current", "tempA", "tempB", "accX", "accY", "accZ"]
-    
-    for i in range(len(previous_forecast)):
-        point = {
-            "index": i,
-            "current": float(previous_forecast[i][0]),
-            "tempA": float(previous_forecast[i][1]),
-            "tempB": float(previous_forecast[i][2]),
-            "accX": float(previous_forecast[i][3]),
-            "accY": float(previous_forecast[i][4]),
-            "accZ": float(previous_forecast[i][5])
+    if fmt != JSON:
+        return {
+            "status": "success",
+            "has_previous_forecast": True,
+            "points_predicted": len(previous_forecast),
+            "previous_forecast": Columns.from_matrix(previous_forecast, FEATURE_NAMES,
+                                                     index=np.arange(len(previous_forecast)))
         }
-        forecast_list.append(point)
+    
+    # Convert numpy array to list of dicts for JSON serialization (one tolist() for all rows)
+    forecast_list = [
+        {"index": i, **dict(zip(FEATURE_NAMES, row))}
+        for i, row in enumerate(previous_forecast.tolist())
+    ]
     
     return {
         "status": "success",
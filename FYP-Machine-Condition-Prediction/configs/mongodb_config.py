@@ -2,8 +2,6 @@
 
 # python configs/mongodb_config.py
 
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
 from dotenv import load_dotenv
 import os
 
@@ -16,8 +14,8 @@ influx_token = os.getenv("INFLUX_TOKEN")
 influx_bucket = os.getenv("INFLUX_BUCKET")
 workspace_id = os.getenv("WORKSPACE_ID", "default_workspace")
 
-# Create a new client and connect to the server
-client = MongoClient(mongo_uri, server_api=ServerApi('1'))
+# The client is created on first use so importing this module never opens a connection
+client = None
 
 
 def get_influx_client():
@@ -27,6 +25,7 @@ def get_influx_client():
 # Function to get the database and collection
 def get_database():
     try:
+        client = get_client()
         client.admin.command('ping')
         print("Pinged your deployment. You successfully connected to MongoDB!")
         # db = client["fyp_hourly_1"]
@@ -38,6 +37,11 @@ def get_database():
 
 # Export the client for direct use if needed
 def get_client():
+    global client
+    if client is None:
+        from pymongo.mongo_client import MongoClient
+        from pymongo.server_api import ServerApi
+        client = MongoClient(mongo_uri, server_api=ServerApi('1'))
     return client
 
 if __name__ == "__main__":
@@ -46,5 +50,5 @@ if __name__ == "__main__":
         print("Database connection successful.")
     else:
         print("Database connection failed.")
-    client.close()
+    get_client().close()
 
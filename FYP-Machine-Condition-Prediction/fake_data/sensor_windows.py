@@ -0,0 +1,35 @@
+# fake_data/sensor_windows.py
+
+# This file generates fake InfluxDB-style sensor windows (10-second cadence) for offline testing
+# of the inference pipeline without a running InfluxDB.
+
+import random
+from datetime import datetime, timedelta, timezone
+
+
+def generate_fake_sensor_point(timestamp, machine_id="fake_machine", rng=random):
+    """
+    Generate one fake sensor point in the same format as the InfluxDB streamer buffer.
+    """
+    return {
+        "timestamp": timestamp.isoformat(),
+        "current": round(rng.uniform(2.0, 3.2), 4),
+        "tempA": round(rng.uniform(30.0, 40.0), 4),
+        "tempB": round(rng.uniform(30.0, 40.0), 4),
+        "accX": round(rng.uniform(-1.5, 0.5), 4),
+        "accY": round(rng.uniform(-1.5, 0.5), 4),
+        "accZ": round(rng.uniform(9.0, 11.0), 4),
+        "machine_id": machine_id,
+    }
+
+
+def generate_fake_sensor_window(n_points=240, machine_id="fake_machine", seed=None, interval_seconds=10, end_time=None):
+    """
+    Generate n_points spaced interval_seconds apart, oldest first.
+    """
+    rng = random.Random(seed)
+    end_time = end_time or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        generate_fake_sensor_point(end_time - timedelta(seconds=interval_seconds * (n_points - 1 - i)), machine_id, rng)
+        for i in range(n_points)
+    ]
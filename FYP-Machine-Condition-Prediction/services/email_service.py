@@ -3,9 +3,6 @@ from datetime import datetime
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content
 from dotenv import load_dotenv
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
-from bson import ObjectId
 
 load_dotenv()
 
@@ -39,6 +36,11 @@ class EmailNotificationService:
             list: List of email addresses
         """
         try:
+            # pymongo/bson are imported on first use to keep service startup fast
+            from pymongo.mongo_client import MongoClient
+            from pymongo.server_api import ServerApi
+            from bson import ObjectId
+            
             # Connect to MongoDB
             client = MongoClient(self.mongo_uri, server_api=ServerApi('1'))
             db = client["maintenancescheduler_db"]
@@ -0,0 +1,198 @@
+# services/event_broadcaster.py
+"""
+Server-sent events fan-out for the dashboard.
+
+The streamer publishes an event whenever something changes (new buffer points, a new prediction,
+an alert status transition). Each event is serialized to one SSE frame exactly once and the same
+bytes are queued to every subscriber, so the cost of a publish does not grow with the payload
+times the number of dashboards. Events are only serialized while someone is listening (or when
+they are retained).
+
+Every frame carries an increasing sequence number as its SSE id. A client that reconnects with
+Last-Event-ID gets the frames it missed from a short history; if they are no longer there it gets
+a 'resync' event and should reload through the REST endpoints. New subscribers first receive the
+retained events (e.g. the latest prediction per machine), so they never start empty.
+
+A subscriber whose queue fills up (a stalled client) is disconnected instead of slowing the
+others down; EventSource reconnects on its own and resumes from Last-Event-ID.
+"""
+
+import asyncio
+import collections
+import logging
+import threading
+from services.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()  # queued to end a subscriber's stream
+
+
+class _Subscriber:
+    __slots__ = ("loop", "queue", "closed")
+
+    def __init__(self, queue_size):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, frame):
+        """Queue a frame (runs on the subscriber's loop); returns False if the subscriber is too far behind."""
+        if self.closed:
+            return True
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.closed = True
+            self.queue.get_nowait()  # make room for the close marker
+            self.queue.put_nowait(_CLOSE)
+            return False
+
+
+class EventBroadcaster:
+    """
+    Serialize-once SSE broadcaster, safe to publish from any thread.
+
+    Args:
+        queue_size (int): Frames buffered per subscriber before it is disconnected
+        history_size (int): Recent frames kept for Last-Event-ID replay
+        heartbeat_seconds (float): Idle time after which a keep-alive comment is sent
+        retry_ms (int): Reconnect delay advertised to EventSource clients
+    """
+
+    def __init__(self, queue_size=256, history_size=512, heartbeat_seconds=15.0, retry_ms=3000):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.retry_ms = retry_ms
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = collections.deque(maxlen=history_size)  # (seq, frame)
+        self._retained = {}  # retain key -> (seq, frame)
+        self._seq = 0
+
+        self.published = {}
+        self.dropped_subscribers = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event, data, retain_key=None):
+        """
+        Send an event to every subscriber.
+
+        Args:
+            event (str): SSE event name
+            data (dict or callable): Payload (NumPy arrays allowed); a callable is only called
+                when the event is actually serialized
+            retain_key (hashable): Keep the event under this key and replay it to new subscribers
+
+        Returns:
+            int: Sequence number of the event (None if nobody was listening)
+        """
+        if retain_key is None:
+            with self._lock:
+                if not self._subscribers:
+                    # Not serialized; the hole in the history makes reconnecting clients resync
+                    self._seq += 1
+                    self._history.clear()
+                    return None
+        payload = dumps(data() if callable(data) else data)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, event.encode(), payload)
+            self._history.append((seq, frame))
+            if retain_key is not None:
+                self._retained[retain_key] = (seq, frame)
+            self.published[event] = self.published.get(event, 0) + 1
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, frame)
+            except RuntimeError:  # the subscriber's event loop is closed
+                with self._lock:
+                    self._subscribers.discard(subscriber)
+        return seq
+
+    def _deliver(self, subscriber, frame):
+        if not subscriber.offer(frame):
+            with self._lock:
+                self._subscribers.discard(subscriber)
+                self.dropped_subscribers += 1
+            logger.warning("[Events] Disconnected a subscriber that fell %d events behind", self.queue_size)
+
+    async def stream(self, last_event_id=None):
+        """
+        SSE byte stream for one client (for a StreamingResponse); ends on close() or when the client lags.
+
+        Args:
+            last_event_id (str): Last-Event-ID header of a reconnecting client
+        """
+        subscriber = _Subscriber(self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            backlog = self._backlog(last_event_id)
+        try:
+            yield b"retry: %d\n\n" % self.retry_ms
+            for frame in backlog:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is _CLOSE:
+                    return
+                yield frame
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def _backlog(self, last_event_id):
+        """Frames a new subscriber gets before live events (called under the lock)."""
+        try:
+            last_seq = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_seq = None
+        if last_seq is not None:
+            if last_seq >= self._seq:
+                return []
+            if self._history and self._history[0][0] <= last_seq + 1:
+                return [frame for seq, frame in self._history if seq > last_seq]
+            # The missed events are gone from the history: resynchronize through the REST endpoints
+            return [b"id: %d\nevent: resync\ndata: {}\n\n" % self._seq] + [frame for _, frame in sorted(self._retained.values())]
+        return [frame for _, frame in sorted(self._retained.values())]
+
+    def close(self):
+        """End every open stream (e.g. on shutdown, so the server is not kept waiting)."""
+        with self._lock:
+            subscribers, self._subscribers = list(self._subscribers), set()
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._end, subscriber)
+            except RuntimeError:
+                pass
+
+    @staticmethod
+    def _end(subscriber):
+        if not subscriber.closed:
+            subscriber.closed = True
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(_CLOSE)
+
+    def stats(self):
+        """
+        Returns:
+            dict: subscribers, events published by name, dropped (lagging) subscribers, last sequence number
+        """
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": dict(self.published),
+                "dropped_subscribers": self.dropped_subscribers,
+                "last_event_id": self._seq,
+            }
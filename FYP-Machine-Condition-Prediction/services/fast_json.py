@@ -0,0 +1,79 @@
+# services/fast_json.py
+"""
+JSON encoding for API responses.
+
+With orjson installed, NumPy arrays and scalars, dataclasses and datetimes are serialized natively
+in C straight from their buffers: no .tolist(), no per-element float() and no jsonable_encoder
+walk. NaN (a missing reading) becomes null. Without orjson the stdlib json module is used, with
+arrays converted through .tolist() and non-finite floats replaced by None first; the output is the
+same JSON apart from float formatting.
+"""
+
+import dataclasses
+import datetime
+import json
+import math
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def dumps(content):
+    """
+    Encode a response body.
+
+    Args:
+        content: dicts/lists of builtins, NumPy arrays/scalars, dataclasses and datetimes
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+    return json.dumps(_finite(content), default=_stdlib_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_default(obj):
+    # Only reached for what orjson does not handle natively with OPT_SERIALIZE_NUMPY
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f" and obj.dtype != np.float64 and obj.dtype != np.float32:
+            return obj.astype(np.float32)  # e.g. float16
+        return np.ascontiguousarray(obj)  # non-contiguous views (slices, transposes)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _finite(obj):
+    # json.dumps would write NaN/Infinity (not JSON); orjson writes null, so the fallback does too
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _stdlib_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _finite(obj.tolist())
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _finite(dataclasses.asdict(obj))
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps() (NumPy-aware)."""
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,140 @@
+# services/filtering.py
+"""
+Butterworth low-pass smoothing for sensor windows.
+
+Filter coefficients are designed once per (cutoff, order) and cached. Two modes are provided:
+- zero_phase: filtfilt over the whole window along axis=0 (matches the training preprocessing)
+- causal: sosfilt with persistent per-machine state, so each new point is filtered exactly once
+"""
+
+import threading
+from functools import lru_cache
+import numpy as np
+from scipy.signal import butter, filtfilt, sosfilt, sosfilt_zi
+
+SMOOTHING_MODES = ("zero_phase", "causal")
+
+
+@lru_cache(maxsize=32)
+def design_lowpass(cutoff, order):
+    """
+    Cached Butterworth low-pass design in (b, a) form.
+
+    Returns:
+        tuple: (b, a) filter coefficients
+    """
+    return butter(order, cutoff, btype='low', analog=False)
+
+
+@lru_cache(maxsize=32)
+def design_lowpass_sos(cutoff, order):
+    """
+    Cached Butterworth low-pass design in second-order-sections form, plus its
+    unit-step steady-state initial conditions.
+
+    Returns:
+        tuple: (sos, zi) with sos of shape (n_sections, 6) and zi of shape (n_sections, 2)
+    """
+    sos = butter(order, cutoff, btype='low', analog=False, output='sos')
+    return sos, sosfilt_zi(sos)
+
+
+def zero_phase_lowpass(data, cutoff, order):
+    """
+    Zero-phase Butterworth smoothing of every column in one call.
+
+    Args:
+        data (np.ndarray): Input data of shape (n_samples, n_features)
+        cutoff (float): Normalized cutoff frequency (0 to 1)
+        order (int): Filter order
+
+    Returns:
+        np.ndarray: Filtered data with the same dtype as the input
+    """
+    b, a = design_lowpass(cutoff, order)
+    return filtfilt(b, a, data, axis=0).astype(data.dtype, copy=False)
+
+
+class CausalLowpassSmoother:
+    """
+    Streaming causal Butterworth smoother for one machine.
+
+    Keeps the sosfilt state between calls and a rolling history of smoothed rows, so refreshing
+    the smoothed window after new data arrives only costs filtering the new points.
+    Note: causal filtering adds phase lag compared with the zero-phase filter used in training.
+    """
+
+    def __init__(self, cutoff, order, history_length, num_features):
+        self.sos, self._unit_zi = design_lowpass_sos(cutoff, order)
+        self.history_length = history_length
+        self.num_features = num_features
+
+        self._zi = None
+        self._last_timestamp = None
+        self._history = np.zeros((history_length, num_features), dtype=np.float32)
+        self._count = 0  # total points smoothed so far
+        self._lock = threading.Lock()
+
+    @property
+    def last_timestamp(self):
+        """Timestamp of the newest point smoothed so far (None before the first update)."""
+        return self._last_timestamp
+
+    def reset(self):
+        """Drop filter state and history (e.g. after a data gap or restart)."""
+        with self._lock:
+            self._zi = None
+            self._last_timestamp = None
+            self._count = 0
+
+    def update(self, timestamps, values):
+        """
+        Filter only the points newer than the last one seen.
+
+        Args:
+            timestamps (sequence): Point timestamps (oldest first, mutually comparable)
+            values (np.ndarray): Raw values (n_points, n_features)
+
+        Returns:
+            int: Number of new points that were filtered
+        """
+        with self._lock:
+            if self._last_timestamp is None:
+                start = 0
+            else:
+                start = len(timestamps)
+                for idx in range(len(timestamps) - 1, -1, -1):
+                    if timestamps[idx] <= self._last_timestamp:
+                        break
+                    start = idx
+            new_values = np.asarray(values[start:], dtype=np.float64)
+            if new_values.shape[0] == 0:
+                return 0
+
+            if self._zi is None:
+                # Start in steady state at the first value to avoid a start-up transient
+                self._zi = self._unit_zi[:, :, np.newaxis] * new_values[0]
+            smoothed, self._zi = sosfilt(self.sos, new_values, axis=0, zi=self._zi)
+
+            self._append_history(smoothed.astype(np.float32))
+            self._last_timestamp = timestamps[-1]
+            return new_values.shape[0]
+
+    def window(self, n):
+        """
+        Return the last n smoothed points (oldest first), or None if fewer are available.
+        """
+        with self._lock:
+            if n > min(self._count, self.history_length):
+                return None
+            end = self._count % self.history_length
+            indices = np.arange(end - n, end) % self.history_length
+            return self._history[indices]
+
+    def _append_history(self, rows):
+        total = rows.shape[0]
+        rows = rows[-self.history_length:]
+        first = self._count + total - rows.shape[0]
+        positions = np.arange(first, first + rows.shape[0]) % self.history_length
+        self._history[positions] = rows
+        self._count += total
@@ -0,0 +1,126 @@
+# services/flux_csv.py
+"""
+Minimal reader for InfluxDB annotated CSV (the body returned by QueryApi.query_raw).
+
+Reading the raw response instead of QueryApi.query lets the streamer count the exact bytes and
+rows each query transfers and skips building FluxTable/FluxRecord objects for every row.
+read_columns() decodes the selected columns of every table straight into NumPy arrays, without
+a per-row dict or float() call.
+"""
+
+import csv
+import numpy as np
+
+
+class FluxQueryError(RuntimeError):
+    """Error table returned by InfluxDB inside a 200 response."""
+
+
+def read_columns(text, fields, time_column="_time"):
+    """
+    Decode annotated CSV into an int64 timestamp array and a float32 value array.
+
+    Each table's data rows go through NumPy's C CSV parser once per column group, so there is no
+    per-row dict or float() call. Empty cells and fields missing from the response become NaN
+    (not 0, so a missing reading is never mistaken for a real one; see services.resampling).
+
+    Args:
+        text (str): Response body
+        fields (sequence of str): Value columns, in output column order
+        time_column (str): RFC3339 time column
+
+    Returns:
+        tuple: (timestamps (n,) epoch nanoseconds as int64, values (n, len(fields)) as float32)
+    """
+    time_chunks, value_chunks = [], []
+    for header, lines in _data_tables(text, time_column):
+        timestamps, values = _decode_table(header, lines, fields, time_column)
+        time_chunks.append(timestamps)
+        value_chunks.append(values)
+
+    if not time_chunks:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(fields)), dtype=np.float32)
+    return np.concatenate(time_chunks), np.concatenate(value_chunks)
+
+
+def read_grouped_columns(text, fields, group_column, time_column="_time"):
+    """
+    Decode annotated CSV like read_columns(), split by the value of a tag column.
+
+    Used to demultiplex one fleet-wide query (grouped by machine_id) into per-machine arrays.
+
+    Args:
+        text (str): Response body
+        fields (sequence of str): Value columns, in output column order
+        group_column (str): Tag column to split on (e.g. "machine_id")
+        time_column (str): RFC3339 time column
+
+    Returns:
+        dict: tag value -> (timestamps as int64 epoch ns, values as float32), rows in response order
+    """
+    chunks = {}
+    for header, lines in _data_tables(text, time_column):
+        timestamps, values = _decode_table(header, lines, fields, time_column)
+        tags = np.loadtxt(lines, delimiter=",", quotechar='"', usecols=header.index(group_column), dtype=str, ndmin=1)
+        if (tags == tags[0]).all():
+            chunks.setdefault(str(tags[0]), []).append((timestamps, values))
+            continue
+        for tag in dict.fromkeys(tags.tolist()):
+            mask = tags == tag
+            chunks.setdefault(tag, []).append((timestamps[mask], values[mask]))
+
+    return {
+        tag: (np.concatenate([t for t, _ in parts]), np.concatenate([v for _, v in parts]))
+        for tag, parts in chunks.items()
+    }
+
+
+def _data_tables(text, time_column):
+    """Yield (header, data lines) of the non-empty data tables, raising on an error table."""
+    for header, lines in _split_tables(text):
+        if "error" in header and time_column not in header:
+            cells = next(csv.reader(lines[:1]), None) if lines else None
+            record = dict(zip(header, cells or []))
+            raise FluxQueryError(record.get("error") or "unknown Flux error")
+        if lines and time_column in header:
+            yield header, lines
+
+
+def _decode_table(header, lines, fields, time_column):
+    """Decode the time column and value columns of one table."""
+    times = np.loadtxt(lines, delimiter=",", quotechar='"', usecols=header.index(time_column), dtype=str, ndmin=1)
+    timestamps = np.char.rstrip(times, "Z").astype("datetime64[ns]").astype(np.int64)
+
+    values = np.full((len(lines), len(fields)), np.nan, dtype=np.float32)
+    present = [(out_idx, header.index(name)) for out_idx, name in enumerate(fields) if name in header]
+    if present:
+        columns = [col for _, col in present]
+        try:
+            decoded = np.loadtxt(lines, delimiter=",", quotechar='"', usecols=columns, dtype=np.float32, ndmin=2)
+        except ValueError:
+            # Empty cells (field not written at that timestamp): slower path that maps them to NaN
+            cells = np.array(list(csv.reader(lines)), dtype=str)[:, columns]
+            decoded = np.where(cells == "", "nan", cells).astype(np.float32)
+        values[:, [out_idx for out_idx, _ in present]] = decoded
+    return timestamps, values
+
+
+def _split_tables(text):
+    """Yield (header, data lines) for every table in an annotated CSV body."""
+    header, lines = None, []
+    for line in text.splitlines():
+        if not line.strip(",") or line.startswith("#"):
+            if header is not None:
+                yield header, lines
+            header, lines = None, []
+        elif header is None:
+            header = next(csv.reader([line]))
+        else:
+            lines.append(line)
+    if header is not None:
+        yield header, lines
+
+
+def format_epoch_ns(ns):
+    """Format epoch nanoseconds as an RFC3339 literal with full nanosecond precision."""
+    return f"{np.datetime_as_string(np.datetime64(int(ns), 'ns'))}Z"
@@ -0,0 +1,282 @@
+# services/inference_engines.py
+"""
+Pluggable execution backends for the PatchTST forward pass.
+
+Every engine takes a scaled (N, 240, 6) float32 batch and returns (N, 60, 6) predictions:
+- eager:       PatchTSTForPrediction in eager PyTorch (reference implementation)
+- torchscript: traced TorchScript module, cached on disk next to the model artifacts
+- compile:     torch.compile'd module (compiled in-process on first use)
+- onnx:        ONNX export run through ONNX Runtime's CPU execution provider, cached on disk
+
+The eager engine also supports reduced-precision CPU inference:
+- int8: dynamic int8 quantization of the nn.Linear layers (weights stored as int8, activations
+        quantized on the fly), which cuts both latency and resident weight memory
+- bf16: bfloat16 autocast for the forward pass; outputs are returned as float32
+
+Exported artifacts live in AI-Model-Artifacts/<variant>/engines/ and are keyed by a fingerprint of
+the model weights and the torch version, so a new model or torch upgrade re-exports automatically.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("eager", "torchscript", "compile", "onnx")
+PRECISIONS = ("fp32", "int8", "bf16")
+
+
+class _PredictionModule(torch.nn.Module):
+    """Wraps PatchTSTForPrediction so the forward returns a plain prediction tensor (exportable)."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, past_values):
+        preds = self.model(past_values=past_values).prediction_outputs
+        if isinstance(preds, tuple):
+            preds = preds[0]
+        return preds
+
+
+class EagerEngine:
+    """Reference backend: the HuggingFace model in eager mode (optionally under bf16 autocast)."""
+
+    name = "eager"
+    autocast_dtype = None
+
+    def __init__(self, model, device, autocast_dtype=None):
+        self.module = _PredictionModule(model).eval()
+        self.device = device
+        self.autocast_dtype = autocast_dtype
+
+    def __call__(self, batch_input):
+        input_tensor = torch.from_numpy(np.ascontiguousarray(batch_input, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            if self.autocast_dtype is None:
+                return self.module(input_tensor).cpu().numpy()
+            with torch.autocast(device_type=self.device.type, dtype=self.autocast_dtype):
+                return self.module(input_tensor).float().cpu().numpy()
+
+
+class TorchScriptEngine(EagerEngine):
+    """Traced TorchScript module, loaded from the on-disk cache when available."""
+
+    name = "torchscript"
+
+    def __init__(self, model, device, artifact_path, example_input):
+        self.device = device
+        self.artifact_path = artifact_path
+        if os.path.exists(artifact_path):
+            logger.info("[Engines] Loading cached TorchScript module: %s", artifact_path)
+            self.module = torch.jit.load(artifact_path, map_location=device)
+        else:
+            logger.info("[Engines] Tracing TorchScript module -> %s", artifact_path)
+            with torch.no_grad():
+                self.module = torch.jit.trace(
+                    _PredictionModule(model).eval(), example_input.to(device), check_trace=False, strict=False
+                )
+            _atomic_save(artifact_path, lambda tmp_path: torch.jit.save(self.module, tmp_path))
+        self.module.eval()
+
+
+class CompileEngine(EagerEngine):
+    """torch.compile backend (compilation happens on the first call; there is no disk artifact)."""
+
+    name = "compile"
+
+    def __init__(self, model, device):
+        super().__init__(model, device)
+        self.module = torch.compile(self.module)
+
+
+class OnnxRuntimeEngine:
+    """ONNX export executed by ONNX Runtime on the CPU execution provider."""
+
+    name = "onnx"
+
+    def __init__(self, model, artifact_path, example_input, num_threads=None):
+        import onnxruntime as ort
+
+        self.artifact_path = artifact_path
+        if not os.path.exists(artifact_path):
+            logger.info("[Engines] Exporting ONNX model -> %s", artifact_path)
+            module = _PredictionModule(model).eval().cpu()
+            # A batch of 2 keeps the exporter from specialising the batch dimension to 1
+            example = example_input.cpu().repeat(2, 1, 1)
+            _atomic_save(artifact_path, lambda tmp_path: torch.onnx.export(
+                module, (example,), tmp_path,
+                input_names=["past_values"], output_names=["prediction"],
+                dynamic_shapes={"past_values": {0: torch.export.Dim("batch")}},
+                dynamo=True,
+            ))
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(artifact_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch_input):
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(batch_input, dtype=np.float32)})[0]
+
+
+def apply_precision(model, device, precision):
+    """
+    Prepare a loaded model for the requested numeric precision.
+
+    Args:
+        model: Loaded PatchTSTForPrediction (eval mode)
+        device (torch.device): Device the model lives on
+        precision (str): One of PRECISIONS
+
+    Returns:
+        tuple: (model, autocast_dtype, effective precision)
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"precision must be one of {PRECISIONS}, got '{precision}'")
+
+    if precision == "int8":
+        if device.type != "cpu":
+            logger.warning("⚠️ [Engines] int8 dynamic quantization is CPU-only, keeping fp32 on %s", device)
+            return model, None, "fp32"
+        from torch.ao.quantization import quantize_dynamic
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8), None, "int8"
+
+    if precision == "bf16":
+        return model, torch.bfloat16, "bf16"
+
+    return model, None, "fp32"
+
+
+def model_size_bytes(model):
+    """
+    Approximate resident size of a model's weights (parameters, buffers and packed int8 weights).
+    """
+    state = model.state_dict()
+    total = 0
+    for value in state.values():
+        if isinstance(value, torch.Tensor):
+            total += value.numel() * value.element_size()
+        elif isinstance(value, tuple):
+            # Packed dynamic-quantized linear params: (weight, bias)
+            total += sum(v.numel() * v.element_size() for v in value if isinstance(v, torch.Tensor))
+    return total
+
+
+def _atomic_save(path, save_fn):
+    """Write an artifact via a temp file so a crash never leaves a half-written cache entry."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        save_fn(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def model_fingerprint(model_path):
+    """
+    Short hash identifying the model weights and torch version, used to key cached exports.
+    """
+    digest = hashlib.sha1(torch.__version__.encode())
+    if not os.path.isdir(model_path):
+        return digest.hexdigest()[:12]
+    for name in sorted(os.listdir(model_path)):
+        stat = os.stat(os.path.join(model_path, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+def _is_quantized(model):
+    return any(type(module).__module__.startswith("torch.ao.nn.quantized") for module in model.modules())
+
+
+def check_parity(engine, reference, sample, rtol=1e-4, atol=1e-4):
+    """
+    Compare an engine's output with the eager reference on the same batch.
+
+    Returns:
+        tuple: (passed (bool), max_abs_diff (float))
+    """
+    expected = reference(sample)
+    actual = engine(sample)
+    max_abs_diff = float(np.max(np.abs(actual - expected)))
+    return bool(np.allclose(actual, expected, rtol=rtol, atol=atol)), max_abs_diff
+
+
+def measure_latency(engine, sample, runs=20, warmup=3):
+    """
+    Median and p95 latency of one engine call in milliseconds.
+    """
+    for _ in range(warmup):
+        engine(sample)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        engine(sample)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), float(np.percentile(timings, 95))
+
+
+def build_engine(name, model, device, model_path, context_length, num_features, parity_sample=None,
+                 autocast_dtype=None):
+    """
+    Build the requested engine, falling back to eager on any export/load/parity failure.
+    Reduced-precision models (see apply_precision) always run on the eager engine.
+
+    Args:
+        name (str): One of ENGINES
+        model: Loaded PatchTSTForPrediction (eval mode)
+        device (torch.device): Device the eager model lives on
+        model_path (str): Directory of the HuggingFace model (exports are cached in ../engines/)
+        context_length (int): Model lookback length
+        num_features (int): Number of input channels
+        parity_sample (np.ndarray): Optional (N, context_length, num_features) batch for the parity check
+        autocast_dtype (torch.dtype): Optional autocast dtype for the eager engine (bf16 mode)
+
+    Returns:
+        Engine instance with a .name attribute and __call__(batch_input) -> np.ndarray
+    """
+    if name not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got '{name}'")
+
+    eager = EagerEngine(model, device, autocast_dtype=autocast_dtype)
+    if name == "eager":
+        return eager
+    if autocast_dtype is not None or _is_quantized(model):
+        logger.warning("⚠️ [Engines] %s engine does not support reduced precision, using eager", name)
+        return eager
+
+    cache_dir = os.path.join(os.path.dirname(model_path), "engines")
+    artifact_stem = os.path.join(cache_dir, f"{os.path.basename(model_path)}.{model_fingerprint(model_path)}")
+    example_input = torch.zeros(1, context_length, num_features, dtype=torch.float32)
+
+    try:
+        if name == "torchscript":
+            engine = TorchScriptEngine(model, device, f"{artifact_stem}.torchscript.pt", example_input)
+        elif name == "compile":
+            engine = CompileEngine(model, device)
+        else:
+            engine = OnnxRuntimeEngine(model, f"{artifact_stem}.onnx", example_input)
+
+        if parity_sample is None:
+            parity_sample = np.random.default_rng(0).standard_normal(
+                (2, context_length, num_features)
+            ).astype(np.float32)
+        passed, max_abs_diff = check_parity(engine, eager, parity_sample)
+        if not passed:
+            raise RuntimeError(f"parity check failed (max abs diff {max_abs_diff:.3e})")
+
+        logger.info("✅ [Engines] Using %s engine (parity max abs diff %.3e)", name, max_abs_diff)
+        return engine
+
+    except Exception as e:
+        logger.warning("⚠️ [Engines] %s engine unavailable (%s), falling back to eager", name, e)
+        return eager
@@ -0,0 +1,178 @@
+# services/inference_executor.py
+"""
+Dedicated executor for model work.
+
+Every model call (loading, warm-up, inference) is queued to one long-lived worker thread that owns
+the torch CPU thread budget, so a forward pass never runs on the API or ingestion threads and
+its intra-op threads stay within a fixed number of cores. The worker can optionally be pinned to
+specific CPUs and run at a lower scheduling priority (Linux), leaving the remaining cores and
+scheduler time to FastAPI and the InfluxDB collection loop.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cpu_list(spec):
+    """
+    Parse a CPU list such as "2,3" or "0-3,6" (e.g. from an environment variable).
+
+    Returns:
+        list of int, or None for an empty/None spec
+    """
+    if not spec:
+        return None
+    cpus = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return sorted(set(cpus))
+
+
+class InferenceExecutor:
+    """
+    Single worker thread fed through a bounded queue.
+
+    Args:
+        num_threads (int): torch intra-op threads for the forward pass (None keeps torch's default)
+        interop_threads (int): torch inter-op threads (None keeps the default; only settable before
+                               torch starts any inter-op work)
+        cpu_affinity (list of int): Optional CPUs the worker thread (and the threads it spawns) may run on
+        nice (int): Optional niceness increment for the worker thread (Linux), e.g. 5 to favour API threads
+        max_queue (int): Max pending jobs; submit() blocks when full, submit_nowait() raises queue.Full
+    """
+
+    def __init__(self, num_threads=None, interop_threads=None, cpu_affinity=None, nice=None, max_queue=8):
+        self.num_threads = num_threads
+        self.interop_threads = interop_threads
+        self.cpu_affinity = list(cpu_affinity) if cpu_affinity else None
+        self.nice = nice
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.jobs_completed = 0
+        self.busy_seconds = 0.0
+        self.last_job_ms = None
+
+    def start(self):
+        """Start the worker thread (idempotent; submit() starts it on first use)."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="inference-executor", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) on the worker thread.
+
+        Returns:
+            concurrent.futures.Future with the call's result or exception
+        """
+        self.start()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def submit_nowait(self, fn, *args, **kwargs):
+        """
+        Like submit(), but never blocks the caller (e.g. an event loop).
+
+        Raises:
+            queue.Full: If max_queue jobs are already pending
+        """
+        self.start()
+        future = Future()
+        self._queue.put_nowait((future, fn, args, kwargs))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """Submit and wait for the result (re-raises the call's exception)."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self, wait=True):
+        """Stop the worker after the queued jobs have run."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+        self._thread = None
+
+    def stats(self):
+        """
+        Executor settings and counters for the status endpoint.
+        """
+        return {
+            "num_threads": self.num_threads,
+            "interop_threads": self.interop_threads,
+            "cpu_affinity": self.cpu_affinity,
+            "nice": self.nice,
+            "queue_depth": self._queue.qsize(),
+            "jobs_completed": self.jobs_completed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "last_job_ms": self.last_job_ms,
+        }
+
+    def _configure_thread(self):
+        """Apply the CPU budget from inside the worker thread."""
+        if self.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            try:
+                # pid 0 = calling thread on Linux; torch/OpenMP threads created later inherit the mask
+                os.sched_setaffinity(0, self.cpu_affinity)
+            except OSError as e:
+                logger.warning("⚠️ [Executor] Could not pin inference thread to CPUs %s: %s", self.cpu_affinity, e)
+        if self.nice and hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError as e:
+                logger.warning("⚠️ [Executor] Could not lower inference thread priority: %s", e)
+
+        import torch
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.interop_threads:
+            try:
+                torch.set_num_interop_threads(self.interop_threads)
+            except RuntimeError as e:
+                logger.warning("⚠️ [Executor] Inter-op threads already fixed by torch (%s)", e)
+
+        logger.info("[Executor] Inference worker ready: %d intra-op / %d inter-op threads, CPUs %s",
+                    torch.get_num_threads(), torch.get_num_interop_threads(),
+                    self.cpu_affinity if self.cpu_affinity else "all")
+
+    def _worker(self):
+        try:
+            self._configure_thread()
+        except Exception:
+            logger.exception("❌ [Executor] Failed to apply inference thread settings")
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.busy_seconds += elapsed
+                self.last_job_ms = round(elapsed * 1000, 2)
+                self.jobs_completed += 1
@@ -0,0 +1,173 @@
+# services/inference_scheduler.py
+"""
+Drift-free scheduling of inference cycles.
+
+Ticks are laid on a fixed grid of the monotonic clock (start, start + interval, ...), so the
+period does not stretch by the time spent in inference and email sending. A tick that is
+missed (a cycle ran longer than the interval) is coalesced with the others into one run instead
+of being queued. Optionally a data trigger also runs a cycle as soon as any machine has ingested
+`trigger_points` new points; with the trigger on, a timer tick without any new point is skipped,
+so forecasts follow data arrival and the delay from new data to alert is bounded by the trigger.
+
+The measured lag of every run (start time minus the time it became due) is exposed in stats().
+"""
+
+import asyncio
+import threading
+import time
+
+TIMER, DATA = "timer", "data"
+
+
+class InferenceScheduler:
+    """
+    Fixed-rate monotonic timer plus an optional K-new-points trigger.
+
+    Args:
+        interval (float): Timer period (seconds)
+        trigger_points (int): New points on one machine that trigger a run (None = timer only)
+        clock (callable): Monotonic clock (injectable for tests)
+    """
+
+    def __init__(self, interval, trigger_points=None, clock=time.monotonic):
+        self.interval = interval
+        self.trigger_points = trigger_points
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._async_waiter = None  # (loop, asyncio.Event) of a pending wait_async()
+
+        self._next_tick = clock()  # first run immediately
+        self._new_points = {}  # machine_id -> points since the last run
+        self._triggered_at = None
+        self._has_run = False
+
+        self.runs = {TIMER: 0, DATA: 0}
+        self.coalesced_ticks = 0
+        self.idle_ticks = 0
+        self.last_lag = None
+        self.max_lag = 0.0
+
+    def notify_points(self, machine_id, count):
+        """Record newly ingested points (safe to call from any thread)."""
+        if count <= 0:
+            return
+        with self._lock:
+            total = self._new_points.get(machine_id, 0) + count
+            self._new_points[machine_id] = total
+            fired = self.trigger_points and total >= self.trigger_points and self._triggered_at is None
+            if fired:
+                self._triggered_at = self._clock()
+            waiter = self._async_waiter
+        if fired:
+            self._wakeup.set()
+            if waiter is not None:
+                loop, event = waiter
+                loop.call_soon_threadsafe(event.set)
+
+    def wake(self):
+        """Wake a blocked wait() (e.g. on shutdown) without scheduling a run."""
+        self._wakeup.set()
+
+    def wait(self, should_continue=lambda: True):
+        """
+        Block until the next run is due and start it.
+
+        Args:
+            should_continue (callable): Checked on every wakeup; wait() returns None once it is False
+
+        Returns:
+            str: 'timer' or 'data' (None if stopped)
+        """
+        while should_continue():
+            reason, delay = self._poll()
+            if reason is not None:
+                return reason
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+        return None
+
+    async def wait_async(self):
+        """
+        Async counterpart of wait(); the data trigger wakes it from any thread.
+
+        Returns:
+            str: 'timer' or 'data'
+        """
+        event = asyncio.Event()
+        self._async_waiter = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                reason, delay = self._poll()
+                if reason is not None:
+                    return reason
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            self._async_waiter = None
+
+    def _poll(self):
+        """
+        Start the run that is due, if any.
+
+        Returns:
+            tuple: (reason or None, seconds until the next tick)
+        """
+        with self._lock:
+            now = self._clock()
+            if self._triggered_at is not None:
+                return self._start_run(DATA, now, self._triggered_at), 0.0
+            if now < self._next_tick:
+                return None, self._next_tick - now
+            due = self._next_tick
+            self._advance_timer(now)
+            if self.trigger_points and self._has_run and not self._new_points:
+                self.idle_ticks += 1  # no new data since the last run: nothing to forecast
+                return None, self._next_tick - now
+            return self._start_run(TIMER, now, due), 0.0
+
+    def _advance_timer(self, now):
+        """Move to the next grid tick after now; ticks missed in between are coalesced."""
+        missed = int((now - self._next_tick) // self.interval)
+        self.coalesced_ticks += missed
+        self._next_tick += (missed + 1) * self.interval
+
+    def _start_run(self, reason, now, due):
+        lag = now - due
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.runs[reason] += 1
+        self._new_points.clear()
+        self._triggered_at = None
+        self._has_run = True
+        return reason
+
+    def next_run_in(self):
+        """Seconds until the next timer tick."""
+        with self._lock:
+            return max(0.0, self._next_tick - self._clock())
+
+    def stats(self):
+        """
+        Scheduler counters for /inference/status.
+
+        Returns:
+            dict: runs by trigger, coalesced/idle ticks, last and max schedule lag (ms), seconds to the next tick
+        """
+        next_run_in = self.next_run_in()
+        with self._lock:
+            return {
+                "interval_seconds": self.interval,
+                "trigger_points": self.trigger_points,
+                "timer_runs": self.runs[TIMER],
+                "data_runs": self.runs[DATA],
+                "coalesced_ticks": self.coalesced_ticks,
+                "idle_ticks": self.idle_ticks,
+                "last_lag_ms": round(self.last_lag * 1000, 2) if self.last_lag is not None else None,
+                "max_lag_ms": round(self.max_lag * 1000, 2),
+                "pending_points": max(self._new_points.values(), default=0),
+                "next_run_in_seconds": round(next_run_in, 2),
+            }
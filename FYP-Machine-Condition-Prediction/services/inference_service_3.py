@@ -1,22 +1,61 @@
 from datetime import datetime
+import hashlib
+import logging
 import os
 import pickle
-from matplotlib.style import context
+import threading
+import time
 import numpy as np
 import torch
-from scipy.signal import butter, filtfilt
-from transformers import PatchTSTForPrediction
+from services.inference_engines import (
+    build_engine, apply_precision, model_fingerprint, model_size_bytes, ENGINES, PRECISIONS
+)
+from services.result_cache import InferenceResultCache
+from services.sensor_window import SensorWindow
+from services.filtering import zero_phase_lowpass, CausalLowpassSmoother, SMOOTHING_MODES
+from services.postprocessing import (
+    remove_prediction_outliers,
+    scale_predictions_to_context,
+    calculate_exceedance,
+    CRITICAL_THRESHOLD_PERCENTAGE,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class InferenceService:
-    def __init__(self):
+    def __init__(self, base_dir=None, smoothing_mode="zero_phase", trace=False, engine="eager",
+                 precision="fp32", cache_size=64):
         """
         Initialize the inference service with model and scaler.
         Configured for X-std model artifacts with context_length=240, prediction_length=60
+        
+        Args:
+            base_dir (str): Optional artifact directory containing patchtst_sensor_multivar/ and scaler.pkl
+                            (default: AI-Model-Artifacts/CustomLoss)
+            smoothing_mode (str): 'zero_phase' (filtfilt over the full window, as in training) or
+                                  'causal' (streaming sosfilt, each new point filtered once per machine)
+            trace (bool): Capture the intermediate arrays of every run in self.last_trace
+                          (for inspection/debugging instead of printing them)
+            engine (str): Forward-pass backend: 'eager', 'torchscript', 'compile' or 'onnx'
+                          (exports are cached under <base_dir>/engines/, falls back to eager on failure)
+            precision (str): 'fp32' (default), 'int8' (dynamic quantization of the linear layers, CPU only)
+                             or 'bf16' (bfloat16 autocast); reduced precision always uses the eager engine
+            cache_size (int): Max windows kept in the content-addressed result cache (0 disables it).
+                              Identical windows return the stored results/alerts without re-running
+                              the pipeline; not used in 'causal' mode, where output depends on filter state,
+                              or while trace is enabled.
         """
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # base_dir = os.path.join(current_dir, "..", "AI-Model-Artifacts", "X-std")
-        base_dir = os.path.join(current_dir, "..", "AI-Model-Artifacts", "CustomLoss")
+        if smoothing_mode not in SMOOTHING_MODES:
+            raise ValueError(f"smoothing_mode must be one of {SMOOTHING_MODES}, got '{smoothing_mode}'")
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got '{engine}'")
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got '{precision}'")
+        if base_dir is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            # base_dir = os.path.join(current_dir, "..", "AI-Model-Artifacts", "X-std")
+            base_dir = os.path.join(current_dir, "..", "AI-Model-Artifacts", "CustomLoss")
         base_dir = os.path.abspath(base_dir)
         
         self.model_path = os.path.join(base_dir, "patchtst_sensor_multivar")
@@ -32,35 +71,120 @@ class InferenceService:
         # Feature names matching the model training order
         self.feature_names = ['current', 'tempA', 'tempB', 'accX', 'accY', 'accZ']
         
+        # Butterworth smoothing configuration (coefficients are cached in services.filtering)
+        self.smoothing_mode = smoothing_mode
+        self.filter_cutoff = 0.3
+        self.filter_order = 2
+        self._smoothers = {}  # machine_id -> CausalLowpassSmoother (causal mode only)
+        self._smoothers_lock = threading.Lock()
+        
+        # Optional trace capture of intermediate arrays (stage name -> array)
+        self.trace_enabled = trace
+        self.last_trace = None
+        self._active_trace = None
+        
         # Load scaler
-        print(f"[InferenceService] Loading scaler from: {self.scaler_path}")
+        logger.info("[InferenceService] Loading scaler from: %s", self.scaler_path)
         try:
             with open(self.scaler_path, "rb") as f:
                 self.scaler = pickle.load(f)
-            print("✅ Scaler loaded successfully")
+            logger.info("✅ Scaler loaded successfully")
         except FileNotFoundError:
-            print(f"⚠️ Scaler not found at: {self.scaler_path}")
-            print(f"   Running WITHOUT scaling (using raw data directly)")
+            logger.warning("⚠️ Scaler not found at: %s - running WITHOUT scaling (using raw data directly)", self.scaler_path)
             self.scaler = None
         except Exception as e:
-            print(f"❌ Error loading scaler: {e}")
-            print(f"   Running WITHOUT scaling (using raw data directly)")
+            logger.error("❌ Error loading scaler: %s - running WITHOUT scaling (using raw data directly)", e)
             self.scaler = None
         
-        # Load model using HuggingFace's from_pretrained (as shown in notebook)
-        print(f"[InferenceService] Loading model from: {self.model_path}")
+        # Load model (memory-mapped safetensors weights, HuggingFace from_pretrained as fallback)
+        logger.info("[InferenceService] Loading model from: %s", self.model_path)
         try:
-            self.model = PatchTSTForPrediction.from_pretrained(
-                self.model_path, 
-                local_files_only=True
-            )
+            self.model = self._load_model()
             self.model.to(self.device)
             self.model.eval()
-            print(f"✅ Model loaded successfully on {self.device}")
-            print(f"   Parameters: {sum(p.numel() for p in self.model.parameters()):,}")
+            logger.info("✅ Model loaded successfully on %s (%s parameters)",
+                        self.device, f"{sum(p.numel() for p in self.model.parameters()):,}")
         except Exception as e:
-            print(f"❌ Error loading model: {e}")
+            logger.error("❌ Error loading model: %s", e)
             raise
+        
+        # Reduced-precision CPU inference (int8 dynamic quantization or bf16 autocast)
+        fp32_bytes = model_size_bytes(self.model)
+        self.model, autocast_dtype, self.precision = apply_precision(self.model, self.device, precision)
+        if self.precision != "fp32":
+            logger.info("✅ Using %s precision (weights %.1f KB -> %.1f KB)",
+                        self.precision, fp32_bytes / 1024, model_size_bytes(self.model) / 1024)
+        
+        # Build the forward-pass backend (parity-checked against eager, eager on failure)
+        self.engine = build_engine(
+            engine, self.model, self.device, self.model_path,
+            self.context_length, self.num_features, autocast_dtype=autocast_dtype
+        )
+        
+        # Version recorded with every forecast: artifact variant + fingerprint of its model files
+        self.model_variant = os.path.basename(base_dir)
+        self.model_version = f"{self.model_variant}@{model_fingerprint(self.model_path)}"
+        
+        # Result cache keyed on window content + everything else that determines the forecast
+        scaler_version = hashlib.sha1(pickle.dumps(self.scaler)).hexdigest()[:12] if self.scaler is not None else None
+        self._cache_context = (
+            self.model_version, scaler_version, self.engine.name, self.precision,
+            self.smoothing_mode, self.filter_cutoff, self.filter_order,
+            self.context_length, self.prediction_length
+        )
+        use_cache = cache_size > 0 and smoothing_mode != "causal"
+        self.result_cache = InferenceResultCache(cache_size) if use_cache else None
+        
+        self.warmup_ms = None  # set by warm_up()
+
+    def _load_model(self):
+        """
+        Load PatchTST weights memory-mapped from model.safetensors.
+        
+        The module is built on the meta device and the mmap-backed tensors are assigned as its
+        parameters, so weights are paged in from the (shared) page cache on demand instead of
+        being read and copied up front. Falls back to from_pretrained for other layouts.
+        
+        Returns:
+            PatchTSTForPrediction: Loaded model
+        """
+        # transformers/safetensors are imported here so importing this module stays cheap
+        from transformers import PatchTSTConfig, PatchTSTForPrediction
+        
+        weights_path = os.path.join(self.model_path, "model.safetensors")
+        if os.path.exists(weights_path):
+            from safetensors.torch import load_file
+            config = PatchTSTConfig.from_pretrained(self.model_path, local_files_only=True)
+            with torch.device("meta"):
+                model = PatchTSTForPrediction(config)
+            missing, unexpected = model.load_state_dict(load_file(weights_path), strict=False, assign=True)
+            still_meta = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+                          if tensor.is_meta]
+            if not missing and not unexpected and not still_meta:
+                logger.info("[InferenceService] Weights memory-mapped from %s", weights_path)
+                return model
+            logger.warning("⚠️ [InferenceService] safetensors keys do not match the model (missing %d, unexpected %d),"
+                           " falling back to from_pretrained", len(missing) + len(still_meta), len(unexpected))
+        
+        # Load model using HuggingFace's from_pretrained (as shown in notebook)
+        return PatchTSTForPrediction.from_pretrained(
+            self.model_path, 
+            local_files_only=True
+        )
+
+    def warm_up(self):
+        """
+        Run one dummy forward pass so allocator pools, kernel dispatch and lazy engine compilation
+        are paid for before the first real inference.
+        
+        Returns:
+            float: Warm-up time in milliseconds
+        """
+        start = time.perf_counter()
+        self.engine(np.zeros((1, self.context_length, self.num_features), dtype=np.float32))
+        self.warmup_ms = (time.perf_counter() - start) * 1000
+        logger.info("✅ [InferenceService] Warm-up forward pass done in %.1f ms", self.warmup_ms)
+        return self.warmup_ms
 
     def apply_butterworth_filter(self, data, cutoff=0.1, order=2):
         """
@@ -74,164 +198,427 @@ class InferenceService:
         Returns:
             np.ndarray: Filtered data
         """
-        b, a = butter(order, cutoff, btype='low', analog=False)
-        filtered_data = np.zeros_like(data)
+        return zero_phase_lowpass(data, cutoff, order)
+
+    def update_smoothing(self, buffer_data):
+        """
+        Feed newly ingested points into the machine's causal smoother (causal mode only).
         
-        for i in range(data.shape[1]):
-            filtered_data[:, i] = filtfilt(b, a, data[:, i])
+        Only points newer than the last one seen are filtered, so calling this on every
+        data collection cycle keeps the smoothed window fresh without refiltering history.
         
-        return filtered_data
+        Args:
+            buffer_data (SensorWindow or list of dicts): Recent data points for one machine, oldest first
+        
+        Returns:
+            int: Number of new points smoothed
+        """
+        if self.smoothing_mode != "causal" or not len(buffer_data):
+            return 0
+        return self._causal_smoother(buffer_data).update(
+            self._window_timestamps(buffer_data), self._window_values(buffer_data)
+        )
+
+    def _causal_smoother(self, buffer_data):
+        """Get (or create) the causal smoother for the machine that produced buffer_data."""
+        machine_id = self._window_machine_id(buffer_data)
+        with self._smoothers_lock:
+            smoother = self._smoothers.get(machine_id)
+            if smoother is None:
+                smoother = CausalLowpassSmoother(
+                    self.filter_cutoff, self.filter_order,
+                    history_length=self.context_length + 100,
+                    num_features=self.num_features
+                )
+                self._smoothers[machine_id] = smoother
+            return smoother
+
+    def _smooth(self, raw_data, buffer_data):
+        """
+        Smooth one raw window with the configured Butterworth mode.
+        
+        In causal mode only the points the machine's smoother has not seen yet are filtered;
+        the smoothed window is then read from its history.
+        """
+        if self.smoothing_mode == "causal":
+            smoother = self._causal_smoother(buffer_data)
+            timestamps = self._window_timestamps(buffer_data)
+            smoother.update(timestamps, raw_data)
+            smoothed = smoother.window(raw_data.shape[0])
+            if smoothed is not None and smoother.last_timestamp == timestamps[-1]:
+                return smoothed
+            # History does not end at this window (e.g. out-of-order backfill): restart the stream
+            smoother.reset()
+            smoother.update(timestamps, raw_data)
+            return smoother.window(raw_data.shape[0])
+        return self.apply_butterworth_filter(raw_data, cutoff=self.filter_cutoff, order=self.filter_order)
 
     def run_inference(self, buffer_data):
         """
         Simplified inference pipeline: Raw data → Butterworth → StandardScaler → Model → Raw predictions
         
         Args:
-            buffer_data (list of dicts): 240 data points from InfluxDB
+            buffer_data (SensorWindow or list of dicts): 240 data points from InfluxDB
                 Each dict contains: timestamp, current, tempA, tempB, accX, accY, accZ, machine_id
         
         Returns:
             results (dict): Contains raw model predictions in scaled space
             alerts (dict): Status and message
         """
-        print("\n" + "="*80)
-        print("[InferenceService] Starting Simplified Inference Pipeline")
-        print("="*80)
+        logger.debug("[InferenceService] Starting Simplified Inference Pipeline")
         
         # Validate input
         if len(buffer_data) != self.context_length:
             error_msg = f"Expected {self.context_length} data points, got {len(buffer_data)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return None, {"status": "error", "message": error_msg}
         
+        start_time = time.perf_counter()
+        self._begin_trace()
         try:
-            # ============================================================
-            # STEP 1: Extract raw features from buffer
-            # ============================================================
-            print(f"\n[Step 1] Extracting raw features from buffer...")
-            raw_data = np.array([
-                [
-                    point['current'],
-                    point['tempA'],
-                    point['tempB'],
-                    point['accX'],
-                    point['accY'],
-                    point['accZ']
-                ]
-                for point in buffer_data
-            ], dtype=np.float32)
-            
-            print(f"✅ Raw data extracted, shape: {raw_data.shape}")
-            print(f"\n   First 5 data points (raw):")
-            for step in range(min(5, raw_data.shape[0])):
-                values = ", ".join([f"{self.feature_names[i]}={raw_data[step, i]:.4f}" 
-                                  for i in range(self.num_features)])
-                print(f"     Point {step+1}: {values}")
-            
-            # ============================================================
-            # STEP 2: Apply Butterworth filter (smoothing)
-            # ============================================================
-            print(f"\n[Step 2] Applying Butterworth filter for smoothing (cutoff=0.3, order=2)...")
-            smoothed_data = self.apply_butterworth_filter(raw_data, cutoff=0.3, order=2)
-            
-            print(f"✅ Data smoothed, shape: {smoothed_data.shape}")
-            print(f"\n   First 5 data points (after Butterworth filter):")
-            for step in range(min(5, smoothed_data.shape[0])):
-                values = ", ".join([f"{self.feature_names[i]}={smoothed_data[step, i]:.4f}" 
-                                  for i in range(self.num_features)])
-                print(f"     Point {step+1}: {values}")
-            
-            # ============================================================
-            # STEP 3: Apply StandardScaler transform
-            # ============================================================
-            if self.scaler is not None:
-                print(f"\n[Step 3] Applying StandardScaler transform...")
-                scaled_input = self.scaler.transform(smoothed_data).astype(np.float32)
-                print(f"✅ Data scaled, shape: {scaled_input.shape}")
-            else:
-                print(f"\n[Step 3] ⚠️ Scaler not available, using raw data directly...")
-                scaled_input = smoothed_data.astype(np.float32)
-                print(f"✅ Using raw data, shape: {scaled_input.shape}")
-    
-            print(f"\n   First 5 data points (after StandardScaler):")
-            for step in range(min(5, scaled_input.shape[0])):
-                values = ", ".join([f"{self.feature_names[i]}={scaled_input[step, i]:+.4f}" 
-                                  for i in range(self.num_features)])
-                print(f"     Point {step+1}: {values}")
-            
-            # ============================================================
-            # STEP 4: Prepare tensor and run model inference
-            # ============================================================
-            print(f"\n[Step 4] Running model inference...")
-            model_input = scaled_input.reshape(1, self.context_length, self.num_features)
-            input_tensor = torch.tensor(model_input, dtype=torch.float32).to(self.device)
-            
-            with torch.no_grad():
-                outputs = self.model(past_values=input_tensor)
-                preds = outputs.prediction_outputs
-                
-                if isinstance(preds, tuple):
-                    preds = preds[0]
-                
-                raw_predictions = preds.squeeze(0).cpu().numpy()
-            
-            print(f"✅ Model inference complete, prediction shape: {raw_predictions.shape}")
-            print(f"\n   First 5 predictions (raw model output in scaled space):")
-            for step in range(min(5, raw_predictions.shape[0])):
-                values = ", ".join([f"{self.feature_names[i]}={raw_predictions[step, i]:+.4f}" 
-                                  for i in range(self.num_features)])
-                print(f"     Step {step+1}: {values}")
-            
-            # ============================================================
-            # STEP 5: POST-PROCESSING TRICK - FIT PREDICTIONS TO LOOKBACK SCALE
-            # ============================================================
-            print(f"\n[Step 5] Applying post-processing trick to fit predictions into lookback scale...")
-            
-            # 5a: Remove outliers from raw predictions
-            print(f"\n   5a. Removing outliers from raw predictions (threshold=3.0)...")
-            pred_no_outliers = self._remove_prediction_outliers(raw_predictions, threshold=3.0)
+            # STEP 1: Raw features (also the content the result cache is keyed on)
+            raw_data = self._extract_features(buffer_data)
+            cache_key, cached = self._cache_lookup(buffer_data, raw_data)
+            if cached is not None:
+                logger.info("[InferenceService] Cache hit for %s: %s (%.1f ms)",
+                            cached[1]["machine_id"], cached[1]["status"], (time.perf_counter() - start_time) * 1000)
+                return cached
             
-            # 5b: Scale predictions to match input context (preserving first 3 predictions)
-            print(f"\n   5b. Preserving first 3 predictions, scaling remaining 57 to SCALED input context...")
-            first_3_predictions = pred_no_outliers[:3, :]  # Keep outlier-removed values as-is
-            rest_57_predictions = pred_no_outliers[3:, :]  # Scale these to match context
+            # STEP 2-3: Butterworth → StandardScaler
+            scaled_input = self._preprocess(raw_data, buffer_data)
             
-            # Scale only the last 57 points
-            scaled_57 = self._scale_predictions_to_context(rest_57_predictions, scaled_input, method='minmax')
+            # STEP 4: Single-window model forward (batch of 1)
+            raw_predictions = self._predict(scaled_input[np.newaxis, :, :])[0]
             
-            # Concatenate: first 3 (preserved) + 57 (scaled)
-            final_predictions = np.vstack([first_3_predictions, scaled_57])
-            print(f"✅ First 3 predictions preserved in scaled space (outlier-removed only)")
+            # STEP 5-6: Post-processing and anomaly detection
+            results, alerts = self._postprocess(raw_predictions, scaled_input, raw_data, buffer_data)
+            self._cache_store(cache_key, results, alerts)
             
-            print(f"✅ Post-processing complete, final prediction shape: {final_predictions.shape}")
-            print(f"\n   First 5 predictions (final model output fitted to SCALED input range):")
-            for step in range(min(5, final_predictions.shape[0])):
-                values = ", ".join([f"{self.feature_names[i]}={final_predictions[step, i]:.4f}" 
-                                  for i in range(self.num_features)])
-                print(f"     Step {step+1}: {values}")
+            logger.info("[InferenceService] Inference complete for %s: %s (%.1f ms)",
+                        alerts["machine_id"], alerts["status"], (time.perf_counter() - start_time) * 1000)
             
-            # ============================================================
-            # STEP 6: ANOMALY DETECTION
-            # ============================================================
-            print(f"\n[Step 6] Calculating anomaly scores...")
+            return results, alerts
+        
+        except Exception as e:
+            error_msg = f"Error during inference: {str(e)}"
+            logger.exception("❌ %s", error_msg)
+            return None, {"status": "error", "message": error_msg}
+        
+        finally:
+            self._end_trace()
+
+    def run_inference_batch(self, windows):
+        """
+        Batched inference pipeline: N windows share a single PatchTST forward pass.
+        
+        Preprocessing runs per window exactly as in run_inference, then the scaled inputs
+        are stacked into one (N, 240, 6) tensor so the model runs once for the whole fleet
+        instead of once per machine, and post-processing runs on the (N, 60, 6) block.
+        
+        Args:
+            windows (list): N buffers, each a SensorWindow or list of 240 point dicts (same format as run_inference)
+        
+        Returns:
+            list of (results, alerts) tuples, one per window and in input order.
+            Invalid windows get (None, error_alert) without affecting the others.
+        """
+        logger.debug("[InferenceService] Starting Batched Inference Pipeline (%d windows)", len(windows))
+        
+        start_time = time.perf_counter()
+        self._begin_trace()
+        try:
+            outputs = [None] * len(windows)
+            prepared = []  # (index, raw_data, scaled_input) for windows that passed preprocessing
+            cache_keys = {}  # index -> result cache key for windows that missed the cache
+            cache_hits = 0
+        
+            for idx, buffer_data in enumerate(windows):
+                if len(buffer_data) != self.context_length:
+                    error_msg = f"Expected {self.context_length} data points, got {len(buffer_data)}"
+                    logger.error("❌ [Window %d] %s", idx, error_msg)
+                    outputs[idx] = (None, {"status": "error", "message": error_msg})
+                    continue
+                try:
+                    raw_data = self._extract_features(buffer_data)
+                    cache_keys[idx], cached = self._cache_lookup(buffer_data, raw_data)
+                    if cached is not None:
+                        outputs[idx] = cached
+                        cache_hits += 1
+                        continue
+                    scaled_input = self._preprocess(raw_data, buffer_data)
+                    prepared.append((idx, raw_data, scaled_input))
+                except Exception as e:
+                    error_msg = f"Error during inference: {str(e)}"
+                    logger.error("❌ [Window %d] %s", idx, error_msg)
+                    outputs[idx] = (None, {"status": "error", "message": error_msg})
             
-            # Inverse transform final predictions to get raw sensor values
-            if self.scaler is not None:
-                predictions_raw = self.scaler.inverse_transform(final_predictions)
-            else:
-                predictions_raw = final_predictions
+            if not prepared:
+                return outputs
             
-            # Calculate anomaly scores based on predefined thresholds
-            anomaly_results = self._calculate_anomaly_scores(predictions_raw)
+            try:
+                batch_input = np.stack([scaled_input for _, _, scaled_input in prepared], axis=0)
+                batch_predictions = self._predict(batch_input)
+                
+                # Post-processing runs on the whole (B, 60, 6) block at once
+                batch_outputs = self._postprocess_batch(
+                    batch_predictions,
+                    batch_input,
+                    [raw_data for _, raw_data, _ in prepared],
+                    [windows[idx] for idx, _, _ in prepared]
+                )
+                for (idx, _, _), output in zip(prepared, batch_outputs):
+                    outputs[idx] = output
+                    self._cache_store(cache_keys[idx], *output)
+            except Exception as e:
+                error_msg = f"Error during inference: {str(e)}"
+                logger.exception("❌ %s", error_msg)
+                for idx, _, _ in prepared:
+                    outputs[idx] = (None, {"status": "error", "message": error_msg})
+        
+            logger.info("[InferenceService] Batched inference complete: %d/%d windows, %d cache hits (%.1f ms)",
+                        len(prepared), len(windows), cache_hits, (time.perf_counter() - start_time) * 1000)
             
+            return outputs
+        
+        finally:
+            self._end_trace()
+        
+    def cache_stats(self):
+        """
+        Result cache counters for the status endpoint (None when the cache is disabled).
+        """
+        return self.result_cache.stats() if self.result_cache is not None else None
+
+    def _cache_lookup(self, buffer_data, raw_data):
+        """
+        Returns:
+            tuple: (cache key or None, cached (results, alerts) or None); a hit gets a new alerts
+            dict stamped with the current time, like a fresh run
+        """
+        if self.result_cache is None or self.trace_enabled:
+            return None, None  # traced runs always execute the full pipeline
+        key = self.result_cache.make_key(buffer_data, raw_data, self._cache_context)
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return key, None
+        results, alerts = cached
+        return key, (results, {**alerts, "timestamp": datetime.now().isoformat()})
+
+    def _cache_store(self, key, results, alerts):
+        if key is not None and results is not None:
+            # The timestamp belongs to the run that produced the alerts; hits get their own
+            self.result_cache.put(key, results, {name: value for name, value in alerts.items() if name != "timestamp"})
+        
+    def _begin_trace(self):
+        """Start collecting intermediate arrays for this run (no-op unless trace is enabled)."""
+        self._active_trace = {} if self.trace_enabled else None
+        
+    def _trace(self, stage, array, per_window=True):
+        """
+        Record an intermediate array under a stage name.
+        
+        Per-window stages are stacked into (B, ...) arrays when the run finishes;
+        block stages are stored as-is.
+        """
+        if self._active_trace is None:
+            return
+        if per_window:
+            self._active_trace.setdefault(stage, []).append(array)
+        else:
+            self._active_trace[stage] = array
+
+    def _end_trace(self):
+        """Publish the collected trace as self.last_trace."""
+        if self._active_trace is None:
+            return
+        self.last_trace = {
+            stage: np.stack(value, axis=0) if isinstance(value, list) else value
+            for stage, value in self._active_trace.items()
+        }
+        self._active_trace = None
+
+    def _log_rows(self, title, rows, label="Point", fmt="{:.4f}"):
+        """
+        Log the first 5 rows of a (T, 6) array at DEBUG level.
+        
+        The rows are only formatted when DEBUG logging is enabled.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        lines = [f"   {title}:"]
+        for step in range(min(5, rows.shape[0])):
+            values = ", ".join([f"{self.feature_names[i]}={fmt.format(rows[step, i])}"
+                              for i in range(self.num_features)])
+            lines.append(f"     {label} {step+1}: {values}")
+        logger.debug("\n".join(lines))
+
+    @staticmethod
+    def _window_machine_id(buffer_data):
+        if isinstance(buffer_data, SensorWindow):
+            return buffer_data.machine_id if buffer_data.machine_id is not None else 'Unknown'
+        return buffer_data[0].get('machine_id', 'Unknown')
+
+    @staticmethod
+    def _window_timestamps(buffer_data):
+        if isinstance(buffer_data, SensorWindow):
+            return buffer_data.timestamps
+        return [point['timestamp'] for point in buffer_data]
+
+    def _window_values(self, buffer_data):
+        if isinstance(buffer_data, SensorWindow):
+            return buffer_data.values  # already float32 in model feature order
+        return np.array([[point[name] for name in self.feature_names] for point in buffer_data], dtype=np.float32)
+
+    def _extract_features(self, buffer_data):
+        """
+        STEP 1: Extract raw features from buffer.
+        
+        Args:
+            buffer_data (SensorWindow or list of dicts): Data points in model feature order
+        
+        Returns:
+            np.ndarray: Raw sensor values (240, 6) as float32
+        """
+        raw_data = self._window_values(buffer_data)
+        
+        logger.debug("[Step 1] Raw data extracted, shape: %s", raw_data.shape)
+        self._log_rows("First 5 data points (raw)", raw_data)
+        self._trace("raw", raw_data)
+        
+        return raw_data
+
+    def _preprocess(self, raw_data, buffer_data):
+        """
+        STEP 2-3: Butterworth smoothing followed by StandardScaler transform.
+        
+        Args:
+            raw_data (np.ndarray): Raw sensor values (240, 6)
+            buffer_data (list of dicts): Original points (timestamps/machine_id for causal smoothing)
+        
+        Returns:
+            np.ndarray: Model-ready input (240, 6) as float32
+        """
+        # ============================================================
+        # STEP 2: Apply Butterworth filter (smoothing)
+        # ============================================================
+        smoothed_data = self._smooth(raw_data, buffer_data)
+        
+        logger.debug("[Step 2] Butterworth filter applied (cutoff=%s, order=%s, mode=%s), shape: %s",
+                     self.filter_cutoff, self.filter_order, self.smoothing_mode, smoothed_data.shape)
+        self._log_rows("First 5 data points (after Butterworth filter)", smoothed_data)
+        self._trace("smoothed", smoothed_data)
+        
+        # ============================================================
+        # STEP 3: Apply StandardScaler transform
+        # ============================================================
+        if self.scaler is not None:
+            scaled_input = self.scaler.transform(smoothed_data).astype(np.float32)
+            logger.debug("[Step 3] StandardScaler applied, shape: %s", scaled_input.shape)
+        else:
+            scaled_input = smoothed_data.astype(np.float32)
+            logger.debug("[Step 3] ⚠️ Scaler not available, using raw data directly, shape: %s", scaled_input.shape)
+
+        self._log_rows("First 5 data points (after StandardScaler)", scaled_input, fmt="{:+.4f}")
+        self._trace("scaled_input", scaled_input)
+        
+        return scaled_input
+
+    def _predict(self, batch_input):
+        """
+        STEP 4: Run one PatchTST forward pass over a batch of windows.
+        
+        Args:
+            batch_input (np.ndarray): Scaled inputs (N, 240, 6)
+        
+        Returns:
+            np.ndarray: Raw model predictions in scaled space (N, 60, 6)
+        """
+        model_input = batch_input.reshape(-1, self.context_length, self.num_features)
+        batch_predictions = self.engine(model_input)
+        
+        logger.debug("[Step 4] Model inference complete (%s engine, batch size %d), prediction shape: %s",
+                     self.engine.name, batch_input.shape[0], batch_predictions.shape)
+        self._trace("raw_predictions", batch_predictions, per_window=False)
+        return batch_predictions
+
+    def _postprocess(self, raw_predictions, scaled_input, raw_data, buffer_data):
+        """
+        STEP 5-6 for a single window (see _postprocess_batch).
+        
+        Returns:
+            results (dict), alerts (dict): Same structure as run_inference
+        """
+        return self._postprocess_batch(
+            raw_predictions[np.newaxis, :, :],
+            scaled_input[np.newaxis, :, :],
+            [raw_data],
+            [buffer_data]
+        )[0]
+
+    def _postprocess_batch(self, raw_predictions, scaled_inputs, raw_datas, windows):
+        """
+        STEP 5-6: Fit predictions into the lookback scale and score anomalies for a whole block.
+        
+        Args:
+            raw_predictions (np.ndarray): Model output (B, 60, 6)
+            scaled_inputs (np.ndarray): Scaled model inputs (B, 240, 6)
+            raw_datas (list of np.ndarray): Raw sensor values per window (240, 6)
+            windows (list): Original point lists per window (used for machine_id)
+        
+        Returns:
+            list of (results, alerts) tuples, one per window
+        """
+        self._log_rows("First 5 predictions (raw model output in scaled space, window 1)",
+                       raw_predictions[0], label="Step", fmt="{:+.4f}")
+        
+        # ============================================================
+        # STEP 5: POST-PROCESSING TRICK - FIT PREDICTIONS TO LOOKBACK SCALE
+        # ============================================================
+        # 5a: Remove outliers from raw predictions
+        pred_no_outliers = self._remove_prediction_outliers(raw_predictions, threshold=3.0)
+        self._trace("outlier_removed", pred_no_outliers, per_window=False)
+        
+        # 5b: Scale predictions to match input context (preserving first 3 predictions)
+        first_3_predictions = pred_no_outliers[:, :3, :]  # Keep outlier-removed values as-is
+        rest_57_predictions = pred_no_outliers[:, 3:, :]  # Scale these to match context
+        
+        # Scale only the last 57 points
+        scaled_57 = self._scale_predictions_to_context(rest_57_predictions, scaled_inputs, method='minmax')
+        
+        # Concatenate: first 3 (preserved) + 57 (scaled)
+        final_predictions = np.concatenate([first_3_predictions, scaled_57], axis=1)
+        
+        logger.debug("[Step 5] Post-processing complete (first 3 predictions preserved), final prediction shape: %s",
+                     final_predictions.shape)
+        self._log_rows("First 5 predictions (final model output fitted to SCALED input range, window 1)",
+                       final_predictions[0], label="Step")
+        self._trace("final_predictions", final_predictions, per_window=False)
+        
+        # ============================================================
+        # STEP 6: ANOMALY DETECTION
+        # ============================================================
+        # Inverse transform final predictions to get raw sensor values
+        if self.scaler is not None:
+            predictions_raw = self.scaler.inverse_transform(
+                final_predictions.reshape(-1, self.num_features)
+            ).reshape(final_predictions.shape)
+        else:
+            predictions_raw = final_predictions
+        self._trace("predictions_raw_units", predictions_raw, per_window=False)
+        
+        # Calculate anomaly scores based on predefined thresholds
+        anomaly_batch = self._calculate_anomaly_scores_batch(predictions_raw)
+        
+        outputs = []
+        for b, anomaly_results in enumerate(anomaly_batch):
             # ============================================================
             # RESULTS: Return both raw and final predictions
             # ============================================================
             results = {
-                "raw_predictions_scaled": raw_predictions,
-                "final_predictions": final_predictions,
-                "input_context_scaled": scaled_input,
-                "input_context_raw": raw_data
+                "raw_predictions_scaled": raw_predictions[b],
+                "final_predictions": final_predictions[b],
+                "input_context_scaled": scaled_inputs[b],
+                "input_context_raw": raw_datas[b]
             }
             
             # Original alerts (commented for reference):
@@ -248,67 +635,35 @@ class InferenceService:
                 "timestamp": datetime.now().isoformat(),
                 "anomaly_scores": anomaly_results["scores"],
                 "critical_features": anomaly_results["critical_features"],
-                "machine_id": buffer_data[0].get('machine_id', 'Unknown')  # Extract machine_id from buffer data
+                "machine_id": self._window_machine_id(windows[b]),  # Extract machine_id from buffer data
+                "model_version": self.model_version  # Model that produced this forecast
             }
-            
-            print("\n" + "="*80)
-            print("[InferenceService] Inference Pipeline Complete")
-            print("="*80)
-            
-            return results, alerts
+            outputs.append((results, alerts))
         
-        except Exception as e:
-            error_msg = f"Error during inference: {str(e)}"
-            print(f"❌ {error_msg}")
-            import traceback
-            traceback.print_exc()
-            return None, {"status": "error", "message": error_msg}
+        return outputs
     
     def _remove_prediction_outliers(self, predictions, threshold=3.0):
         """
         Remove/replace outliers in predictions using Z-score method.
         
         Args:
-            predictions (np.ndarray): Model predictions (60, 6)
+            predictions (np.ndarray): Model predictions (60, 6) or a batch (B, 60, 6)
             threshold (float): Z-score threshold for outlier detection
         
         Returns:
             np.ndarray: Predictions with outliers replaced by interpolated values
         """
-        cleaned = predictions.copy()
-        
-        for i in range(predictions.shape[1]):
-            col = predictions[:, i]
-            
-            # Calculate Z-scores
-            mean = np.mean(col)
-            std = np.std(col)
-            
-            if std > 1e-8:
-                z_scores = np.abs((col - mean) / std)
-                outlier_mask = z_scores > threshold
-                num_outliers = np.sum(outlier_mask)
-                
-                if num_outliers > 0:
-                    # Replace outliers with interpolated values
-                    col_cleaned = col.copy()
-                    col_cleaned[outlier_mask] = np.nan
-                    
-                    # Linear interpolation
-                    nans = np.isnan(col_cleaned)
-                    x = np.arange(len(col_cleaned))
-                    
-                    if np.sum(~nans) >= 2:  # Need at least 2 points for interpolation
-                        col_cleaned[nans] = np.interp(x[nans], x[~nans], col_cleaned[~nans])
-                    else:
-                        col_cleaned[nans] = mean
-                    
-                    cleaned[:, i] = col_cleaned
-                    print(f"       {self.feature_names[i]}: {num_outliers} outliers removed")
-                else:
-                    print(f"       {self.feature_names[i]}: No outliers detected")
-            else:
-                print(f"       {self.feature_names[i]}: No outliers detected (std too small)")
+        cleaned, outlier_counts, std_ok = remove_prediction_outliers(predictions, threshold=threshold)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            outlier_counts = np.atleast_2d(outlier_counts)
+            std_ok = np.atleast_2d(std_ok)
+            for b in range(outlier_counts.shape[0]):
+                summary = ", ".join([
+                    f"{name}={outlier_counts[b, i]}" if std_ok[b, i] else f"{name}=0 (std too small)"
+                    for i, name in enumerate(self.feature_names)
+                ])
+                logger.debug("   5a. Window %d outliers removed (threshold=%s): %s", b + 1, threshold, summary)
         
         return cleaned
     
@@ -317,85 +672,28 @@ class InferenceService:
         Scale predictions to match the statistical properties of the input context.
         
         Args:
-            predictions (np.ndarray): Model predictions (60, 6)
-            context (np.ndarray): Input context window (240, 6) - SCALED data
+            predictions (np.ndarray): Model predictions (60, 6) or a batch (B, 60, 6)
+            context (np.ndarray): Input context window (240, 6) or (B, 240, 6) - SCALED data
             method (str): 'minmax', 'robust', or 'zscore'
         
         Returns:
             np.ndarray: Predictions scaled to match context statistics
         """
-        scaled = np.zeros_like(predictions)
-        num_features = predictions.shape[1]
-    
-        # Use only last 15% of context
-        last_x_percent = int(context.shape[0] * 0.15)
-        recent_context = context[-last_x_percent:, :]
-
-        print(f"       Using last {last_x_percent} points ({last_x_percent}/{context.shape[0]}) for scaling range")
-    
+        scaled, stats = scale_predictions_to_context(predictions, context, method=method)
         
-        for i in range(num_features):
-            pred_col = predictions[:, i]
-            ctx_col = recent_context[:, i]
-            
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   5b. Using last %d points (%d/%d) for scaling range (%s)",
+                         stats['recent_points'], stats['recent_points'], context.shape[-2], method)
             if method == 'minmax':
-                # Min-max scaling to context range
-                # Use percentiles to stretch predictions and avoid clustering
-                pred_min = np.percentile(pred_col, 5)   # 5th percentile (ignore bottom 5%)
-                pred_max = np.percentile(pred_col, 95)  # 95th percentile (ignore top 5%)
-                
-                # Fallback to actual min/max if percentiles are too close (predictions are very uniform)
-                if (pred_max - pred_min) < 1e-8:
-                    pred_min = pred_col.min()
-                    pred_max = pred_col.max()
-                
-                # Original method (commented for reference):
-                # pred_min = pred_col.min()
-                # pred_max = pred_col.max()
-                
-                ctx_min = ctx_col.min()
-                ctx_max = ctx_col.max()
-                
-                if (pred_max - pred_min) > 1e-8:
-                    # Normalize predictions to [0, 1] using percentiles
-                    normalized = (pred_col - pred_min) / (pred_max - pred_min)
-                    # Scale to context range
-                    scaled[:, i] = normalized * (ctx_max - ctx_min) + ctx_min
-                else:
-                    # If predictions are constant, use context midpoint
-                    scaled[:, i] = np.full_like(pred_col, (ctx_max + ctx_min) / 2)
-                
-                print(f"       {self.feature_names[i]}: scaled from [{pred_min:.4f}, {pred_max:.4f}] (5th-95th percentile) to [{ctx_min:.4f}, {ctx_max:.4f}]")
-            
-            elif method == 'robust':
-                # Robust scaling using median and IQR
-                pred_median = np.median(pred_col)
-                pred_iqr = np.percentile(pred_col, 75) - np.percentile(pred_col, 25)
-                ctx_median = np.median(ctx_col)
-                ctx_iqr = np.percentile(ctx_col, 75) - np.percentile(ctx_col, 25)
-                
-                if pred_iqr > 1e-8:
-                    robust_scaled = (pred_col - pred_median) / pred_iqr
-                    scaled[:, i] = robust_scaled * ctx_iqr + ctx_median
-                else:
-                    scaled[:, i] = np.full_like(pred_col, ctx_median)
-                
-                print(f"       {self.feature_names[i]}: scaled using robust statistics")
-            
-            elif method == 'zscore':
-                # Z-score scaling: match mean and std
-                pred_mean = pred_col.mean()
-                pred_std = pred_col.std()
-                ctx_mean = ctx_col.mean()
-                ctx_std = ctx_col.std()
-                
-                if pred_std > 1e-8:
-                    standardized = (pred_col - pred_mean) / pred_std
-                    scaled[:, i] = standardized * ctx_std + ctx_mean
-                else:
-                    scaled[:, i] = np.full_like(pred_col, ctx_mean)
-                
-                print(f"       {self.feature_names[i]}: scaled using z-score")
+                pred_low = np.atleast_2d(stats["pred_low"])
+                pred_high = np.atleast_2d(stats["pred_high"])
+                ctx_low = np.atleast_2d(stats["ctx_low"])
+                ctx_high = np.atleast_2d(stats["ctx_high"])
+                for b in range(pred_low.shape[0]):
+                    logger.debug("\n".join([
+                        f"       {name}: scaled from [{pred_low[b, i]:.4f}, {pred_high[b, i]:.4f}] (5th-95th percentile) to [{ctx_low[b, i]:.4f}, {ctx_high[b, i]:.4f}]"
+                        for i, name in enumerate(self.feature_names)
+                    ]))
         
         return scaled
     
@@ -423,65 +721,57 @@ class InferenceService:
                 "critical_features": list
             }
         """
-        # Define thresholds for each feature
-        thresholds = {
-            'current': {'max': 3.5},
-            'tempA': {'max': 45.0},
-            'tempB': {'max': 45.0},
-            'accX': {'min': -4.0, 'max': 0.7},
-            'accY': {'min': -4.0, 'max': 0.7},
-            'accZ': {'min': 8.5, 'max': 12.5}
-        }
-        
-        num_predictions = predictions_raw.shape[0]  # 60
-        critical_threshold_percentage = 30.0  # 30% = 18 points
+        return self._calculate_anomaly_scores_batch(predictions_raw[np.newaxis, :, :])[0]
+    
+    def _calculate_anomaly_scores_batch(self, predictions_raw):
+        """
+        Calculate anomaly scores for a whole forecast block in one pass.
         
-        scores = {}
-        critical_features = []
+        Thresholds are the precomputed min/max vectors in services.postprocessing.
         
-        print(f"\n   Anomaly Detection Results:")
+        Args:
+            predictions_raw (np.ndarray): Predictions in original sensor units (B, 60, 6)
         
-        for i, feature in enumerate(self.feature_names):
-            feature_values = predictions_raw[:, i]
-            threshold = thresholds[feature]
-            
-            # Count points exceeding threshold
-            exceeding_count = 0
+        Returns:
+            list of dict: One _calculate_anomaly_scores result per window
+        """
+        exceeding_counts, percentages = calculate_exceedance(predictions_raw)
+        is_critical = percentages >= CRITICAL_THRESHOLD_PERCENTAGE
+        num_predictions = predictions_raw.shape[1]  # 60
+        self._trace("exceedance_percentages", percentages, per_window=False)
+        
+        anomaly_batch = []
+        for b in range(predictions_raw.shape[0]):
+            scores = {}
+            critical_features = []
             
-            if 'min' in threshold and 'max' in threshold:
-                # Range check (accX, accY, accZ)
-                exceeding_count = np.sum((feature_values < threshold['min']) | (feature_values > threshold['max']))
-            elif 'max' in threshold:
-                # Upper limit only (current, tempA, tempB)
-                exceeding_count = np.sum(feature_values > threshold['max'])
+            for i, feature in enumerate(self.feature_names):
+                scores[feature] = round(percentages[b, i], 2)
+                if is_critical[b, i]:
+                    critical_features.append(feature)
+                
+            # Determine overall machine status
+            machine_at_risk = len(critical_features) > 0
             
-            # Calculate percentage
-            percentage = (exceeding_count / num_predictions) * 100
-            scores[feature] = round(percentage, 2)
+            if machine_at_risk:
+                critical_list = ", ".join([f"{feat} ({scores[feat]:.2f}%)" for feat in critical_features])
+                message = f"⚠️ Machine condition at risk. Critical features: {critical_list}"
+            else:
+                message = "✅ Machine condition normal. All features within acceptable ranges."
             
-            # Check if critical
-            is_critical = percentage >= critical_threshold_percentage
-            if is_critical:
-                critical_features.append(feature)
+            if logger.isEnabledFor(logging.DEBUG):
+                lines = ["[Step 6] Anomaly Detection Results:"]
+                for i, feature in enumerate(self.feature_names):
+                    status_icon = "⚠️ CRITICAL" if is_critical[b, i] else "✅ Normal"
+                    lines.append(f"       {feature:10s}: {exceeding_counts[b, i]}/{num_predictions} points exceed threshold ({percentages[b, i]:.2f}%) {status_icon}")
+                lines.append(f"   {message}")
+                logger.debug("\n".join(lines))
             
-            # Print result
-            status_icon = "⚠️ CRITICAL" if is_critical else "✅ Normal"
-            print(f"       {feature:10s}: {exceeding_count}/{num_predictions} points exceed threshold ({percentage:.2f}%) {status_icon}")
-        
-        # Determine overall machine status
-        machine_at_risk = len(critical_features) > 0
-        
-        if machine_at_risk:
-            critical_list = ", ".join([f"{feat} ({scores[feat]:.2f}%)" for feat in critical_features])
-            message = f"⚠️ Machine condition at risk. Critical features: {critical_list}"
-            print(f"\n   {message}")
-        else:
-            message = "✅ Machine condition normal. All features within acceptable ranges."
-            print(f"\n   {message}")
-        
-        return {
-            "machine_at_risk": machine_at_risk,
-            "message": message,
-            "scores": scores,
-            "critical_features": critical_features
-        }
+            anomaly_batch.append({
+                "machine_at_risk": machine_at_risk,
+                "message": message,
+                "scores": scores,
+                "critical_features": critical_features
+            })
+        
+        return anomaly_batch
@@ -0,0 +1,243 @@
+# services/influx_gateway.py
+"""
+Shared InfluxDB query layer of the streamer.
+
+One InfluxDBClient (and, on the asyncio path, one InfluxDBClientAsync) is created per streamer and
+its query API object is reused for every query, so all queries go over the client's persistent
+keep-alive connection pool instead of rebuilding the API wrapper each call. Every request is
+bounded by the client timeout.
+
+Queries pass through a circuit breaker: after `failure_threshold` consecutive failures the circuit
+opens and queries are refused (without touching the network) until a jittered, exponentially
+growing backoff delay has passed; then a single trial query is let through (half-open). While
+the circuit is open the streamer keeps serving its last good buffers.
+"""
+
+import logging
+import random
+import threading
+import time
+from influxdb_client import InfluxDBClient
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """A query was refused because the circuit is open (InfluxDB considered down)."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with jittered exponential backoff.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit
+        base_delay (float): Backoff after the circuit first opens (seconds)
+        max_delay (float): Backoff cap (seconds)
+        jitter (float): Fraction of the delay that is randomized (0 = none, 1 = anywhere in [0, delay])
+        clock (callable): Monotonic clock (injectable for tests)
+    """
+
+    def __init__(self, failure_threshold=3, base_delay=5.0, max_delay=300.0, jitter=0.5, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.times_opened = 0
+        self.refused = 0
+        self.last_error = None
+        self._retry_at = None
+        self._last_success = None
+
+    def allow(self):
+        """
+        Whether a query may be sent now. An open circuit whose backoff has passed lets one trial
+        query through (half-open); everything else is refused until that trial reports back, or
+        for another base_delay if it never does (e.g. the query task was cancelled).
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self._clock()
+            if now >= self._retry_at:
+                self.state = HALF_OPEN
+                self._retry_at = now + self.base_delay
+                logger.info("[Influx] Circuit half-open: sending a trial query")
+                return True
+            self.refused += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("✅ [Influx] Circuit closed: InfluxDB is answering again")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._retry_at = None
+            self._last_success = self._clock()
+
+    def record_failure(self, error):
+        """
+        Count a failed query; opens (or re-opens) the circuit once the threshold is reached.
+
+        Returns:
+            float: Seconds until the next query is allowed (0 while the circuit stays closed)
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self.total_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            if self.state == CLOSED and self.consecutive_failures < self.failure_threshold:
+                return 0.0
+            if self.state == CLOSED:
+                self.times_opened += 1
+                logger.warning("⚠️ [Influx] Circuit open after %d consecutive failures (%s)",
+                               self.consecutive_failures, self.last_error)
+            self.state = OPEN
+            delay = self._backoff_delay()
+            self._retry_at = self._clock() + delay
+            return delay
+
+    def _backoff_delay(self):
+        attempt = self.consecutive_failures - self.failure_threshold
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempt, 0))
+        return delay * (1 - self.jitter * self._rng.random())
+
+    def retry_in(self):
+        """Seconds until an open circuit allows a trial query (0 if queries are allowed)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self._retry_at - self._clock())
+
+    def status(self):
+        """
+        Breaker state for /inference/status.
+
+        Returns:
+            dict: state, failure counters, seconds until retry, last error and seconds since the last success
+        """
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "total_failures": self.total_failures,
+                "times_opened": self.times_opened,
+                "refused_queries": self.refused,
+                "retry_in_seconds": round(retry_in, 2),
+                "last_error": self.last_error,
+                "seconds_since_success": round(self._clock() - self._last_success, 2) if self._last_success is not None else None,
+            }
+
+
+class InfluxGateway:
+    """
+    Owns the InfluxDB clients, their shared query APIs and the circuit breaker.
+
+    Args:
+        url (str): InfluxDB URL
+        token (str): API token
+        org (str): Organization
+        timeout_seconds (float): Per-request timeout applied by both clients
+        pool_size (int): Max keep-alive connections of the sync client
+        breaker (CircuitBreaker): Breaker shared by the sync and async paths (default: CircuitBreaker())
+    """
+
+    def __init__(self, url, token, org, timeout_seconds=10.0, pool_size=4, breaker=None):
+        self.url = url
+        self.token = token
+        self.org = org
+        self.timeout_ms = int(timeout_seconds * 1000)
+        self.breaker = breaker or CircuitBreaker()
+        self._client = InfluxDBClient(url=url, token=token, org=org, timeout=self.timeout_ms,
+                                      connection_pool_maxsize=pool_size)
+        self._async_client = None
+        self._query_api = None
+        self._async_query_api = None
+
+    @property
+    def client(self):
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self._query_api = None
+
+    @property
+    def async_client(self):
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, client):
+        self._async_client = client
+        self._async_query_api = None
+
+    def open_async(self):
+        """Create the async client on first use (needs the influxdb-client[async] extra, i.e. aiohttp)."""
+        if self._async_client is None:
+            from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
+            self.async_client = InfluxDBClientAsync(url=self.url, token=self.token, org=self.org, timeout=self.timeout_ms)
+        return self._async_client
+
+    async def close_async(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self.async_client = None
+
+    def query_raw(self, query):
+        """
+        Run a Flux query on the shared sync query API.
+
+        Returns:
+            bytes: Annotated CSV body
+
+        Raises:
+            CircuitOpenError: The circuit is open; nothing was sent
+        """
+        self._check_circuit()
+        if self._query_api is None:
+            self._query_api = self._client.query_api()
+        try:
+            response = self._query_api.query_raw(query)
+            try:
+                body = response.data
+            finally:
+                response.release_conn()
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return body
+
+    async def query_raw_async(self, query):
+        """
+        Async counterpart of query_raw() on the shared async query API.
+
+        Returns:
+            str: Annotated CSV body
+        """
+        self._check_circuit()
+        if self._async_query_api is None:
+            self._async_query_api = self._async_client.query_api()
+        try:
+            text = await self._async_query_api.query_raw(query)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return text
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"InfluxDB circuit open, retry in {self.breaker.retry_in():.1f}s")
@@ -0,0 +1,45 @@
+# services/machine_state.py
+"""
+Per-machine state of the fleet streamer: the machine's ring buffer, its ingestion cursor and its
+latest inference outputs. One fleet-wide query per cycle is demultiplexed into these.
+"""
+
+from services.sensor_buffer import SensorRingBuffer
+from services.sensor_window import epoch_ns_to_datetime
+
+
+class MachineState:
+    """
+    Buffer, cursor and last results for one machine_id.
+
+    Args:
+        machine_id (str): InfluxDB machine_id tag
+        buffer_size (int): Ring buffer capacity (points)
+    """
+
+    def __init__(self, machine_id, buffer_size):
+        self.machine_id = machine_id
+        self.buffer = SensorRingBuffer(buffer_size, machine_id)
+        self.cursor = None  # epoch ns of the newest buffered point
+        self.last_results = None
+        self.last_alerts = None
+        self.inference_count = 0
+        self.coverage = None  # resampling report of the last inference window
+        self.skipped_inferences = 0  # cycles skipped for low window coverage
+
+    def status(self):
+        """
+        Summary for the /machines endpoint.
+        """
+        alerts = self.last_alerts or {}
+        return {
+            "machine_id": self.machine_id,
+            "buffer_size": len(self.buffer),
+            "cursor": epoch_ns_to_datetime(self.cursor).isoformat() if self.cursor is not None else None,
+            "inference_count": self.inference_count,
+            "coverage": self.coverage,
+            "skipped_inferences": self.skipped_inferences,
+            "status": alerts.get("status"),
+            "message": alerts.get("message"),
+            "last_inference_time": alerts.get("timestamp"),
+        }
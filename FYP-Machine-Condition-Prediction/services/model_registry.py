@@ -0,0 +1,177 @@
+# services/model_registry.py
+"""
+Registry of the model variants under AI-Model-Artifacts/.
+
+Each variant directory holds patchtst_sensor_multivar/ (config.json + model.safetensors) and
+optionally scaler.pkl. The registry loads a variant into a complete InferenceService (model,
+scaler and engine together) off the inference path, warms it up, and then swaps the active
+reference in one assignment. An inference cycle takes the reference once, so it always runs on one
+consistent model/scaler pair; cycles already running finish on the old version and the ones after
+the swap run on the new version. Background loads go through the inference executor, so they take
+their turn between inference cycles instead of competing with them for the CPU.
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AI-Model-Artifacts")
+DEFAULT_VARIANT = "CustomLoss"
+MODEL_DIR_NAME = "patchtst_sensor_multivar"
+
+
+class ModelRegistry:
+    """
+    Discovers model variants and holds the active InferenceService.
+
+    Args:
+        root_dir (str): Directory containing one sub-directory per variant (default: AI-Model-Artifacts)
+        default_variant (str): Variant loaded by load_default()
+        executor (InferenceExecutor): Runs activate_async() loads on the model worker (None = a background thread)
+        service_kwargs: Passed to every InferenceService (smoothing_mode, engine, precision, ...)
+    """
+
+    def __init__(self, root_dir=None, default_variant=DEFAULT_VARIANT, executor=None, **service_kwargs):
+        self.root_dir = os.path.abspath(root_dir or DEFAULT_ARTIFACTS_DIR)
+        self.default_variant = default_variant
+        self.executor = executor
+        self.service_kwargs = service_kwargs
+
+        self._active = None
+        self._swap_lock = threading.Lock()  # one load/swap at a time; readers never take it
+        self._state_lock = threading.Lock()  # guards loading_variant (held only briefly)
+        self.loading_variant = None
+        self.last_error = None
+        self.swap_count = 0
+        self.last_swap_time = None
+
+    @property
+    def active(self):
+        """The active InferenceService (None before the first load)."""
+        return self._active
+
+    def discover(self):
+        """
+        List the variants available under root_dir.
+
+        Returns:
+            list of dict: name, path, weights format, whether a scaler is present and whether it is active
+        """
+        variants = []
+        if not os.path.isdir(self.root_dir):
+            return variants
+        for name in sorted(os.listdir(self.root_dir)):
+            model_path = os.path.join(self.root_dir, name, MODEL_DIR_NAME)
+            if not os.path.isfile(os.path.join(model_path, "config.json")):
+                continue
+            if os.path.exists(os.path.join(model_path, "model.safetensors")):
+                weights = "safetensors"
+            elif os.path.exists(os.path.join(model_path, "pytorch_model.bin")):
+                weights = "pytorch_bin"
+            else:
+                weights = None
+            variants.append({
+                "name": name,
+                "path": os.path.join(self.root_dir, name),
+                "weights": weights,
+                "has_scaler": os.path.exists(os.path.join(self.root_dir, name, "scaler.pkl")),
+                "active": self._active is not None and self._active.model_variant == name,
+            })
+        return variants
+
+    def load(self, variant):
+        """
+        Build and warm up an InferenceService for a variant without activating it.
+
+        Returns:
+            InferenceService
+        """
+        from services.inference_service_3 import InferenceService
+
+        base_dir = os.path.join(self.root_dir, variant)
+        if not os.path.isdir(os.path.join(base_dir, MODEL_DIR_NAME)):
+            raise ValueError(f"Unknown model variant '{variant}' (no {MODEL_DIR_NAME}/ under {self.root_dir})")
+        service = InferenceService(base_dir=base_dir, **self.service_kwargs)
+        service.warm_up()
+        return service
+
+    def activate(self, variant):
+        """
+        Load a variant and make it the active model.
+
+        Returns:
+            InferenceService: The newly active service
+        """
+        with self._swap_lock:
+            with self._state_lock:
+                self.loading_variant = variant
+            start = time.perf_counter()
+            try:
+                service = self.load(variant)
+            except Exception as e:
+                self.last_error = f"{variant}: {e}"
+                logger.error("❌ [ModelRegistry] Failed to load variant '%s': %s", variant, e)
+                raise
+            finally:
+                with self._state_lock:
+                    self.loading_variant = None
+
+            previous = self._active
+            self._active = service  # atomic reference swap
+            self.last_error = None
+            self.swap_count += 1
+            self.last_swap_time = time.time()
+            logger.info("✅ [ModelRegistry] Active model %s -> %s (loaded in %.2fs)",
+                        previous.model_version if previous else None, service.model_version,
+                        time.perf_counter() - start)
+            return service
+
+    def activate_async(self, variant):
+        """
+        Load and activate a variant in the background: queued to the executor (so loading and
+        warm-up share the model worker's thread budget and never overlap a forward pass), or on
+        a background thread when the registry has no executor.
+
+        Returns:
+            bool: False if another load is already in progress
+        """
+        with self._state_lock:
+            if self.loading_variant is not None:
+                return False
+            self.loading_variant = variant  # claimed until activate() finishes
+
+        def _run():
+            try:
+                self.activate(variant)
+            except Exception:
+                pass  # recorded in last_error
+
+        try:
+            if self.executor is not None:
+                self.executor.submit(_run)
+            else:
+                threading.Thread(target=_run, name=f"model-load-{variant}", daemon=True).start()
+        except Exception:
+            with self._state_lock:
+                self.loading_variant = None
+            raise
+        return True
+
+    def status(self):
+        """
+        Registry state for the API.
+        """
+        active = self._active
+        return {
+            "root_dir": self.root_dir,
+            "active_variant": active.model_variant if active else None,
+            "active_version": active.model_version if active else None,
+            "loading_variant": self.loading_variant,
+            "last_error": self.last_error,
+            "swap_count": self.swap_count,
+            "last_swap_time": self.last_swap_time,
+            "variants": self.discover(),
+        }
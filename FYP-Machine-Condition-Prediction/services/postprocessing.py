@@ -0,0 +1,174 @@
+# services/postprocessing.py
+"""
+Vectorized post-processing kernels for PatchTST forecasts.
+
+Every kernel works on a whole forecast block of shape (B, T, F) at once, so post-processing
+cost stays flat when many machines are scored in one batch. The kernels reproduce the original
+per-column loops bit-for-bit: per-series statistics are reduced over contiguous
+channel-major copies (same summation order as a single column), and percentiles are taken
+with scalar q so they keep the input dtype.
+"""
+
+import numpy as np
+
+FEATURE_NAMES = ['current', 'tempA', 'tempB', 'accX', 'accY', 'accZ']
+
+# Anomaly thresholds in raw sensor units, in FEATURE_NAMES order.
+# Upper-limit-only features (current, tempA, tempB) use -inf as their lower bound.
+THRESHOLD_MIN = np.array([-np.inf, -np.inf, -np.inf, -4.0, -4.0, 8.5])
+THRESHOLD_MAX = np.array([3.5, 45.0, 45.0, 0.7, 0.7, 12.5])
+
+# Machine is at risk if ANY feature exceeds its threshold in >= 30% of forecast steps
+CRITICAL_THRESHOLD_PERCENTAGE = 30.0
+
+
+def _as_batch(array):
+    """Promote a single (T, F) window to a (1, T, F) block."""
+    return array[np.newaxis, :, :] if array.ndim == 2 else array
+
+
+def _series_major(block):
+    """Contiguous (B, F, T) copy so per-series reductions match a single-column reduction."""
+    return np.ascontiguousarray(block.transpose(0, 2, 1))
+
+
+def remove_prediction_outliers(predictions, threshold=3.0):
+    """
+    Replace Z-score outliers in each forecast series with linearly interpolated values.
+
+    Args:
+        predictions (np.ndarray): Forecast block (B, T, F) or single forecast (T, F)
+        threshold (float): Z-score threshold for outlier detection
+
+    Returns:
+        cleaned (np.ndarray): Same shape as predictions with outliers replaced
+        outlier_counts (np.ndarray): Number of outliers per series (B, F)
+        std_ok (np.ndarray): False where a series was too flat to test (B, F)
+    """
+    single = predictions.ndim == 2
+    block = _as_batch(predictions)
+    series = _series_major(block)
+
+    mean = series.mean(axis=-1)
+    std = series.std(axis=-1)
+    std_ok = std > 1e-8
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_scores = np.abs((series - mean[..., np.newaxis]) / std[..., np.newaxis])
+    outlier_mask = (z_scores > threshold) & std_ok[..., np.newaxis]
+    outlier_counts = outlier_mask.sum(axis=-1)
+
+    cleaned = block.copy()
+    # Outliers are rare, so interpolation only touches the affected series
+    x = np.arange(block.shape[1])
+    for b, i in zip(*np.nonzero(outlier_counts)):
+        col_cleaned = block[b, :, i].copy()
+        nans = outlier_mask[b, i]
+        if np.sum(~nans) >= 2:  # Need at least 2 points for interpolation
+            col_cleaned[nans] = np.interp(x[nans], x[~nans], col_cleaned[~nans])
+        else:
+            col_cleaned[nans] = mean[b, i]
+        cleaned[b, :, i] = col_cleaned
+
+    if single:
+        return cleaned[0], outlier_counts[0], std_ok[0]
+    return cleaned, outlier_counts, std_ok
+
+
+def scale_predictions_to_context(predictions, context, method='robust', context_fraction=0.15):
+    """
+    Scale each forecast series to match the statistics of the recent input context.
+
+    Args:
+        predictions (np.ndarray): Forecast block (B, T, F) or single forecast (T, F)
+        context (np.ndarray): Scaled input context (B, L, F) or (L, F)
+        method (str): 'minmax', 'robust', or 'zscore'
+        context_fraction (float): Fraction of the most recent context used for the target range
+
+    Returns:
+        scaled (np.ndarray): Same shape as predictions
+        stats (dict): Per-series source/target bounds (B, F) used for the scaling
+    """
+    single = predictions.ndim == 2
+    pred = _as_batch(predictions)
+    ctx = _as_batch(context)
+
+    recent_points = int(ctx.shape[1] * context_fraction)
+    recent_context = ctx[:, -recent_points:, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'minmax':
+            # Percentiles stretch predictions and avoid clustering; fall back to min/max when flat
+            pred_low = np.percentile(pred, 5, axis=1)
+            pred_high = np.percentile(pred, 95, axis=1)
+            flat = (pred_high - pred_low) < 1e-8
+            pred_low = np.where(flat, pred.min(axis=1), pred_low)
+            pred_high = np.where(flat, pred.max(axis=1), pred_high)
+
+            ctx_low = recent_context.min(axis=1)
+            ctx_high = recent_context.max(axis=1)
+
+            pred_range = pred_high - pred_low
+            normalized = (pred - pred_low[:, np.newaxis, :]) / pred_range[:, np.newaxis, :]
+            stretched = normalized * (ctx_high - ctx_low)[:, np.newaxis, :] + ctx_low[:, np.newaxis, :]
+            # Constant predictions collapse to the context midpoint
+            midpoint = (ctx_high + ctx_low) / 2
+            scaled = np.where((pred_range > 1e-8)[:, np.newaxis, :], stretched, midpoint[:, np.newaxis, :])
+
+        elif method == 'robust':
+            pred_low = np.median(pred, axis=1)
+            pred_high = np.percentile(pred, 75, axis=1) - np.percentile(pred, 25, axis=1)
+            ctx_low = np.median(recent_context, axis=1)
+            ctx_high = np.percentile(recent_context, 75, axis=1) - np.percentile(recent_context, 25, axis=1)
+
+            robust_scaled = (pred - pred_low[:, np.newaxis, :]) / pred_high[:, np.newaxis, :]
+            stretched = robust_scaled * ctx_high[:, np.newaxis, :] + ctx_low[:, np.newaxis, :]
+            scaled = np.where((pred_high > 1e-8)[:, np.newaxis, :], stretched, ctx_low[:, np.newaxis, :])
+
+        elif method == 'zscore':
+            pred_series = _series_major(pred)
+            ctx_series = _series_major(recent_context)
+            pred_low = pred_series.mean(axis=-1)
+            pred_high = pred_series.std(axis=-1)
+            ctx_low = ctx_series.mean(axis=-1)
+            ctx_high = ctx_series.std(axis=-1)
+
+            standardized = (pred - pred_low[:, np.newaxis, :]) / pred_high[:, np.newaxis, :]
+            stretched = standardized * ctx_high[:, np.newaxis, :] + ctx_low[:, np.newaxis, :]
+            scaled = np.where((pred_high > 1e-8)[:, np.newaxis, :], stretched, ctx_low[:, np.newaxis, :])
+
+        else:
+            raise ValueError(f"Unknown scaling method: {method}")
+
+    scaled = scaled.astype(pred.dtype, copy=False)
+    stats = {
+        "recent_points": recent_points,
+        "pred_low": pred_low,
+        "pred_high": pred_high,
+        "ctx_low": ctx_low,
+        "ctx_high": ctx_high,
+    }
+    if single:
+        return scaled[0], {k: (v[0] if isinstance(v, np.ndarray) else v) for k, v in stats.items()}
+    return scaled, stats
+
+
+def calculate_exceedance(predictions_raw):
+    """
+    Count forecast steps outside the healthy band for every series.
+
+    Args:
+        predictions_raw (np.ndarray): Forecast block in sensor units (B, T, F) or (T, F)
+
+    Returns:
+        exceeding_counts (np.ndarray): Steps outside the band per series (B, F)
+        percentages (np.ndarray): Same as a percentage of the horizon (B, F)
+    """
+    block = _as_batch(predictions_raw)
+    outside = (block < THRESHOLD_MIN) | (block > THRESHOLD_MAX)
+    exceeding_counts = outside.sum(axis=1)
+    percentages = (exceeding_counts / block.shape[1]) * 100
+
+    if predictions_raw.ndim == 2:
+        return exceeding_counts[0], percentages[0]
+    return exceeding_counts, percentages
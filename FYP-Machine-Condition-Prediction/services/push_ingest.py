@@ -0,0 +1,182 @@
+# services/push_ingest.py
+"""
+Parsing for the push ingestion endpoint (POST /ingest).
+
+Readings pushed by the sensor gateway go straight into the streamer's buffers instead of
+waiting for the next InfluxDB poll. Two body formats are accepted:
+
+- InfluxDB line protocol, the same lines the simulator writes to Influx:
+      machine_metrics,machine_id=m1 current=2.5,tempA=35.1,tempB=34.8,accX=-0.4,accY=0.1,accZ=9.8 1735689600000000000
+- JSON, either {"<machine_id>": [reading, ...], ...} or a flat [reading, ...] where each reading
+  carries its own "machine_id". A reading holds "timestamp" (ISO-8601 string or epoch number in
+  the request precision) and the six sensor fields.
+
+Both parsers return machine_id -> SensorWindow, sorted by time, with one point per timestamp (a
+reading repeated within a batch keeps its last occurrence). Non-finite values (NaN, inf) are
+stored as missing, like a field that was not sent, and are never written back to InfluxDB.
+"""
+
+import math
+import re
+import time
+import numpy as np
+from services.sensor_window import SensorWindow, FEATURE_NAMES, datetime_to_epoch_ns
+
+MEASUREMENT = "machine_metrics"
+
+# Nanoseconds per unit of the ?precision= query parameter (as in the InfluxDB write API)
+PRECISION_NS = {"ns": 1, "us": 1_000, "ms": 1_000_000, "s": 1_000_000_000}
+
+_FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+_UNESCAPED_SPACE = re.compile(r"(?<!\\) ")
+_UNESCAPED_COMMA = re.compile(r"(?<!\\),")
+_UNESCAPE = re.compile(r"\\([ ,=\\])")
+
+
+class PushFormatError(ValueError):
+    """Malformed push body; the message names the offending line or reading."""
+
+
+def parse_line_protocol(text, precision="ns", measurement=MEASUREMENT):
+    """
+    Parse line protocol into per-machine windows.
+
+    Lines of other measurements and non-sensor fields are ignored; a point without a timestamp is
+    stamped with the server time. Fields missing from a line and non-finite values become NaN.
+
+    Args:
+        text (str): Request body, one point per line
+        precision (str): Timestamp unit: 'ns', 'us', 'ms' or 's'
+
+    Returns:
+        dict: machine_id -> SensorWindow
+    """
+    scale = _precision_scale(precision)
+    rows = {}  # machine_id -> (timestamps, value rows)
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = _UNESCAPED_SPACE.split(line)
+        if len(parts) not in (2, 3):
+            raise PushFormatError(f"line {line_no}: expected '<measurement>,<tags> <fields> [timestamp]'")
+        series = _UNESCAPED_COMMA.split(parts[0])
+        if _unescape(series[0]) != measurement:
+            continue
+        tags = dict(_split_pair(item, line_no) for item in series[1:])
+        machine_id = tags.get("machine_id")
+        if not machine_id:
+            raise PushFormatError(f"line {line_no}: missing machine_id tag")
+
+        fields = dict(_split_pair(item, line_no) for item in _UNESCAPED_COMMA.split(parts[1]))
+        try:
+            values = [float(fields[name].rstrip("iu")) if name in fields else np.nan for name in FEATURE_NAMES]
+            timestamp = int(parts[2]) * scale if len(parts) == 3 else time.time_ns()
+        except ValueError as e:
+            raise PushFormatError(f"line {line_no}: {e}") from None
+
+        timestamps, value_rows = rows.setdefault(machine_id, ([], []))
+        timestamps.append(timestamp)
+        value_rows.append(values)
+    return _to_windows(rows)
+
+
+def parse_json_readings(payload, precision="ns"):
+    """
+    Parse a JSON push body into per-machine windows.
+
+    Args:
+        payload (dict or list): {"<machine_id>": [reading, ...]} or [reading with machine_id, ...]
+        precision (str): Unit of numeric timestamps: 'ns', 'us', 'ms' or 's'
+
+    Returns:
+        dict: machine_id -> SensorWindow
+    """
+    scale = _precision_scale(precision)
+    if isinstance(payload, dict):
+        readings = ((machine_id, reading) for machine_id, items in payload.items() for reading in _as_list(items, machine_id))
+    elif isinstance(payload, list):
+        readings = ((reading.get("machine_id") if isinstance(reading, dict) else None, reading) for reading in payload)
+    else:
+        raise PushFormatError("expected an object keyed by machine_id or an array of readings")
+
+    rows = {}
+    for index, (machine_id, reading) in enumerate(readings):
+        if not isinstance(reading, dict) or not machine_id:
+            raise PushFormatError(f"reading {index}: expected an object with a machine_id")
+        try:
+            timestamp = reading.get("timestamp")
+            if timestamp is None:
+                timestamp = time.time_ns()
+            elif isinstance(timestamp, str):
+                timestamp = datetime_to_epoch_ns(timestamp)
+            else:
+                timestamp = int(timestamp) * scale
+            values = [float(reading[name]) if reading.get(name) is not None else np.nan for name in FEATURE_NAMES]
+        except (TypeError, ValueError) as e:
+            raise PushFormatError(f"reading {index}: {e}") from None
+
+        timestamps, value_rows = rows.setdefault(str(machine_id), ([], []))
+        timestamps.append(timestamp)
+        value_rows.append(values)
+    return _to_windows(rows)
+
+
+def to_line_protocol(windows, measurement=MEASUREMENT):
+    """
+    Serialize windows as line protocol with nanosecond timestamps (for write-through to InfluxDB).
+
+    Returns:
+        str: One line per point
+    """
+    lines = []
+    for machine_id, window in windows.items():
+        tag = _escape(str(machine_id))
+        for ns, row in zip(window.timestamps.tolist(), window.values.tolist()):
+            fields = ",".join(f"{name}={value!r}" for name, value in zip(FEATURE_NAMES, row) if math.isfinite(value))
+            if fields:  # missing (NaN) and infinite fields are left out: line protocol has no literal for them
+                lines.append(f"{measurement},machine_id={tag} {fields} {ns}")
+    return "\n".join(lines)
+
+
+def _to_windows(rows):
+    windows = {}
+    for machine_id, (timestamps, value_rows) in rows.items():
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        values = np.asarray(value_rows, dtype=np.float64)
+        values[~(np.abs(values) <= _FLOAT32_MAX)] = np.nan  # inf (or beyond float32) is not a reading
+        values = values.astype(np.float32)
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+        # Same timestamp more than once in the batch: the stable sort keeps input order, so the last one wins
+        last = np.append(timestamps[1:] != timestamps[:-1], True)
+        windows[machine_id] = SensorWindow(timestamps[last], values[last], machine_id)
+    return windows
+
+
+def _precision_scale(precision):
+    if precision not in PRECISION_NS:
+        raise PushFormatError(f"precision must be one of {tuple(PRECISION_NS)}, got '{precision}'")
+    return PRECISION_NS[precision]
+
+
+def _as_list(items, machine_id):
+    if not isinstance(items, list):
+        raise PushFormatError(f"readings for '{machine_id}' must be an array")
+    return items
+
+
+def _split_pair(item, line_no):
+    key, sep, value = item.partition("=")
+    if not sep:
+        raise PushFormatError(f"line {line_no}: expected key=value, got '{item}'")
+    return _unescape(key), _unescape(value)
+
+
+def _unescape(text):
+    return _UNESCAPE.sub(r"\1", text)
+
+
+def _escape(text):
+    return re.sub(r"([ ,=\\])", r"\\\1", text)
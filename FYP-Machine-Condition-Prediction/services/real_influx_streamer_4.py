@@ -1,16 +1,39 @@
 # services/real_influx_streamer_4.py
+import asyncio
+import collections
+import logging
+import os
+import queue
+import re
 import time
-from datetime import datetime
-from collections import deque
+from datetime import datetime, timedelta
 import threading
-from influxdb_client import InfluxDBClient
-from services.inference_service_3 import InferenceService
 from services.email_service import EmailNotificationService
+from services.inference_executor import InferenceExecutor
+from services.model_registry import ModelRegistry, DEFAULT_VARIANT
+from services.flux_csv import read_grouped_columns, format_epoch_ns
+from services.sensor_window import SensorWindow, FEATURE_NAMES, epoch_ns_to_datetime, datetime_to_epoch_ns
+from services.machine_state import MachineState
+from services.resampling import resample_to_grid
+from services.influx_gateway import InfluxGateway, CircuitBreaker, CircuitOpenError
+from services.inference_scheduler import InferenceScheduler
+from services.single_flight import SingleFlight
+from services.event_broadcaster import EventBroadcaster
+from services.push_ingest import to_line_protocol
 from configs.mongodb_config import influx_url, influx_token, influx_org, influx_bucket, workspace_id
 
+logger = logging.getLogger(__name__)
+
+INGESTION_MODES = ("full", "delta", "push")
+
 
 class ScheduledInfluxInference:
-    def __init__(self, inference_interval_seconds=180, data_collection_interval_seconds=1):
+    def __init__(self, inference_interval_seconds=180, data_collection_interval_seconds=1, smoothing_mode="zero_phase", engine="eager",
+                 precision="fp32", base_dir=None, model_variant=None, inference_threads=None, interop_threads=None,
+                 inference_cpus=None, inference_nice=None, ingestion_mode="full", machine_ids=None,
+                 write_through=False, sample_interval_seconds=10, max_gap_seconds=60, min_coverage=0.9,
+                 query_timeout_seconds=10, breaker_failure_threshold=3, breaker_max_backoff_seconds=300,
+                 inference_trigger_points=None, query_share_ttl_seconds=2.0):
         """
         Initialize scheduled inference service with continuous data collection.
         
@@ -22,54 +45,289 @@ class ScheduledInfluxInference:
         Args:
             inference_interval_seconds (int): Time between inference runs (default: 180 seconds = 3 minutes)
             data_collection_interval_seconds (int): Interval for data collection (default: 1 second)
+            smoothing_mode (str): Butterworth mode passed to InferenceService ('zero_phase' or 'causal').
+                                  In 'causal' mode new points are smoothed as they are collected.
+            engine (str): Forward-pass backend passed to InferenceService
+                          ('eager', 'torchscript', 'compile' or 'onnx').
+            precision (str): Numeric precision passed to InferenceService ('fp32', 'int8' or 'bf16').
+            base_dir (str): Optional artifact directory of the initial model variant
+                            (default: AI-Model-Artifacts/<model_variant>).
+            model_variant (str): Variant under AI-Model-Artifacts/ to load at startup (default: CustomLoss).
+                                 Other variants can be hot-swapped in with switch_model().
+            inference_threads (int): torch intra-op threads for the dedicated inference worker (None = torch default)
+            interop_threads (int): torch inter-op threads for the inference worker (None = torch default)
+            inference_cpus (list of int): Optional CPUs to pin the inference worker to
+            inference_nice (int): Optional niceness increment for the inference worker (Linux)
+            ingestion_mode (str): 'full' re-queries the last 240 points every cycle; 'delta' queries only rows
+                                  newer than the newest buffered point and appends them, with a full
+                                  backfill on startup or after a long gap. 'push' does not poll: readings
+                                  arrive through ingest_windows() (POST /ingest); InfluxDB is only read
+                                  once at startup to prefill the buffers.
+            machine_ids (list of str): Machines to ingest and run inference for (default: [workspace_id]).
+                                       One grouped Flux query per cycle covers all of them; the first
+                                       one backs the single-machine endpoints.
+            write_through (bool): Also write pushed readings to InfluxDB (asynchronously, on the async client)
+            sample_interval_seconds (float): Sensor cadence the model expects; buffered points are resampled
+                                             onto this grid before inference (default: 10 seconds)
+            max_gap_seconds (float): Longest gap that is interpolated; longer gaps are masked (default: 60)
+            min_coverage (float): Minimum fraction of grid slots backed by a reading for a machine's window
+                                  to be used; below it the machine's inference is skipped (default: 0.9)
+            query_timeout_seconds (float): Timeout of every InfluxDB request (default: 10 seconds)
+            breaker_failure_threshold (int): Consecutive failed queries that open the circuit breaker; while
+                                             open, queries are skipped and the last good buffers are served
+            breaker_max_backoff_seconds (float): Cap of the breaker's jittered exponential backoff (default: 300)
+            inference_trigger_points (int): Also run inference as soon as a machine has this many new points
+                                            (timer ticks without new data are then skipped); None = timer only
+            query_share_ttl_seconds (float): Identical window queries in flight share one round-trip and decode;
+                                             the result is also reused by other consumers for this long (default: 2)
         """
-        self.influx_client = InfluxDBClient(
+        if ingestion_mode not in INGESTION_MODES:
+            raise ValueError(f"ingestion_mode must be one of {INGESTION_MODES}, got '{ingestion_mode}'")
+        # Shared clients and query APIs (persistent connection pool), request timeout and circuit breaker
+        self.influx = InfluxGateway(
             url=influx_url, 
             token=influx_token, 
-            org=influx_org
+            org=influx_org,
+            timeout_seconds=query_timeout_seconds,
+            breaker=CircuitBreaker(
+                failure_threshold=breaker_failure_threshold,
+                base_delay=max(1.0, data_collection_interval_seconds),
+                max_delay=breaker_max_backoff_seconds,
+            ),
         )
         self.influx_bucket = influx_bucket
         self.workspace_id = workspace_id
         
+        # Machines ingested by this streamer (the first one backs the single-machine endpoints)
+        self.machine_ids = list(dict.fromkeys(machine_ids)) if machine_ids else [workspace_id]
+        self.primary_machine_id = self.machine_ids[0]
+        
         self.inference_interval = inference_interval_seconds
         self.data_collection_interval = data_collection_interval_seconds
         
+        # Gap-aware resampling onto the model's cadence (see services.resampling)
+        self.sample_interval = sample_interval_seconds
+        self.max_gap_seconds = max_gap_seconds
+        self.min_coverage = min_coverage
+        
         # Configuration matching the X-std model
         self.context_length = 240  # Lookback window
         self.prediction_length = 60  # Forecast horizon
         
-        # Rolling buffer to store continuous data (keep extra for safety)
+        # Rolling buffer per machine to store continuous data (keep extra for safety): preallocated
+        # ring buffers, inference windows are zero-copy views and point dicts are only built for
+        # API responses. Each MachineState also holds the machine's ingestion cursor.
         self.buffer_max_size = self.context_length + 100  # 340 points max
-        self.data_buffer = deque(maxlen=self.buffer_max_size)
+        self.machines = {machine_id: MachineState(machine_id, self.buffer_max_size) for machine_id in self.machine_ids}
+        self._buffer_lock = threading.Lock()
+        
+        # Single-flight layer: prefill, collection and inference backfill share identical window queries
+        self._flights = SingleFlight(ttl_seconds=query_share_ttl_seconds)
+        
+        # Ingestion mode and transfer counters
+        self.ingestion_mode = ingestion_mode
+        self._last_query_ok = time.monotonic()
+        self._stats_lock = threading.Lock()
+        self.ingest_stats = {
+            "queries": 0,
+            "rows_fetched": 0,
+            "bytes_fetched": 0,
+            "last_query_rows": None,
+            "last_query_bytes": None,
+            "cycles": 0,
+            "full_backfills": 0,
+            "delta_queries": 0,
+            "points_appended": 0,
+            "push_requests": 0,
+            "points_pushed": 0,
+            "write_through_points": 0,
+            "write_through_errors": 0,
+        }
         
         # Prediction storage
         self.last_prediction = None
         self.last_alerts = None
-        self.last_lookback = []
+        self._lookback_lock = threading.Lock()
+        # (newest slot before, oldest changed slot) of recent lookback updates whose re-resampled
+        # window changed slots clients already hold (e.g. a late point filled an interpolated gap)
+        self._lookback_changes = collections.deque(maxlen=64)
+        self._last_lookback = SensorWindow.empty(self.primary_machine_id)
         self.last_raw_forecast = None
         self.last_scaled_forecast = None
         self.previous_scaled_forecast = None  # Store previous inference forecast for comparison
         self.next_inference_time = None
         self.inference_count = 0
         
-        # Thread control
+        # Data versions for the API snapshot cache: bumped on every stored inference result and
+        # on every buffer change, so cached responses are re-rendered only when these move
+        self.inference_version = 0
+        self.ingest_version = 0
+        
+        # Server-sent events (GET /events): new points, predictions and alert transitions are
+        # pushed to the dashboards, each serialized once for all of them
+        self.events = EventBroadcaster()
+        
+        # Fixed-rate monotonic schedule (optionally data-triggered) for the inference loops
+        self.scheduler = InferenceScheduler(inference_interval_seconds, trigger_points=inference_trigger_points)
+        
+        # Thread control (start_stream) and asyncio tasks (start_async)
         self.running = False
         self.data_collection_thread = None
         self.inference_thread = None
+        self._tasks = []
+        
+        # Push ingestion: optional write-through of pushed readings to InfluxDB
+        self.write_through = write_through
+        self._write_tasks = set()
         
-        # Initialize inference service
-        print(f"[ScheduledInflux] Initializing inference service...")
-        self.inference_service = InferenceService()
+        # All model work runs on one dedicated worker with its own CPU thread budget,
+        # so forward passes never run on (or starve) the API and collection threads
+        self.inference_executor = InferenceExecutor(
+            num_threads=inference_threads,
+            interop_threads=interop_threads,
+            cpu_affinity=inference_cpus,
+            nice=inference_nice,
+        )
+        
+        # Model registry holds the active InferenceService; load_model() creates it in the background
+        # so the API can serve requests (and report readiness) while the model and scaler load
+        if base_dir is not None:
+            artifacts_dir, model_variant = os.path.split(os.path.abspath(base_dir))
+        else:
+            artifacts_dir = None
+        self.model_registry = ModelRegistry(
+            root_dir=artifacts_dir,
+            default_variant=model_variant or DEFAULT_VARIANT,
+            executor=self.inference_executor,
+            smoothing_mode=smoothing_mode,
+            engine=engine,
+            precision=precision,
+        )
+        self.model_ready = threading.Event()
+        self.model_load_error = None
+        self.model_load_seconds = None
+        self.warmup_ms = None
+        self._load_lock = threading.Lock()
         
         # Initialize email notification service
-        print(f"[ScheduledInflux] Initializing email notification service...")
+        logger.info("[ScheduledInflux] Initializing email notification service...")
         self.email_service = EmailNotificationService()
         
-        print(f"[ScheduledInflux] Configuration:")
-        print(f"   - Data collection: every {data_collection_interval_seconds} second(s)")
-        print(f"   - Inference: every {inference_interval_seconds} seconds ({inference_interval_seconds/60:.1f} minutes)")
-        print(f"   - Context window: {self.context_length} points")
-        print(f"   - Forecast horizon: {self.prediction_length} points")
+        logger.info(
+            "[ScheduledInflux] Configuration: data collection every %ss, inference every %ss (%.1f min), "
+            "context window %d points, forecast horizon %d points, smoothing mode %s, %d machine(s)",
+            data_collection_interval_seconds, inference_interval_seconds, inference_interval_seconds / 60,
+            self.context_length, self.prediction_length, smoothing_mode, len(self.machine_ids)
+        )
+
+    @property
+    def influx_client(self):
+        """Shared sync InfluxDB client."""
+        return self.influx.client
+
+    @influx_client.setter
+    def influx_client(self, client):
+        self.influx.client = client
+
+    @property
+    def async_influx_client(self):
+        """Shared async InfluxDB client (None until start_async())."""
+        return self.influx.async_client
+
+    @async_influx_client.setter
+    def async_influx_client(self, client):
+        self.influx.async_client = client
+
+    @property
+    def last_lookback(self):
+        """Grid window of the primary machine's latest inference (served by /sensor/last-lookback)."""
+        return self._last_lookback
+
+    @last_lookback.setter
+    def last_lookback(self, window):
+        interval_ns = int(round(self.sample_interval * 1_000_000_000))
+        with self._lookback_lock:
+            previous, self._last_lookback = self._last_lookback, window
+            changed_ns = window.first_difference(previous)
+            if changed_ns is not None:
+                self._lookback_changes.append((int(previous.latest_timestamp // interval_ns), changed_ns // interval_ns))
+
+    @property
+    def data_buffer(self):
+        """Ring buffer of the primary machine."""
+        return self.machines[self.primary_machine_id].buffer
+
+    def load_model(self):
+        """
+        Load the scaler and model, then run one warm-up forward pass.
+        Safe to call from several threads; only the first call does the work.
+        
+        Returns:
+            bool: True if the inference service is ready
+        """
+        with self._load_lock:
+            if self.model_ready.is_set():
+                return True
+            if self.model_load_error is not None:
+                return False
+            
+            start = time.perf_counter()
+            try:
+                logger.info("[ScheduledInflux] Loading inference service in the background...")
+                # torch/transformers are only imported once loading starts
+                service = self.inference_executor.run(self.model_registry.activate, self.model_registry.default_variant)
+            except Exception as e:
+                self.model_load_error = str(e)
+                logger.exception("❌ [ScheduledInflux] Failed to load inference service")
+                return False
+            
+            self.warmup_ms = service.warmup_ms
+            self.model_load_seconds = time.perf_counter() - start
+            self.model_ready.set()
+            logger.info("✅ [ScheduledInflux] Inference service ready in %.2fs (%s, engine %s, %s)",
+                        self.model_load_seconds, service.model_version, service.engine.name, service.precision)
+            return True
+
+    @property
+    def inference_service(self):
+        """Active InferenceService from the model registry (None until load_model() finishes)."""
+        return self.model_registry.active
+
+    def switch_model(self, variant):
+        """
+        Hot-swap the active model variant without stopping inference.
+        
+        The new variant is loaded and warmed up as a job on the inference executor, queued between
+        inference cycles, and becomes active for the cycles after it.
+        
+        Returns:
+            bool: True if the load was started, False if the initial model is not ready or a load is in progress
+        """
+        if not self.model_ready.is_set():
+            return False
+        return self.model_registry.activate_async(variant)
+
+    def get_readiness(self):
+        """
+        Readiness of the inference pipeline for health checks.
+        
+        Returns:
+            dict: ready flag, model load state/timings and whether the buffer holds a full context window
+        """
+        if self.model_ready.is_set():
+            model_state = "ready"
+        elif self.model_load_error is not None:
+            model_state = "failed"
+        else:
+            model_state = "loading"
+        return {
+            "ready": self.model_ready.is_set(),
+            "model": model_state,
+            "model_load_error": self.model_load_error,
+            "model_load_seconds": self.model_load_seconds,
+            "warmup_ms": self.warmup_ms,
+            "buffer_ready": len(self.data_buffer) >= self.context_length,
+        }
 
     def start_stream(self):
         """
@@ -90,22 +348,17 @@ class ScheduledInfluxInference:
         5. Scale output to match lookback context
         6. Print final scaled output
         """
-        print("\n" + "="*80)
-        print("[ScheduledInflux] Starting Scheduled Inference System")
-        print("="*80)
+        logger.info("[ScheduledInflux] Starting Scheduled Inference System")
         
         self.running = True
         
+        # Load the model concurrently with the initial InfluxDB fetch
+        loader_thread = threading.Thread(target=self.load_model, daemon=True)
+        loader_thread.start()
+        
         # IMMEDIATELY fetch last 240 points from InfluxDB to avoid waiting
-        print(f"\n[ScheduledInflux] Fetching last {self.context_length} points from InfluxDB...")
-        initial_data = self._query_last_n_points(self.context_length)
-        if initial_data and len(initial_data) > 0:
-            self.data_buffer.clear()
-            for point in initial_data:
-                self.data_buffer.append(point)
-            print(f"✅ [ScheduledInflux] Buffer pre-filled with {len(self.data_buffer)} points")
-        else:
-            print(f"⚠️ [ScheduledInflux] Could not fetch initial data, will collect gradually")
+        logger.info("[ScheduledInflux] Fetching last %d points from InfluxDB...", self.context_length)
+        self._prefill_buffers(self._query_last_n_points(self.context_length, "prefill"))
         
         # Start data collection thread (continues to add new points)
         self.data_collection_thread = threading.Thread(
@@ -113,45 +366,78 @@ class ScheduledInfluxInference:
             daemon=True
         )
         self.data_collection_thread.start()
-        print("[ScheduledInflux] Data collection thread started")
+        logger.info("[ScheduledInflux] Data collection thread started")
+        
+        # Wait for the model before the first inference
+        loader_thread.join()
+        if not self.model_ready.is_set():
+            logger.error("❌ [ScheduledInflux] Inference loop not started: model failed to load (%s)", self.model_load_error)
+            return
         
         # Run inference loop in main thread
         self._inference_loop()
 
     def _data_collection_loop(self):
         """
-        Continuously refresh buffer with last 240 points from InfluxDB.
+        Continuously keep the buffer up to date with the latest points from InfluxDB.
+        
+        - 'full' mode: re-query the last 240 points every cycle and replace the buffer
+        - 'delta' mode: query only rows newer than the cursor and append them; full backfill
+          only on startup/restart or after a gap longer than the backfill range
         This ensures inference is always ready with the most recent data.
         """
-        print(f"\n[DataCollection] Starting continuous buffer refresh (fetching last 240 points every {self.data_collection_interval}s)...")
+        logger.info("[DataCollection] Starting continuous buffer refresh (%s mode, every %ss, %d-point window)...",
+                    self.ingestion_mode, self.data_collection_interval, self.context_length)
         
         refresh_count = 0
         while self.running:
             try:
-                # Fetch last 240 points from InfluxDB
-                last_240 = self._query_last_n_points(self.context_length)
-                
-                if last_240 and len(last_240) >= self.context_length:
-                    # Replace entire buffer with fresh data
-                    self.data_buffer.clear()
-                    for point in last_240:
-                        self.data_buffer.append(point)
-                    
-                    refresh_count += 1
-                    # Log every 10 cycles to reduce spam (every 100 seconds)
-                    if refresh_count % 10 == 0:
-                        print(f"[DataCollection] Buffer refreshed: {len(self.data_buffer)} points (refresh #{refresh_count})")
-                elif last_240:
-                    print(f"⚠️ [DataCollection] Only {len(last_240)}/{self.context_length} points available in InfluxDB")
-                else:
-                    print(f"⚠️ [DataCollection] No data returned from InfluxDB")
-                
+                self._collect_once()
+                refresh_count = self._after_collect(refresh_count)
                 time.sleep(self.data_collection_interval)
                 
             except Exception as e:
-                print(f"❌ [DataCollection] Error: {e}")
+                logger.error("❌ [DataCollection] Error: %s", e)
                 time.sleep(self.data_collection_interval)
 
+    def _prefill_buffers(self, initial_data):
+        """Seed the buffers with the startup backfill."""
+        if initial_data:
+            self._replace_buffers(initial_data)
+            logger.info("✅ [ScheduledInflux] Buffers pre-filled for %d/%d machine(s) (%d points for %s)",
+                        len(initial_data), len(self.machine_ids), len(self.data_buffer), self.primary_machine_id)
+        else:
+            logger.warning("⚠️ [ScheduledInflux] Could not fetch initial data, will collect gradually")
+
+    def _after_collect(self, refresh_count):
+        """
+        Post-ingestion step of a collection cycle: feed the causal smoothers and log progress.
+        
+        Returns:
+            int: Updated count of cycles with at least one full window
+        """
+        with self._buffer_lock:
+            sizes = {machine_id: len(self.machines[machine_id].buffer) for machine_id in self.machine_ids}
+        full_ids = [machine_id for machine_id, size in sizes.items() if size >= self.context_length]
+        if full_ids:
+            # Causal smoothing mode: filter only the grid points that arrived since last cycle
+            # (the smoother sees the same resampled windows as inference)
+            if self.model_ready.is_set() and self.inference_service.smoothing_mode == "causal":
+                for machine_id in full_ids:
+                    self.inference_service.update_smoothing(self._grid_window(machine_id).filled())
+            
+            refresh_count += 1
+            # Log every 10 cycles to reduce spam (every 100 seconds)
+            if refresh_count % 10 == 0:
+                logger.info("[DataCollection] Buffers refreshed: %d/%d machine(s) with a full window (refresh #%d)",
+                            len(full_ids), len(sizes), refresh_count)
+        elif any(sizes.values()):
+            logger.warning("⚠️ [DataCollection] Only %d/%d points available in InfluxDB",
+                           max(sizes.values()), self.context_length)
+        else:
+            logger.warning("⚠️ [DataCollection] No data returned from InfluxDB")
+        return refresh_count
+
     # DEPRECATED: No longer used - buffer now refreshed with _query_last_n_points()
     # def _query_latest_point(self):
     #     """
@@ -202,218 +488,735 @@ class ScheduledInfluxInference:
 
     def _inference_loop(self):
         """
-        Run inference every N seconds using the last 240 points from buffer.
+        Run inference every N seconds using the last 240 points from each machine's buffer.
+        Machines with a full window share one batched forward pass.
         """
-        print(f"\n[Inference] Starting inference loop (every {self.inference_interval}s)...")
+        logger.info("[Inference] Starting inference loop (every %ss)...", self.inference_interval)
         
         while self.running:
+            # Fixed-rate ticks on the monotonic clock (or the data trigger): cycle time does not add drift
+            reason = self.scheduler.wait(lambda: self.running)
+            if reason is None:
+                break
             try:
-                self.next_inference_time = datetime.now()
-                next_time_str = self.next_inference_time.strftime("%Y-%m-%d %H:%M:%S")
-                
-                print(f"\n{'='*80}")
-                print(f"[Inference] Inference #{self.inference_count + 1} at {next_time_str}")
-                print(f"{'='*80}")
-                
-                # Check if we have enough data
-                buffer_size = len(self.data_buffer)
-                print(f"[Inference] Buffer size: {buffer_size}/{self.context_length} points")
-                
-                if buffer_size < self.context_length:
-                    print(f"⚠️ [Inference] Insufficient data: {buffer_size}/{self.context_length} points")
-                    print(f"   Need {self.context_length - buffer_size} more points")
-                    print(f"   Estimated time: ~{(self.context_length - buffer_size) * self.data_collection_interval}s")
+                ready = self._ready_machine_ids()
+                if not ready:
+                    self._log_insufficient_data()
                     
-                    # Try to backfill from InfluxDB
-                    print(f"[Inference] Attempting to backfill from InfluxDB...")
-                    backfill_data = self._query_last_n_points(self.context_length)
-                    
-                    if backfill_data and len(backfill_data) >= self.context_length:
-                        self.data_buffer.clear()
-                        for point in backfill_data:
-                            self.data_buffer.append(point)
-                        print(f"✅ [Inference] Backfilled buffer with {len(self.data_buffer)} points")
-                    else:
-                        print(f"[Inference] Waiting {self.inference_interval}s before retry...")
-                        time.sleep(self.inference_interval)
+                    # Try to backfill from InfluxDB (push mode waits for pushed readings instead)
+                    if self.ingestion_mode != "push":
+                        ready = self._apply_inference_backfill(self._query_last_n_points(self.context_length, "inference"))
+                    if not ready:
+                        logger.warning("[Inference] Backfill failed, retrying at the next tick (%.0fs)...", self.scheduler.next_run_in())
                         continue
                 
-                # Get last 240 points from buffer
-                buffer_list = list(self.data_buffer)
-                last_240_points = buffer_list[-self.context_length:]
+                # Last 240 grid points per machine, skipping machines with too little coverage
+                windows = self._inference_windows(ready)
                 
-                print(f"✅ [Inference] Using last {len(last_240_points)} data points")
-                print(f"   Time range: {last_240_points[0]['timestamp']} to {last_240_points[-1]['timestamp']}")
+                # Run inference on the dedicated executor thread
+                outputs = self.inference_executor.run(self._inference_job(windows)) if windows else []
                 
-                # Store lookback for API access
-                self.last_lookback = last_240_points.copy()
+                for window, (results, alerts) in zip(windows, outputs):
+                    machine = self._store_inference_result(window, results, alerts)
+                    if machine is not None:
+                        self._send_alert_email(machine, alerts)
                 
-                # Run inference
-                print(f"\n[Inference] Running model inference...")
-                results, alerts = self.inference_service.run_inference(last_240_points)
+            except Exception:
+                logger.exception("❌ [Inference] Error in inference loop, retrying at the next tick...")
+            finally:
+                self._log_next_run(reason)
                 
-                if results is not None:
-                    # Save current forecast as "previous" before updating
-                    if self.last_scaled_forecast is not None:
-                        self.previous_scaled_forecast = self.last_scaled_forecast.copy()
-                    
-                    # Store results
-                    self.last_prediction = results
-                    self.last_alerts = alerts
-                    self.last_raw_forecast = results["raw_predictions_scaled"]  # Raw model output in scaled space
-                    self.last_scaled_forecast = results["final_predictions"]  # Post-processed predictions fitted to lookback
-                    self.inference_count += 1
-                    
-                    # Print both raw and final outputs
-                    print(f"\n{'='*80}")
-                    print("[OUTPUT] RAW MODEL OUTPUT (Scaled Space):")
-                    print(f"{'='*80}")
-                    self._print_forecast(results["raw_predictions_scaled"], "Raw Model Predictions")
-                    
-                    print(f"\n{'='*80}")
-                    print("[OUTPUT] FINAL PREDICTIONS (Fitted to Lookback Scale):")
-                    print(f"{'='*80}")
-                    self._print_forecast(results["final_predictions"], "Final Model Predictions")
-                    
-                    print(f"\n✅ [Inference] Completed successfully")
-                    print(f"   Alert status: {alerts['status']}")
-                    print(f"   Alert message: {alerts['message']}")
-                    
-                    # ============================================================
-                    # EMAIL NOTIFICATION: Send email after inference
-                    # ============================================================
-                    print(f"\n[Inference] Sending email notification...")
-                    try:
-                        if alerts.get('status') == 'critical':
-                            print(f"[Inference] Machine status is CRITICAL, sending notification...")
-                            email_sent = self.email_service.send_alert_email(
-                                alert_data=alerts,
-                                inference_count=self.inference_count
-                            )
-                        else:
-                            print(f"[Inference] Machine status is {alerts.get('status')}, skipping email (only send for critical)")
-                            email_sent = False
-                        
-                        if email_sent:
-                            print(f"✅ [Inference] Email notification sent successfully")
-                        else:
-                            print(f"⚠️ [Inference] Email notification failed (check logs above)")
-                    except Exception as email_error:
-                        print(f"❌ [Inference] Error sending email: {email_error}")
-                        # Don't stop the inference loop if email fails
-                        import traceback
-                        traceback.print_exc()
-                    # ============================================================
-                    
-                else:
-                    print(f"❌ [Inference] Failed: {alerts['message']}")
-                
-                # Wait for next inference cycle
-                print(f"\n[Inference] Next inference in {self.inference_interval}s ({self.inference_interval/60:.1f} min)...")
-                print(f"{'='*80}")
-                time.sleep(self.inference_interval)
-                
-            except Exception as e:
-                print(f"❌ [Inference] Error in inference loop: {e}")
-                import traceback
-                traceback.print_exc()
-                print(f"[Inference] Retrying in {self.inference_interval}s...")
-                time.sleep(self.inference_interval)
-
-    def _print_forecast(self, forecast, label):
-        """Print forecast values in a readable format."""
+    def _log_next_run(self, reason):
+        next_run_in = self.scheduler.next_run_in()
+        self.next_inference_time = datetime.now() + timedelta(seconds=next_run_in)
+        logger.debug("[Inference] Cycle (%s trigger) done, lag %.1f ms; next tick in %.1fs",
+                     reason, (self.scheduler.last_lag or 0) * 1000, next_run_in)
+
+    def _ready_machine_ids(self):
+        """Machines whose buffer holds a full context window."""
+        return [machine_id for machine_id, machine in self.machines.items() if len(machine.buffer) >= self.context_length]
+
+    def _grid_window(self, machine_id):
+        """
+        A machine's buffered points resampled onto the sample interval grid (one context window).
+        Resampled from the ring buffer view while holding the buffer lock, so concurrent appends
+        cannot tear the window (the result is a new array, safe to use after the lock is released).
+        
+        Returns:
+            ResampledWindow: Grid window with its observed/masked slots
+        """
+        with self._buffer_lock:
+            return resample_to_grid(self.machines[machine_id].buffer.window(), self.sample_interval,
+                                    self.context_length, self.max_gap_seconds)
+
+    def _inference_windows(self, machine_ids):
+        """
+        Model inputs for one inference cycle: each machine's grid window, gaps filled.
+        
+        Machines whose window has less than min_coverage real readings (e.g. right after an outage)
+        are skipped this cycle instead of running the model on mostly interpolated data.
+        
+        Returns:
+            list of SensorWindow: One window of context_length grid points per usable machine
+        """
+        windows = []
+        for machine_id in machine_ids:
+            resampled = self._grid_window(machine_id)
+            machine = self.machines[machine_id]
+            machine.coverage = resampled.report(self.sample_interval)
+            if resampled.coverage < self.min_coverage:
+                machine.skipped_inferences += 1
+                logger.warning("⚠️ [Inference] Skipping %s: window coverage %.0f%% < %.0f%% (%d slots masked, "
+                               "longest gap %.0fs)", machine_id, resampled.coverage * 100, self.min_coverage * 100,
+                               machine.coverage["masked"], machine.coverage["longest_gap_seconds"])
+                continue
+            windows.append(resampled.filled())
+        return windows
+
+    def _log_insufficient_data(self):
+        buffer_size = len(self.data_buffer)
+        logger.warning("⚠️ [Inference] Insufficient data: %d/%d points (need %d more, ~%ss); attempting to backfill from InfluxDB...",
+                       buffer_size, self.context_length, self.context_length - buffer_size,
+                       (self.context_length - buffer_size) * self.data_collection_interval)
+
+    def _apply_inference_backfill(self, backfill_data):
+        """
+        Replace the buffers with a backfill taken because no machine had a full window.
+        
+        Returns:
+            list: Machines ready for inference afterwards (empty if the backfill failed)
+        """
+        if not backfill_data or not any(len(window) >= self.context_length for window in backfill_data.values()):
+            return []
+        self._replace_buffers(backfill_data)
+        ready = self._ready_machine_ids()
+        logger.info("✅ [Inference] Backfilled buffers for %d machine(s)", len(ready))
+        return ready
+
+    def _inference_job(self, windows):
+        """
+        Build the executor job for one inference cycle.
+        
+        The service reference is taken once, so the whole cycle uses one model/scaler version even
+        if a hot-swap lands meanwhile; several machines share one batched forward pass.
+        
+        Returns:
+            callable: Returns one (results, alerts) tuple per window
+        """
+        service = self.inference_service
+        if len(windows) == 1:
+            return lambda: [service.run_inference(windows[0])]
+        return lambda: service.run_inference_batch(windows)
+
+    def _store_inference_result(self, window, results, alerts):
+        """
+        Store one machine's inference outputs.
+        
+        The primary machine's outputs also back the single-machine endpoints
+        (forecast, lookback and previous forecast).
+        
+        Returns:
+            MachineState: The machine, or None if its inference failed
+        """
+        machine = self.machines[window.machine_id]
+        if results is None:
+            logger.error("❌ [Inference] Failed for %s: %s", window.machine_id, alerts['message'])
+            return None
+        
+        previous_status = (machine.last_alerts or {}).get('status')
+        machine.last_results = results
+        machine.last_alerts = alerts
+        machine.inference_count += 1
+        
+        if window.machine_id == self.primary_machine_id:
+            logger.debug("[Inference] Using last %d data points (%s to %s)", len(window),
+                         window.timestamp_iso(0), window.timestamp_iso(-1))
+            
+            # Store lookback for API access (the grid window is its own array, not a buffer view)
+            self.last_lookback = window
+            
+            # Save current forecast as "previous" before updating
+            if self.last_scaled_forecast is not None:
+                self.previous_scaled_forecast = self.last_scaled_forecast.copy()
+            
+            # Store results
+            self.last_prediction = results
+            self.last_alerts = alerts
+            self.last_raw_forecast = results["raw_predictions_scaled"]  # Raw model output in scaled space
+            self.last_scaled_forecast = results["final_predictions"]  # Post-processed predictions fitted to lookback
+            self.inference_count += 1
+            
+            # Log both raw and final outputs (formatted only at DEBUG level)
+            self._log_forecast(results["raw_predictions_scaled"], "Raw Model Predictions (Scaled Space)")
+            self._log_forecast(results["final_predictions"], "Final Model Predictions (Fitted to Lookback Scale)")
+        
+        self.inference_version += 1
+        self._publish_inference(machine, previous_status)
+        logger.info("✅ [Inference] #%d completed for %s: %s - %s", machine.inference_count, window.machine_id,
+                    alerts['status'], alerts['message'])
+        return machine
+
+    def _publish_inference(self, machine, previous_status):
+        """
+        Push a stored inference result to the event stream: a 'prediction' event (retained, so new
+        subscribers get the latest one per machine) and an 'alert' event if the status changed.
+        """
+        alerts = machine.last_alerts
+        self.events.publish("prediction", {
+            "machine_id": machine.machine_id,
+            "inference_count": machine.inference_count,
+            "timestamp": alerts.get('timestamp'),
+            "status": alerts.get('status'),
+            "message": alerts.get('message'),
+            "scaled_forecast_array": machine.last_results["final_predictions"],
+        }, retain_key=("prediction", machine.machine_id))
+        if alerts.get('status') != previous_status:
+            self.events.publish("alert", {
+                "machine_id": machine.machine_id,
+                "previous_status": previous_status,
+                "status": alerts.get('status'),
+                "message": alerts.get('message'),
+                "timestamp": alerts.get('timestamp'),
+            }, retain_key=("alert", machine.machine_id))
+        
+    def _send_alert_email(self, machine, alerts):
+        """Email the workspace users when a machine's status is critical (blocking network call)."""
+        # ============================================================
+        # EMAIL NOTIFICATION: Send email after inference
+        # ============================================================
+        try:
+            if alerts.get('status') == 'critical':
+                logger.info("[Inference] Machine %s status is CRITICAL, sending email notification...", machine.machine_id)
+                email_sent = self.email_service.send_alert_email(
+                    alert_data=alerts,
+                    inference_count=machine.inference_count
+                )
+            else:
+                logger.debug("[Inference] Machine status is %s, skipping email (only send for critical)", alerts.get('status'))
+                email_sent = None
+            
+            if email_sent:
+                logger.info("✅ [Inference] Email notification sent successfully")
+            elif email_sent is not None:
+                logger.warning("⚠️ [Inference] Email notification failed (check logs above)")
+        except Exception:
+            # Don't stop the inference loop if email fails
+            logger.exception("❌ [Inference] Error sending email")
+        # ============================================================
+
+    def _log_forecast(self, forecast, label):
+        """Log forecast values in a readable format (only formatted when DEBUG logging is enabled)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         feature_names = ['current', 'tempA', 'tempB', 'accX', 'accY', 'accZ']
         
-        print(f"\n{label} - First 5 steps:")
+        lines = [f"{label} - First 5 steps:"]
         for step in range(min(5, forecast.shape[0])):
             values = ", ".join([f"{feature_names[i]}={forecast[step, i]:.4f}" 
                               for i in range(forecast.shape[1])])
-            print(f"   Step {step+1}: {values}")
+            lines.append(f"   Step {step+1}: {values}")
         
-        print(f"\n{label} - Last 5 steps:")
+        lines.append(f"{label} - Last 5 steps:")
         for step in range(max(0, forecast.shape[0]-5), forecast.shape[0]):
             values = ", ".join([f"{feature_names[i]}={forecast[step, i]:.4f}" 
                               for i in range(forecast.shape[1])])
-            print(f"   Step {step+1}: {values}")
+            lines.append(f"   Step {step+1}: {values}")
         
-        print(f"\n{label} - Statistics:")
+        lines.append(f"{label} - Statistics:")
         for i, name in enumerate(feature_names):
             col = forecast[:, i]
-            print(f"   {name:10s}: mean={col.mean():.4f}, min={col.min():.4f}, max={col.max():.4f}")
+            lines.append(f"   {name:10s}: mean={col.mean():.4f}, min={col.min():.4f}, max={col.max():.4f}")
+        
+        logger.debug("\n".join(lines))
 
-    def _query_last_n_points(self, n):
+    def _query_last_n_points(self, n, consumer="collection"):
         """
-        Query InfluxDB for the last N data points.
+        Query InfluxDB for the last N data points of every machine (one grouped query).
         
         Args:
-            n (int): Number of points to query
+            n (int): Number of points to query per machine
+            consumer (str): 'prefill', 'collection' or 'inference' (see _run_flux)
             
         Returns:
-            list: List of data points, or None if error
+            dict: machine_id -> SensorWindow for the machines that returned data, or None if error/no data
+        """
+        try:
+            return self._check_backfill(self._run_flux(self._last_n_query(n), consumer), n)
+        except Exception as e:
+            return self._query_failed("Error querying InfluxDB", e)
+
+    def _query_points_since(self, cursor):
+        """
+        Delta query: only the rows at or after the cursor, for every machine (one grouped query).
+        
+        Flux range() starts inclusively, so each machine's newest buffered row may come back once
+        and is dropped by _append_new_points. tail() caps the transfer at one context window per
+        machine after a long gap.
+        
+        Args:
+            cursor (int): Epoch nanoseconds to start from (see _delta_start)
+        
+        Returns:
+            dict: machine_id -> SensorWindow (possibly empty), or None if the query failed
+        """
+        try:
+            return self._run_flux(self._since_query(cursor), "collection")
+        except Exception as e:
+            return self._query_failed("Error querying InfluxDB for new points", e)
+
+    def _query_failed(self, message, error):
+        """
+        Log a failed or refused query without a traceback (DEBUG level adds it); the buffers keep
+        their last good contents.
+        
+        Returns:
+            None
         """
+        if isinstance(error, CircuitOpenError):
+            logger.debug("[Influx] %s skipped: %s", message, error)
+        else:
+            breaker = self.influx.breaker
+            logger.warning("❌ [Influx] %s: %s: %s (circuit %s, next query in %.1fs)", message, type(error).__name__,
+                           error, breaker.state, breaker.retry_in(), exc_info=logger.isEnabledFor(logging.DEBUG))
+        return None
+
+    def _last_n_query(self, n):
         # Query range - use a large range to ensure we get enough data
         # Data is collected every 10 seconds, so 240 points = 40 minutes
-        range_minutes = max(120, (n * 15) // 60)  # Extra margin for 10-second intervals
-        
-        query = f'''
+        return self._fleet_query(f"-{self._backfill_range_minutes(n)}m", n)
+
+    def _since_query(self, cursor):
+        return self._fleet_query(f'time(v: "{format_epoch_ns(cursor)}")', self.context_length)
+
+    def _fleet_query(self, start, n):
+        """Pivoted query for all machines from start, grouped by machine_id, newest n rows per machine."""
+        return f'''
         from(bucket: "{self.influx_bucket}")
-          |> range(start: -{range_minutes}m)
+          |> range(start: {start})
           |> filter(fn: (r) => r["_measurement"] == "machine_metrics")
-          |> filter(fn: (r) => r["machine_id"] == "{self.workspace_id}")
+          |> filter(fn: (r) => r["machine_id"] =~ {self._machine_regex()})
           |> pivot(
               rowKey: ["_time"],
               columnKey: ["_field"],
               valueColumn: "_value"
           )
+          |> group(columns: ["machine_id"])
           |> sort(columns: ["_time"], desc: false)
           |> tail(n: {n})
         '''
         
+    def _check_backfill(self, windows, n):
+        logger.debug("[Inference] Query returned data for %d/%d machine(s)", len(windows), len(self.machine_ids))
+        if not windows:
+            logger.warning("⚠️ [Inference] No data found in last %d minutes - check that data is being written "
+                           "to InfluxDB (measurement 'machine_metrics', machine IDs %s)",
+                           self._backfill_range_minutes(n), self.machine_ids)
+        return windows or None
+
+    def _machine_regex(self):
+        """
+        Flux regex literal matching exactly the streamer's machine_ids.
+        
+        A regex on the tag is pushed down to the storage engine, so only the listed series are
+        read however many machines share the bucket.
+        """
+        alternatives = "|".join(re.escape(machine_id).replace("/", "\\/") for machine_id in self.machine_ids)
+        return f"/^(?:{alternatives})$/"
+
+    def _run_flux(self, query, consumer):
+        """
+        Run a Flux query through the shared query API (see services.influx_gateway).
+        
+        Identical queries share one round-trip and decode while in flight, and other consumers
+        reuse the result for query_share_ttl_seconds (see services.single_flight); the decoded
+        windows are never modified, so sharing them is safe.
+        
+        Args:
+            query (str): Flux query (also the single-flight key)
+            consumer (str): Caller identity; a consumer never gets back a cached result it already had
+        
+        Returns:
+            dict: machine_id -> SensorWindow, oldest first
+        """
+        return self._flights.do(query, lambda: self._fetch_flux(query), consumer)
+
+    def _fetch_flux(self, query):
+        body = self.influx.query_raw(query)
+        return self._decode_response(body.decode("utf-8"), len(body))
+
+    def _decode_response(self, text, size):
+        """
+        Decode a pivoted response column-wise straight into per-machine window arrays
+        (no FluxRecord or dict per row), counting the bytes and rows transferred.
+        
+        Args:
+            text (str): Annotated CSV body
+            size (int): Body size in bytes
+        
+        Returns:
+            dict: machine_id -> SensorWindow, oldest first
+        """
+        # InfluxDB already has correct field names: tempA, tempB, accX, accY, accZ
+        columns = read_grouped_columns(text, FEATURE_NAMES, "machine_id")
+        windows = {
+            machine_id: SensorWindow(timestamps, values, machine_id)
+            for machine_id, (timestamps, values) in columns.items()
+            if machine_id in self.machines
+        }
+        rows = sum(len(window) for window in windows.values())
+        self._last_query_ok = time.monotonic()
+        
+        with self._stats_lock:
+            self.ingest_stats["queries"] += 1
+            self.ingest_stats["bytes_fetched"] += size
+            self.ingest_stats["rows_fetched"] += rows
+            self.ingest_stats["last_query_bytes"] = size
+            self.ingest_stats["last_query_rows"] = rows
+        
+        logger.debug("[Influx] Query returned %d rows for %d machine(s) (%d bytes)", rows, len(windows), size)
+        return windows
+
+    def _backfill_range_minutes(self, n):
+        # Extra margin for 10-second intervals
+        return max(120, (n * 15) // 60)
+
+    def _collect_once(self):
+        """
+        One ingestion cycle: one full backfill or delta query for the whole fleet, then
+        demultiplex the rows into the per-machine buffers.
+        """
+        if self.ingestion_mode == "push":
+            return  # readings arrive through ingest_windows()
+        if self._begin_cycle():
+            # Fetch last 240 points from InfluxDB and replace the buffers with fresh data
+            self._apply_backfill(self._query_last_n_points(self.context_length))
+        else:
+            self._apply_delta(self._query_points_since(self._delta_start()))
+
+    def _begin_cycle(self):
+        """
+        Count a collection cycle.
+        
+        Returns:
+            bool: True if this cycle is a full backfill, False for a delta query
+        """
+        full_backfill = self._needs_full_backfill()
+        with self._stats_lock:
+            self.ingest_stats["cycles"] += 1
+            self.ingest_stats["full_backfills" if full_backfill else "delta_queries"] += 1
+        return full_backfill
+        
+    def _apply_backfill(self, windows):
+        if windows:
+            self._replace_buffers(windows)
+
+    def _apply_delta(self, windows):
+        if windows is None:
+            return
+        appended = sum(len(self._append_new_points(machine_id, window)) for machine_id, window in windows.items())
+        with self._stats_lock:
+            self.ingest_stats["points_appended"] += appended
+
+    def ingest_windows(self, windows):
+        """
+        Push path: append readings straight into the machine buffers, bypassing InfluxDB polling.
+        
+        Readings at or before a machine's newest buffered point (duplicates, out-of-order
+        retries) are dropped, as in delta ingestion.
+        
+        Args:
+            windows (dict): machine_id -> SensorWindow sorted by time (see services.push_ingest)
+        
+        Returns:
+            dict: accepted / duplicate point counts, unknown machine_ids and the accepted windows
+        """
+        accepted, duplicates, unknown, accepted_windows = 0, 0, [], {}
+        for machine_id, window in windows.items():
+            if machine_id not in self.machines:
+                unknown.append(machine_id)
+                continue
+            new_points = self._append_new_points(machine_id, window)
+            if len(new_points):
+                accepted_windows[machine_id] = new_points
+            accepted += len(new_points)
+            duplicates += len(window) - len(new_points)
+        
+        with self._stats_lock:
+            self.ingest_stats["push_requests"] += 1
+            self.ingest_stats["points_pushed"] += accepted
+        return {"accepted": accepted, "duplicates": duplicates, "unknown_machines": unknown, "windows": accepted_windows}
+
+    def schedule_write_through(self, windows):
+        """
+        Write accepted pushed readings to InfluxDB in the background (async client, asyncio path).
+        
+        Returns:
+            bool: True if a write was scheduled
+        """
+        if not self.write_through or not windows or self.async_influx_client is None:
+            return False
+        task = asyncio.get_running_loop().create_task(self._write_through(windows))
+        self._write_tasks.add(task)
+        task.add_done_callback(self._write_tasks.discard)
+        return True
+
+    async def _write_through(self, windows):
+        points = sum(len(window) for window in windows.values())
         try:
-            result = self.influx_client.query_api().query(query)
-            data_points = []
+            await self.async_influx_client.write_api().write(
+                bucket=self.influx_bucket, org=influx_org, record=to_line_protocol(windows)
+            )
+            with self._stats_lock:
+                self.ingest_stats["write_through_points"] += points
+        except Exception as e:
+            with self._stats_lock:
+                self.ingest_stats["write_through_errors"] += 1
+            logger.error("❌ [Push] Write-through of %d points to InfluxDB failed: %s", points, e)
+
+    # ------------------------------------------------------------------
+    # asyncio implementation (FastAPI lifespan): the same cycles as the thread-based
+    # start_stream(), run as tasks on the event loop with the async InfluxDB client
+    # ------------------------------------------------------------------
+
+    async def start_async(self):
+        """
+        Start ingestion and inference as asyncio tasks on the running event loop.
+        
+        Influx queries are awaited on the async client, response decoding runs in a worker thread
+        and model work on the inference executor, so the event loop only schedules. The fleet is
+        polled by one coroutine (one grouped query per cycle) whatever the number of machines.
+        """
+        if self._tasks:
+            return
+        self.influx.open_async()
+        
+        logger.info("[ScheduledInflux] Starting Scheduled Inference System (asyncio)")
+        self.running = True
+        self._tasks = [asyncio.create_task(self._run_async(), name="scheduled-inference")]
+
+    async def stop_async(self):
+        """
+        Cancel the ingestion/inference tasks, wait for them to finish and close the async client.
+        """
+        self.running = False
+        self.events.close()
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._write_tasks:
+            await asyncio.gather(*self._write_tasks, return_exceptions=True)  # flush pending write-through
+        await self.influx.close_async()
+        logger.info("[ScheduledInflux] Scheduled Inference System stopped")
+
+    async def _run_async(self):
+        """Async counterpart of start_stream(): prefill, collection task, model load, inference loop."""
+        # Load the model concurrently with the initial InfluxDB fetch (load_model blocks on the executor)
+        loader = asyncio.create_task(asyncio.to_thread(self.load_model))
+        try:
+            logger.info("[ScheduledInflux] Fetching last %d points from InfluxDB...", self.context_length)
+            self._prefill_buffers(await self._query_last_n_points_async(self.context_length, "prefill"))
             
-            for table in result:
-                for record in table.records:
-                    # DEBUG: Print first record's fields
-                    if len(data_points) == 0:
-                        print(f"[DEBUG] First record fields: {list(record.values.keys())}")
-                        print(f"[DEBUG] First record values: {record.values}")
-                    
-                    # InfluxDB already has correct field names: tempA, tempB, accX, accY, accZ
-                    # No mapping needed
+            self._tasks.append(asyncio.create_task(self._data_collection_loop_async(), name="data-collection"))
+            logger.info("[ScheduledInflux] Data collection task started")
+            
+            # Wait for the model before the first inference
+            await loader
+        finally:
+            loader.cancel()
+        if not self.model_ready.is_set():
+            logger.error("❌ [ScheduledInflux] Inference loop not started: model failed to load (%s)", self.model_load_error)
+            return
+        await self._inference_loop_async()
+
+    async def _data_collection_loop_async(self):
+        """Async counterpart of _data_collection_loop()."""
+        logger.info("[DataCollection] Starting continuous buffer refresh (%s mode, every %ss, %d-point window, asyncio)...",
+                    self.ingestion_mode, self.data_collection_interval, self.context_length)
+        
+        refresh_count = 0
+        while self.running:
+            try:
+                await self._collect_once_async()
+                # Causal smoothing and resampling of every machine: CPU work, kept off the event loop
+                refresh_count = await asyncio.to_thread(self._after_collect, refresh_count)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("❌ [DataCollection] Error: %s", e)
+            await asyncio.sleep(self.data_collection_interval)
+
+    async def _inference_loop_async(self):
+        """Async counterpart of _inference_loop()."""
+        logger.info("[Inference] Starting inference loop (every %ss, asyncio)...", self.inference_interval)
+        
+        while self.running:
+            reason = await self.scheduler.wait_async()
+            try:
+                ready = self._ready_machine_ids()
+                if not ready:
+                    self._log_insufficient_data()
+                    if self.ingestion_mode != "push":
+                        ready = self._apply_inference_backfill(await self._query_last_n_points_async(self.context_length, "inference"))
+                    if not ready:
+                        logger.warning("[Inference] Backfill failed, retrying at the next tick (%.0fs)...", self.scheduler.next_run_in())
+                        continue
+                
+                windows = await asyncio.to_thread(self._inference_windows, ready)
+                outputs = []
+                if windows:
+                    # submit() would block the event loop while the executor queue is full
                     try:
-                        data_point = {
-                            "timestamp": record.get_time().isoformat(),
-                            "current": float(record.values.get("current", 0) or 0),
-                            "tempA": float(record.values.get("tempA", 0) or 0),
-                            "tempB": float(record.values.get("tempB", 0) or 0),
-                            "accX": float(record.values.get("accX", 0) or 0),
-                            "accY": float(record.values.get("accY", 0) or 0),
-                            "accZ": float(record.values.get("accZ", 0) or 0),
-                            "machine_id": self.workspace_id,
-                        }
-                        data_points.append(data_point)
-                    except (TypeError, ValueError) as e:
-                        print(f"❌ [Inference] Error converting record values: {e}")
-                        print(f"   Problematic record: {record.values}")
+                        job = self.inference_executor.submit_nowait(self._inference_job(windows))
+                    except queue.Full:
+                        logger.warning("[Inference] Executor queue full (%d jobs pending), skipping this cycle",
+                                       self.inference_executor.stats()["queue_depth"])
                         continue
-            
-            print(f"[Inference] Query returned {len(data_points)} data points")
-            
-            if len(data_points) == 0:
-                print(f"⚠️ [Inference] No data found in last {range_minutes} minutes")
-                print(f"   Check if data is being written to InfluxDB")
-                print(f"   Measurement: 'sensor_data/ machine_metrics'")
-                print(f"   Machine ID: '{self.workspace_id}'")
-            
-            return data_points if len(data_points) > 0 else None
-            
+                    outputs = await asyncio.wrap_future(job)
+                
+                for window, (results, alerts) in zip(windows, outputs):
+                    machine = self._store_inference_result(window, results, alerts)
+                    if machine is not None and alerts.get('status') == 'critical':
+                        await asyncio.to_thread(self._send_alert_email, machine, alerts)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("❌ [Inference] Error in inference loop, retrying at the next tick...")
+            finally:
+                self._log_next_run(reason)
+
+    async def _collect_once_async(self):
+        """Async counterpart of _collect_once()."""
+        if self.ingestion_mode == "push":
+            return
+        if self._begin_cycle():
+            self._apply_backfill(await self._query_last_n_points_async(self.context_length))
+        else:
+            self._apply_delta(await self._query_points_since_async(self._delta_start()))
+
+    async def _query_last_n_points_async(self, n, consumer="collection"):
+        try:
+            return self._check_backfill(await self._run_flux_async(self._last_n_query(n), consumer), n)
         except Exception as e:
-            print(f"❌ [Inference] Error querying InfluxDB: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            return self._query_failed("Error querying InfluxDB", e)
+
+    async def _query_points_since_async(self, cursor):
+        try:
+            return await self._run_flux_async(self._since_query(cursor), "collection")
+        except Exception as e:
+            return self._query_failed("Error querying InfluxDB for new points", e)
+
+    async def _run_flux_async(self, query, consumer):
+        """Async counterpart of _run_flux(), sharing its single-flight layer."""
+        return await self._flights.do_async(query, lambda: self._fetch_flux_async(query), consumer)
+
+    async def _fetch_flux_async(self, query):
+        """Run a Flux query on the shared async query API; the CSV is decoded in a worker thread."""
+        text = await self.influx.query_raw_async(query)
+        return await asyncio.to_thread(self._decode_response, text, len(text.encode("utf-8")))
+
+    def _needs_full_backfill(self):
+        """
+        Full re-query of the last context window on startup/restart (no cursor yet), in 'full' mode,
+        or when no query has succeeded for longer than the backfill range (e.g. InfluxDB outage),
+        where a delta query from the stale cursors would scan more than a backfill.
+        """
+        if self.ingestion_mode == "full" or all(machine.cursor is None for machine in self.machines.values()):
+            return True
+        outage_seconds = time.monotonic() - self._last_query_ok
+        return outage_seconds > self._backfill_range_minutes(self.context_length) * 60
+
+    def _delta_start(self):
+        """
+        Range start of the fleet delta query: the oldest machine cursor, but no further back than
+        the backfill range before the newest one, so a machine that stopped reporting does not drag
+        every query back to its last point. Machines without a cursor accumulate from here too.
+        """
+        cursors = [machine.cursor for machine in self.machines.values() if machine.cursor is not None]
+        range_ns = self._backfill_range_minutes(self.context_length) * 60 * 1_000_000_000
+        return max(min(cursors), max(cursors) - range_ns)
+
+    def _replace_buffers(self, windows):
+        """
+        Replace machine buffers with freshly queried windows and move their cursors to the newest point.
+        
+        'full' mode keeps a machine's previous window unless a complete one came back;
+        'delta' and 'push' modes seed the cursor with whatever is there and accumulate from it.
+        """
+        new_windows = {}
+        with self._buffer_lock:
+            for machine_id, window in windows.items():
+                if len(window) < self.context_length and self.ingestion_mode == "full":
+                    continue
+                machine = self.machines[machine_id]
+                new_windows[machine_id] = window.newer_than(machine.cursor)
+                self.scheduler.notify_points(machine_id, len(new_windows[machine_id]))
+                machine.buffer.reset(window)
+                machine.cursor = window.latest_timestamp
+                self.ingest_version += 1
+        for machine_id, new_points in new_windows.items():
+            self._publish_points(machine_id, new_points)
+
+    def _append_new_points(self, machine_id, window):
+        """
+        Append points newer than the machine's cursor (older/duplicate rows are dropped).
+        
+        Returns:
+            SensorWindow: The points appended
+        """
+        with self._buffer_lock:
+            machine = self.machines[machine_id]
+            new_points = window.newer_than(machine.cursor)
+            if len(new_points):
+                machine.buffer.extend(new_points)
+                machine.cursor = new_points.latest_timestamp
+                self.ingest_version += 1
+        self.scheduler.notify_points(machine_id, len(new_points))
+        self._publish_points(machine_id, new_points)
+        return new_points
+
+    def _publish_points(self, machine_id, new_points):
+        """Push newly buffered points to the event stream (serialized only if someone is listening)."""
+        if len(new_points):
+            self.events.publish("points", lambda: {"machine_id": machine_id, "points": new_points.to_points()})
+
+    def _snapshot_buffer(self, n=None, machine_id=None):
+        """
+        Newest n buffered points (default: all) of a machine (default: the primary one),
+        oldest first. Copied under the buffer lock: a ring buffer view would be overwritten by
+        the collector's next appends while the caller (e.g. an API thread) is still reading it.
+        
+        Returns:
+            SensorWindow: Copy of the buffered points
+        """
+        with self._buffer_lock:
+            return self.machines[machine_id or self.primary_machine_id].buffer.window(n).copy()
+
+    def get_ingestion_stats(self):
+        """
+        Ingestion counters: queries, rows and bytes fetched from InfluxDB and full backfills vs delta queries.
+        """
+        with self._stats_lock:
+            stats = dict(self.ingest_stats)
+        cursor = self.machines[self.primary_machine_id].cursor
+        stats["mode"] = self.ingestion_mode
+        stats["machines"] = len(self.machine_ids)
+        stats["cursor"] = epoch_ns_to_datetime(cursor).isoformat() if cursor is not None else None
+        cycles = stats["cycles"]
+        stats["avg_bytes_per_cycle"] = round(stats["bytes_fetched"] / cycles, 1) if cycles else None
+        stats["avg_rows_per_cycle"] = round(stats["rows_fetched"] / cycles, 2) if cycles else None
+        stats["avg_queries_per_cycle"] = round(stats["queries"] / cycles, 2) if cycles else None
+        stats["single_flight"] = self._flights.stats()
+        return stats
+
+    def get_machines_status(self):
+        """
+        Per-machine buffer, cursor and last inference status.
+        
+        Returns:
+            list of dict: One entry per machine, primary machine first
+        """
+        return [self.machines[machine_id].status() for machine_id in self.machine_ids]
 
     def get_last_prediction(self):
         """
@@ -445,14 +1248,28 @@ class ScheduledInfluxInference:
             "inference_interval_seconds": self.inference_interval,
             "inference_interval_minutes": self.inference_interval / 60,
             "data_collection_interval_seconds": self.data_collection_interval,
+            "sample_interval_seconds": self.sample_interval,
+            "min_coverage": self.min_coverage,
+            "inferences_skipped_low_coverage": sum(machine.skipped_inferences for machine in self.machines.values()),
             "context_length": self.context_length,
             "prediction_length": self.prediction_length,
             "buffer_size": len(self.data_buffer),
+            "buffer_bytes": self.data_buffer.nbytes,
             "buffer_ready": len(self.data_buffer) >= self.context_length,
             "total_inferences_run": self.inference_count,
             "last_inference_time": self.last_alerts.get("timestamp") if self.last_alerts else None,
             "next_inference_time": self.next_inference_time.isoformat() if self.next_inference_time else None,
-            "has_prediction": self.last_prediction is not None
+            "scheduler": self.scheduler.stats(),
+            "has_prediction": self.last_prediction is not None,
+            "ingestion": self.get_ingestion_stats(),
+            "influx": self.influx.breaker.status(),
+            "serving_stale_buffer": self.influx.breaker.state != "closed",
+            "model_ready": self.model_ready.is_set(),
+            "model_load_seconds": self.model_load_seconds,
+            "model_version": self.inference_service.model_version if self.model_ready.is_set() else None,
+            "result_cache": self.inference_service.cache_stats() if self.model_ready.is_set() else None,
+            "executor": self.inference_executor.stats(),
+            "events": self.events.stats()
         }
     
     def get_last_lookback(self):
@@ -462,8 +1279,50 @@ class ScheduledInfluxInference:
         Returns:
             list: Last lookback data (240 points)
         """
+        return self.last_lookback.to_points()
+    
+    def get_last_lookback_window(self):
+        """
+        Return the last lookback as a SensorWindow (arrays, for the columnar response formats).
+        
+        Returns:
+            SensorWindow: Last lookback data (240 points)
+        """
         return self.last_lookback
     
+    def get_last_lookback_since(self, since=None):
+        """
+        Lookback points a client holding everything up to its cursor is missing (incremental polling
+        of /sensor/last-lookback).
+        
+        The lookback is on the resampling grid, so a point's sequence number is its grid slot
+        (epoch time // sample interval), which stays the same from one inference cycle to the next.
+        Each cycle resamples the window again, so a slot the client already holds can change (a
+        late point replacing an interpolated or masked value); the response then starts at the
+        oldest such slot and the client replaces the points it holds from there on.
+        
+        Args:
+            since (int or str): seq of a previous response, or the ISO timestamp of the newest point held (None = all)
+        
+        Returns:
+            tuple: (SensorWindow, seq of the newest point, resync flag); on resync the whole lookback
+        """
+        interval_ns = int(round(self.sample_interval * 1_000_000_000))
+        with self._lookback_lock:
+            window, changes = self._last_lookback, list(self._lookback_changes)
+        slots = window.timestamps // interval_ns
+        seq = int(slots[-1]) if len(window) else 0
+        if since is None or not len(window):
+            return window, seq, False
+        since_slot = since if isinstance(since, int) else datetime_to_epoch_ns(since) // interval_ns
+        if since_slot > seq or since_slot < slots[0] - 1:
+            return window, seq, True  # cursor from another timeline, or the client missed older points
+        if len(changes) == self._lookback_changes.maxlen and changes[0][0] >= since_slot:
+            return window, seq, True  # changes after the client's read are no longer all recorded
+        # Updates made while the newest slot was at or past the cursor may postdate the client's read
+        start_slot = min([since_slot + 1] + [changed for newest, changed in changes if newest >= since_slot])
+        return window.newer_than(start_slot * interval_ns - 1), seq, False
+    
     def get_previous_forecast(self):
         """
         Return the forecast from the previous inference run.
@@ -482,7 +1341,7 @@ class ScheduledInfluxInference:
         Returns:
             list: Current buffer data
         """
-        return list(self.data_buffer)
+        return self._snapshot_buffer().to_points()
     
     def get_latest_point(self):
         """
@@ -491,8 +1350,9 @@ class ScheduledInfluxInference:
         Returns:
             dict: Most recent data point, or None if buffer empty
         """
-        if len(self.data_buffer) > 0:
-            return self.data_buffer[-1]
+        buffer = self._snapshot_buffer()
+        if len(buffer) > 0:
+            return buffer.point(-1)
         return None
 
     def get_last_360_points(self):
@@ -502,8 +1362,7 @@ class ScheduledInfluxInference:
         Returns:
             list: Last 360 data points
         """
-        buffer_list = list(self.data_buffer)
-        return buffer_list[-360:] if len(buffer_list) >= 360 else buffer_list
+        return self._snapshot_buffer(360).to_points()
 
     def get_means_list(self):
         """
@@ -0,0 +1,131 @@
+# services/resampling.py
+"""
+Gap-aware resampling of sensor windows onto the fixed cadence the model was trained on.
+
+The buffers hold points as they arrived: jittered, possibly with duplicates, missing fields (NaN)
+or whole minutes missing after an outage. Taking the last N rows as-is would compress time across
+a gap. resample_to_grid() instead places points on a grid of `interval` spaced slots ending at the
+newest point (slot times are multiples of the interval, so consecutive cycles share slots):
+
+- each point goes to its nearest slot (the newest point wins if two land in one slot)
+- gaps of at most `max_gap` seconds are linearly interpolated (held at the window edges)
+- longer gaps stay NaN and are reported as masked
+
+All steps are NumPy operations over the whole window (one pass per feature column).
+"""
+
+import numpy as np
+from services.sensor_window import SensorWindow
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class ResampledWindow:
+    """
+    A window on the fixed grid plus which slots are real readings.
+
+    Args:
+        window (SensorWindow): Grid window; masked (long-gap) values are NaN
+        observed (np.ndarray): bool (n,), True where a reading landed in the slot
+        masked (np.ndarray): bool (n,), True where any field is left NaN
+    """
+
+    __slots__ = ("window", "observed", "masked")
+
+    def __init__(self, window, observed, masked):
+        self.window = window
+        self.observed = observed
+        self.masked = masked
+
+    @property
+    def coverage(self):
+        """Fraction of grid slots backed by a reading."""
+        return float(self.observed.mean()) if len(self.observed) else 0.0
+
+    def filled(self):
+        """
+        Model input: the grid window with masked values interpolated across (held at the edges).
+        A field with no reading at all becomes 0.
+
+        Returns:
+            SensorWindow: New window without NaN
+        """
+        if not self.masked.any():
+            return self.window
+        values = self.window.values.copy()
+        positions = np.arange(len(values))
+        for column in range(values.shape[1]):
+            missing = np.isnan(values[:, column])
+            if missing.all():
+                values[:, column] = 0.0
+            elif missing.any():
+                values[missing, column] = np.interp(positions[missing], positions[~missing], values[~missing, column])
+        return SensorWindow(self.window.timestamps, values, self.window.machine_id)
+
+    def report(self, interval_seconds):
+        """
+        Coverage summary for logs and status endpoints.
+
+        Returns:
+            dict: coverage, observed / interpolated / masked slot counts and the longest masked gap in seconds
+        """
+        missing = ~self.observed
+        return {
+            "coverage": round(self.coverage, 4),
+            "observed": int(self.observed.sum()),
+            "interpolated": int((missing & ~self.masked).sum()),
+            "masked": int(self.masked.sum()),
+            "longest_gap_seconds": float(_run_lengths(self.masked).max(initial=0) * interval_seconds),
+        }
+
+
+def resample_to_grid(window, interval_seconds, length, max_gap_seconds):
+    """
+    Align a window to `length` slots spaced `interval_seconds` apart, ending at its newest point.
+
+    Args:
+        window (SensorWindow): Buffered points, oldest first
+        interval_seconds (float): Expected sensor cadence
+        length (int): Number of grid slots (the model's context length)
+        max_gap_seconds (float): Longest gap that is interpolated; longer gaps are masked
+
+    Returns:
+        ResampledWindow: Grid window (empty slots NaN) with its observed/masked slots
+    """
+    interval = int(round(interval_seconds * NS_PER_SECOND))
+    values = np.full((length, window.values.shape[1]), np.nan, dtype=np.float32)
+    observed = np.zeros(length, dtype=bool)
+    if len(window) == 0:
+        return ResampledWindow(SensorWindow(np.zeros(length, dtype=np.int64), values, window.machine_id), observed, ~observed)
+
+    end = int(round(window.latest_timestamp / interval)) * interval
+    timestamps = end - interval * np.arange(length - 1, -1, -1, dtype=np.int64)
+
+    # Nearest slot of every point; iterate newest first so np.unique keeps the newest per slot
+    slots = np.rint((window.timestamps[::-1] - timestamps[0]) / interval).astype(np.int64)
+    inside = (slots >= 0) & (slots < length)
+    slots, newest = np.unique(slots[inside], return_index=True)
+    values[slots] = window.values[::-1][inside][newest]
+    observed[slots] = True
+
+    max_gap_slots = int(max_gap_seconds // interval_seconds)
+    positions = np.arange(length)
+    for column in range(values.shape[1]):
+        missing = np.isnan(values[:, column])
+        if not missing.any() or missing.all():
+            continue
+        short = missing & (_run_lengths(missing) <= max_gap_slots)
+        values[short, column] = np.interp(positions[short], positions[~missing], values[~missing, column])
+
+    masked = np.isnan(values).any(axis=1)
+    return ResampledWindow(SensorWindow(timestamps, values, window.machine_id), observed, masked)
+
+
+def _run_lengths(flags):
+    """Length of the run of True values each element belongs to (0 where False)."""
+    if not flags.any():
+        return np.zeros(len(flags), dtype=np.int64)
+    starts = flags & ~np.concatenate(([False], flags[:-1]))
+    run_ids = np.cumsum(starts)
+    lengths = np.bincount(run_ids[flags])
+    return np.where(flags, lengths[run_ids], 0)
@@ -0,0 +1,174 @@
+# services/response_formats.py
+"""
+Content negotiation for the chart endpoints (lookback and forecasts).
+
+The default JSON shape is one dict per point, which repeats the six feature names on every row.
+The other formats carry the same response with the points as columns (Columns): one array per
+feature plus a timestamp array.
+
+    json      rows of dicts (default, unchanged)
+    columnar  JSON, {"timestamp": [...], "current": [...], ...}
+    msgpack   the columnar document as MessagePack (floats packed as float32)      needs msgpack
+    arrow     Arrow IPC stream of the columns; the rest of the document is stored  needs pyarrow
+              as JSON in the schema metadata under b"response"
+
+A format is chosen with ?format=, or from the Accept header when no format is given. Missing
+readings (NaN) are null in every format.
+"""
+
+import numpy as np
+from services.fast_json import dumps
+from services.sensor_window import epoch_ns_to_iso
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install msgpack
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # optional: pip install pyarrow
+    pyarrow = None
+
+JSON, COLUMNAR, MSGPACK, ARROW = "json", "columnar", "msgpack", "arrow"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    COLUMNAR: "application/json",
+    MSGPACK: "application/msgpack",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+_ACCEPT_FORMATS = {
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+}
+
+
+class UnsupportedFormatError(ValueError):
+    """The requested format is unknown or its optional dependency is not installed."""
+
+
+def negotiate(format_param=None, accept=None):
+    """
+    Pick the response format.
+
+    Args:
+        format_param (str): ?format= value (takes precedence)
+        accept (str): Accept header
+
+    Returns:
+        str: 'json', 'columnar', 'msgpack' or 'arrow'
+
+    Raises:
+        UnsupportedFormatError: Unknown format, or msgpack/pyarrow not installed
+    """
+    if format_param:
+        fmt = format_param.lower()
+        if fmt not in MEDIA_TYPES:
+            raise UnsupportedFormatError(f"Unknown format '{format_param}' (expected one of: {', '.join(MEDIA_TYPES)})")
+    else:
+        media_types = [part.split(";")[0].strip().lower() for part in (accept or "").split(",")]
+        fmt = next((_ACCEPT_FORMATS[media_type] for media_type in media_types if media_type in _ACCEPT_FORMATS), JSON)
+    if fmt == MSGPACK and msgpack is None:
+        raise UnsupportedFormatError("format=msgpack needs the msgpack package (pip install msgpack)")
+    if fmt == ARROW and pyarrow is None:
+        raise UnsupportedFormatError("format=arrow needs the pyarrow package (pip install pyarrow)")
+    return fmt
+
+
+class Columns:
+    """
+    Tabular part of a response in column form.
+
+    Args:
+        columns (dict): Column name -> 1-D array, all the same length
+        timestamps (np.ndarray): Epoch nanoseconds of the rows (None if the rows have no timestamps)
+    """
+
+    __slots__ = ("columns", "timestamps")
+
+    def __init__(self, columns, timestamps=None):
+        self.columns = columns
+        self.timestamps = timestamps
+
+    @classmethod
+    def from_matrix(cls, values, names, timestamps=None, **leading):
+        """
+        Columns of a (n, len(names)) matrix, e.g. a SensorWindow's values or a forecast.
+
+        Args:
+            leading: Extra columns placed first (e.g. step=np.arange(1, n + 1))
+        """
+        values = np.asarray(values)
+        return cls({**leading, **{name: values[:, i] for i, name in enumerate(names)}}, timestamps)
+
+    def to_dict(self):
+        """Column dict for the JSON/MessagePack documents (timestamps as ISO-8601 strings)."""
+        timestamps = epoch_ns_to_iso(self.timestamps) if self.timestamps is not None else None
+        return {"timestamp": timestamps, **self.columns}
+
+
+def encode(content, fmt):
+    """
+    Encode a response document.
+
+    Args:
+        content (dict): Response; its tabular part is a Columns for every format but 'json'
+        fmt (str): Format from negotiate()
+
+    Returns:
+        bytes: Response body
+    """
+    if fmt == ARROW:
+        return _encode_arrow(content)
+    document = _replace_columns(content, Columns.to_dict)
+    if fmt == MSGPACK:
+        return msgpack.packb(document, default=_msgpack_default, use_single_float=True)
+    return dumps(document)
+
+
+def _replace_columns(content, replace):
+    if isinstance(content, Columns):
+        return replace(content)
+    if isinstance(content, dict):
+        return {key: _replace_columns(value, replace) for key, value in content.items()}
+    return content
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f" and np.isnan(obj).any():
+            rows = obj.astype(object)
+            rows[np.isnan(obj)] = None  # missing reading
+            return rows.tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not MessagePack serializable: {type(obj).__name__}")
+
+
+def _encode_arrow(content):
+    tables = []
+
+    def take(columns):
+        tables.append(columns)
+        return None
+    metadata = _replace_columns(content, take)
+    columns = tables[0] if tables else Columns({})
+
+    arrays, names = [], []
+    if columns.timestamps is not None:
+        arrays.append(pyarrow.array(np.asarray(columns.timestamps, dtype=np.int64), type=pyarrow.timestamp("ns", tz="UTC")))
+        names.append("timestamp")
+    for name, values in columns.columns.items():
+        arrays.append(pyarrow.array(np.asarray(values), from_pandas=True))  # NaN -> null
+        names.append(name)
+    table = pyarrow.Table.from_arrays(arrays, names=names).replace_schema_metadata({b"response": dumps(metadata)})
+
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
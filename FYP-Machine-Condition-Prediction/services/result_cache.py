@@ -0,0 +1,119 @@
+# services/result_cache.py
+"""
+Content-addressed cache of inference outputs.
+
+A window is identified by a hash of its timestamps, machine_id and raw feature values together with
+everything else that determines the forecast (model version, engine/precision, preprocessing
+parameters). Re-running inference on an identical window (no new points since the last cycle,
+a stalled sensor, a backfill returning the same rows) then returns the stored results and alerts
+instead of running the pipeline again.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from services.sensor_window import SensorWindow
+
+
+def _frozen(results):
+    """Copy of a results dict with read-only copies of its arrays (shared by every later hit)."""
+    frozen = {}
+    for name, value in results.items():
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+            value.setflags(write=False)
+        frozen[name] = value
+    return frozen
+
+
+class InferenceResultCache:
+    """
+    Bounded LRU cache mapping window keys to (results, alerts).
+
+    Stored arrays are read-only copies, so neither the run that filled an entry nor any hit can
+    modify what later hits receive.
+    """
+
+    def __init__(self, max_entries=64):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(buffer_data, raw_data, context):
+        """
+        Build the cache key for one window.
+
+        Args:
+            buffer_data (SensorWindow or list of dicts): Window points (timestamps and machine_id are hashed)
+            raw_data (np.ndarray): Raw feature values extracted from the window (240, 6)
+            context (tuple): Model version and preprocessing parameters
+
+        Returns:
+            str: Hex digest identifying the window and pipeline configuration
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(context).encode())
+        if isinstance(buffer_data, SensorWindow):
+            digest.update(str(buffer_data.machine_id).encode())
+            digest.update(buffer_data.timestamps.tobytes())
+        else:
+            digest.update(str(buffer_data[0].get('machine_id')).encode())
+            digest.update("\x1f".join(str(point.get('timestamp')) for point in buffer_data).encode())
+        digest.update(raw_data.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a window; a hit refreshes its LRU position.
+
+        Returns:
+            tuple: (results, alerts) shallow copies (the arrays are read-only), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        results, alerts = entry
+        return dict(results), dict(alerts)
+
+    def put(self, key, results, alerts):
+        """Store the outputs of a successful run, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (_frozen(results), dict(alerts))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries (e.g. after swapping the model); counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Hit/miss counters for the status endpoint.
+
+        Returns:
+            dict: entries, max_entries, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
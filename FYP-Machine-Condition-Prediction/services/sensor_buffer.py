@@ -0,0 +1,107 @@
+# services/sensor_buffer.py
+"""
+Fixed-size ring buffer of sensor points for one machine.
+
+Storage is preallocated once: a (2 * capacity, 6) float32 value array and a (2 * capacity,) int64
+timestamp array. Every point is written twice, at slot i and at slot i + capacity (a "mirrored"
+ring), so the newest n points (n <= capacity) always form one contiguous slice even after the
+write position wraps. window() therefore returns SensorWindow views that go into the model
+without copying, and appending a point is O(1) with no allocation.
+
+A view stays valid until capacity - n further points have been appended (those writes land
+outside the viewed slice); reset() switches to fresh storage so a backfill never overwrites a
+window that is still being read.
+"""
+
+import numpy as np
+from services.sensor_window import SensorWindow, FEATURE_NAMES
+
+
+class SensorRingBuffer:
+    """
+    Mirrored ring buffer of the newest `capacity` points.
+
+    Args:
+        capacity (int): Max points kept
+        machine_id (str): Machine the points belong to (attached to the returned windows)
+    """
+
+    def __init__(self, capacity, machine_id=None):
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.machine_id = machine_id
+        self.total_appended = 0
+        self._allocate()
+
+    def _allocate(self):
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._values = np.zeros((2 * self.capacity, len(FEATURE_NAMES)), dtype=np.float32)
+        self._write = 0  # next slot in [0, capacity)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Memory held by the preallocated arrays."""
+        return self._timestamps.nbytes + self._values.nbytes
+
+    @property
+    def latest_timestamp(self):
+        """Epoch nanoseconds of the newest point (None when empty)."""
+        if self._size == 0:
+            return None
+        return int(self._timestamps[self._write + self.capacity - 1])
+
+    def append(self, timestamp, values):
+        """Append one point (O(1), no allocation)."""
+        slot = self._write
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = timestamp
+        self._values[slot] = values
+        self._values[slot + self.capacity] = values
+        self._write = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total_appended += 1
+
+    def extend(self, window):
+        """
+        Append a window of points, oldest first (only the newest `capacity` are kept).
+
+        Args:
+            window (SensorWindow): Points newer than the current contents
+        """
+        count = len(window)
+        if count == 0:
+            return
+        timestamps, values = window.timestamps[-self.capacity:], window.values[-self.capacity:]
+        kept = len(timestamps)
+        slots = (self._write + np.arange(kept)) % self.capacity
+        self._timestamps[slots] = self._timestamps[slots + self.capacity] = timestamps
+        self._values[slots] = values
+        self._values[slots + self.capacity] = values
+        self._write = (self._write + kept) % self.capacity
+        self._size = min(self._size + kept, self.capacity)
+        self.total_appended += count
+
+    def reset(self, window=None):
+        """
+        Drop the contents (optionally refilling from a window) on fresh storage, so views handed
+        out earlier keep their data.
+        """
+        self._allocate()
+        if window is not None:
+            self.extend(window)
+
+    def window(self, n=None):
+        """
+        Newest n points (default: all) as a zero-copy SensorWindow view, oldest first. Read it
+        while appends are excluded (e.g. under the owner's lock) or copy() it before handing it on.
+
+        Returns:
+            SensorWindow: View into the buffer storage (valid for capacity - n further appends)
+        """
+        n = self._size if n is None else min(n, self._size)
+        end = self._write + self.capacity
+        return SensorWindow(self._timestamps[end - n:end], self._values[end - n:end], self.machine_id)
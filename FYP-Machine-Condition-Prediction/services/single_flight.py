@@ -0,0 +1,141 @@
+# services/single_flight.py
+"""
+Single-flight coalescing of identical InfluxDB window queries.
+
+At startup the prefill, the first collection cycle and the inference loop's backfill path can all
+ask for the same fleet window at nearly the same moment. SingleFlight runs one of them (the
+leader); callers that arrive while it is in flight wait for its result instead of issuing their
+own round-trip and decode. The result is then kept for a short TTL so that near-simultaneous
+consumers reuse it too. A consumer is never handed back a cached result it already received,
+so a polling loop that repeats the same query still sees new rows on its next cycle.
+
+Works for threads and asyncio tasks alike: waiters share a concurrent.futures.Future. If the
+leader is cancelled (or interrupted) instead of failing, the waiters are not: one of them retries
+as the new leader.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _LeaderAbandoned(Exception):
+    """Set on the shared future when the leader stopped without a result or an ordinary error."""
+
+
+class SingleFlight:
+    """
+    Coalesces calls by key.
+
+    Args:
+        ttl_seconds (float): How long a finished result is shared with other consumers (0 = in-flight only)
+        clock (callable): Monotonic clock (injectable for tests)
+    """
+
+    def __init__(self, ttl_seconds=2.0, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> (Future, consumers)
+        self._recent = {}  # key -> (expires_at, result, consumers already served)
+
+        self.executions = 0
+        self.shared_in_flight = 0
+        self.ttl_hits = 0
+
+    def do(self, key, fn, consumer=None):
+        """
+        Return fn()'s result, sharing it with identical concurrent/recent calls.
+
+        Args:
+            key (hashable): Identity of the call (e.g. the Flux query text)
+            fn (callable): Does the work when this call leads
+            consumer (str): Caller identity for TTL reuse (None: only in-flight sharing)
+        """
+        future, leader = self._join(key, consumer)
+        while not leader:
+            try:
+                return future.result()
+            except _LeaderAbandoned:
+                future, leader = self._join(key, consumer)
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key, coro_fn, consumer=None):
+        """Async counterpart of do(); coro_fn() returns the awaitable doing the work."""
+        future, leader = self._join(key, consumer)
+        while not leader:
+            try:
+                # shield: a cancelled waiter must not cancel the future the others share
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderAbandoned:
+                future, leader = self._join(key, consumer)
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def _join(self, key, consumer):
+        """
+        Returns:
+            tuple: (Future holding the result, True if the caller must do the work)
+        """
+        with self._lock:
+            now = self._clock()
+            for stale in [k for k, (expires, _, _) in self._recent.items() if expires <= now]:
+                del self._recent[stale]
+
+            recent = self._recent.get(key)
+            if recent is not None and consumer is not None and consumer not in recent[2]:
+                recent[2].add(consumer)
+                self.ttl_hits += 1
+                future = Future()
+                future.set_result(recent[1])
+                return future, False
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                in_flight[1].add(consumer)
+                self.shared_in_flight += 1
+                return in_flight[0], False
+
+            future = Future()
+            self._in_flight[key] = (future, {consumer})
+            self.executions += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            _, consumers = self._in_flight.pop(key)
+            if error is None and self.ttl_seconds > 0:
+                self._recent[key] = (self._clock() + self.ttl_seconds, result, consumers)
+        if error is None:
+            future.set_result(result)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # CancelledError/KeyboardInterrupt concern the leader only; raised in a waiter they would
+            # stop a loop that was never cancelled
+            future.set_exception(_LeaderAbandoned(f"leader of {key!r} stopped: {type(error).__name__}"))
+
+    def stats(self):
+        """
+        Returns:
+            dict: executions (round-trips), calls served from an in-flight call or from the TTL cache
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "shared_in_flight": self.shared_in_flight,
+                "ttl_hits": self.ttl_hits,
+                "ttl_seconds": self.ttl_seconds,
+            }
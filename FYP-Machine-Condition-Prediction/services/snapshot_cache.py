@@ -0,0 +1,78 @@
+# services/snapshot_cache.py
+"""
+Pre-serialized JSON snapshots of the read endpoints.
+
+The dashboard polls the forecast/lookback endpoints far more often than their data changes
+(once per inference cycle). Each endpoint's response is rendered and encoded to JSON bytes once
+per data version and then served as-is; a strong ETag (hash of the bytes) lets pollers revalidate
+with If-None-Match and get an empty 304 when nothing changed. A new version (next inference or
+ingest cycle) invalidates the snapshot on the next request.
+"""
+
+import hashlib
+import threading
+from services.fast_json import dumps
+
+
+class Snapshot:
+    """Encoded body of one endpoint at one data version."""
+
+    __slots__ = ("version", "body", "etag")
+
+    def __init__(self, version, body):
+        self.version = version
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+class SnapshotCache:
+    """
+    Latest snapshot per endpoint name.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def get(self, name, version, render, encode=dumps):
+        """
+        Snapshot of an endpoint, rendered only if the version changed since the last one.
+
+        Args:
+            name (str): Endpoint key
+            version (hashable): Data version the response depends on (e.g. inference count)
+            render (callable): Builds the response dict, NumPy arrays allowed (only called on a version change)
+            encode (callable): Response dict -> bytes (default: JSON)
+
+        Returns:
+            Snapshot: Encoded body and its ETag
+        """
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+            if snapshot is None or snapshot.version != version:
+                snapshot = Snapshot(version, encode(render()))
+                self._snapshots[name] = snapshot
+                self.renders += 1
+            return snapshot
+
+    def stats(self):
+        return {"endpoints": len(self._snapshots), "renders": self.renders, "hits": self.hits,
+                "not_modified": self.not_modified}
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value matches the ETag (weak comparison, '*' matches anything)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
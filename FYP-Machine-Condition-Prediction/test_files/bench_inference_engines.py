@@ -0,0 +1,48 @@
+# test_files/bench_inference_engines.py
+
+# Run with: python -m test_files.bench_inference_engines [base_dir]
+
+# Compares every inference engine and reduced-precision mode against eager fp32 PyTorch: max abs
+# difference of the raw predictions and median/p95 latency of the forward pass for a single window
+# and a batch of 50, plus the weight memory of each precision.
+# Without a base_dir a tiny randomly initialised PatchTST is used, so only the relative
+# overhead of each backend is meaningful; pass the real AI-Model-Artifacts/<variant> for production numbers.
+
+import sys
+import tempfile
+import numpy as np
+from services.inference_service_3 import InferenceService
+from services.inference_engines import ENGINES, PRECISIONS, check_parity, measure_latency, model_size_bytes
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+def main(base_dir=None, batch_sizes=(1, 50), runs=20):
+    if base_dir is None:
+        base_dir = build_tiny_artifacts(tempfile.mkdtemp())
+    
+    services = {name: InferenceService(base_dir=base_dir, engine=name) for name in ENGINES}
+    for precision in PRECISIONS[1:]:
+        services[f"eager-{precision}"] = InferenceService(base_dir=base_dir, precision=precision)
+    
+    print("Weight memory:")
+    for precision in PRECISIONS:
+        service = services["eager" if precision == "fp32" else f"eager-{precision}"]
+        print(f"  {precision:5s}: {model_size_bytes(service.model) / 1024:,.1f} KB")
+    eager = services["eager"].engine
+    rng = np.random.default_rng(0)
+    
+    for batch_size in batch_sizes:
+        sample = rng.standard_normal((batch_size, 240, 6)).astype(np.float32)
+        print(f"\nBatch size {batch_size}")
+        for name, service in services.items():
+            engine = service.engine
+            if engine.name != name.split("-")[0]:
+                print(f"  {name:12s}: unavailable (fell back to {engine.name})")
+                continue
+            _, max_abs_diff = check_parity(engine, eager, sample)
+            p50, p95 = measure_latency(engine, sample, runs=runs)
+            print(f"  {name:12s}: p50={p50:8.3f} ms, p95={p95:8.3f} ms, max abs diff vs eager={max_abs_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
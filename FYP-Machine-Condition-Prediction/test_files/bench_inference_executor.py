@@ -0,0 +1,85 @@
+# test_files/bench_inference_executor.py
+
+# Run with: python -m test_files.bench_inference_executor [batch_size]
+
+# p50/p99 latency of GET /inference/status while the model runs continuously in the background:
+# - idle:     no inference running (reference)
+# - inline:   forward passes on a plain background thread with torch's default thread count
+#             (how start_stream ran inference before the executor)
+# - executor: forward passes on the dedicated InferenceExecutor, leaving one core to the API
+#             (intra-op threads = cores - 1, pinned to the other cores when there are several,
+#             niceness +10)
+# Each mode runs in a fresh interpreter because torch thread settings are process-wide.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from test_files.model_fixtures import build_tiny_artifacts
+from test_files.test_startup import PROJECT_DIR, STARTUP_ENV
+
+CHILD_SCRIPT = """
+import json, os, sys, threading, time
+import numpy as np
+import app
+from fastapi.testclient import TestClient
+from fake_data.sensor_windows import generate_fake_sensor_window
+
+mode, base_dir, batch_size, requests = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+streamer = app.streamer
+registry = streamer.model_registry
+registry.root_dir, registry.default_variant = os.path.split(base_dir)
+registry.service_kwargs["cache_size"] = 0
+streamer.load_model()
+windows = [generate_fake_sensor_window(240, machine_id=f"machine_{i}", seed=i) for i in range(batch_size)]
+
+stop = threading.Event()
+runs = [0]
+def inference_loop():
+    while not stop.is_set():
+        if mode == "executor":
+            streamer.inference_executor.run(streamer.inference_service.run_inference_batch, windows)
+        else:
+            streamer.inference_service.run_inference_batch(windows)
+        runs[0] += 1
+worker = threading.Thread(target=inference_loop, daemon=True)
+if mode != "idle":
+    worker.start()
+    time.sleep(1.0)
+
+client = TestClient(app.app)
+timings = []
+for _ in range(requests):
+    start = time.perf_counter()
+    client.get("/inference/status")
+    timings.append((time.perf_counter() - start) * 1000)
+    time.sleep(0.005)
+stop.set()
+if mode != "idle":
+    worker.join()  # let the last forward pass finish before the interpreter exits
+print(json.dumps({"p50": float(np.percentile(timings, 50)), "p99": float(np.percentile(timings, 99)), "runs": runs[0]}))
+"""
+
+
+def main(batch_size=64, requests=300):
+    base_dir = build_tiny_artifacts(tempfile.mkdtemp())
+    cores = os.cpu_count() or 1
+    executor_env = {"INFERENCE_THREADS": str(max(1, cores - 1)), "INFERENCE_NICE": "10"}
+    if cores > 1:
+        executor_env["INFERENCE_CPUS"] = f"1-{cores - 1}"
+    
+    print(f"{cores} CPU core(s), inference batch of {batch_size} windows, {requests} requests per mode")
+    for mode, extra_env in [("idle", {}), ("inline", {}), ("executor", executor_env)]:
+        env = {**os.environ, **STARTUP_ENV, "LOG_LEVEL": "WARNING", **extra_env}
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, mode, base_dir, str(batch_size), str(requests)],
+            cwd=PROJECT_DIR, capture_output=True, text=True, env=env, check=True,
+        )
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"  {mode:9s}: /inference/status p50={stats['p50']:7.2f} ms, p99={stats['p99']:7.2f} ms "
+              f"({stats['runs']} inference batches during the run)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
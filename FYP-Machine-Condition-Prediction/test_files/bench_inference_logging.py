@@ -0,0 +1,53 @@
+# test_files/bench_inference_logging.py
+
+# Run with: python -m test_files.bench_inference_logging
+
+# Compares run_inference latency with the full DEBUG pipeline trace (equivalent to the old
+# print-everything behaviour) against the default INFO level, where no row formatting happens.
+# Uses a tiny randomly initialised PatchTST so the numbers isolate the non-model overhead.
+
+import io
+import logging
+import tempfile
+import time
+import numpy as np
+from services.inference_service_3 import InferenceService
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+def time_runs(service, window, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        service.run_inference(window)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.median(timings), np.percentile(timings, 95)
+
+
+def main(runs=200):
+    service = InferenceService(base_dir=build_tiny_artifacts(tempfile.mkdtemp()))
+    window = generate_fake_sensor_window(240, seed=0)
+    
+    # Send log records to an in-memory stream so terminal I/O does not dominate
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    root = logging.getLogger()
+    root.handlers = [handler]
+    
+    results = {}
+    for label, level in [("DEBUG (full trace)", logging.DEBUG), ("INFO (default)", logging.INFO), ("WARNING (quiet)", logging.WARNING)]:
+        root.setLevel(level)
+        time_runs(service, window, 10)  # warm-up
+        stream.seek(0)
+        stream.truncate()
+        results[label] = time_runs(service, window, runs)
+        log_bytes = len(stream.getvalue()) / runs
+        print(f"{label:20s}: p50={results[label][0]:.3f} ms, p95={results[label][1]:.3f} ms, log output={log_bytes:,.0f} bytes/run")
+    
+    saving = results["DEBUG (full trace)"][0] - results["INFO (default)"][0]
+    print(f"\nMedian saving per inference (DEBUG -> INFO): {saving:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
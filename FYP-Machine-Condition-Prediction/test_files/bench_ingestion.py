@@ -0,0 +1,98 @@
+# test_files/bench_ingestion.py
+
+# Run with: python -m test_files.bench_ingestion [cycles]
+
+# Rows and bytes fetched per collection cycle in 'full' mode (re-query the last 240 points every
+# cycle) versus 'delta' mode (cursor-based, only rows newer than the last buffered point), plus
+# the client-side time per cycle. Uses the in-memory FakeInfluxClient, which renders the same
+# annotated CSV InfluxDB returns from query_raw; one new point arrives per 10-second cycle.
+# The fleet section runs delta mode for 1..N machines to show that one grouped query per cycle
+# covers every machine. Also times decoding one 240-row response into a model input array: the previous row path
+# (dict per row with float() calls, then np.array) versus the columnar read_columns() path.
+
+import os
+import sys
+import time
+import numpy as np
+from test_files.fake_influx import FakeInfluxClient, parse_annotated_csv, parse_rfc3339
+from test_files.test_startup import STARTUP_ENV
+
+MACHINE_ID = "machine_1"
+
+
+def run(mode, cycles, machine_ids=(MACHINE_ID,)):
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    
+    influx = FakeInfluxClient()
+    influx.advance(machine_ids, 300)
+    streamer = ScheduledInfluxInference(data_collection_interval_seconds=10, ingestion_mode=mode,
+                                         machine_ids=list(machine_ids))
+    streamer.influx_client = influx
+    
+    elapsed = 0.0
+    for _ in range(cycles):
+        influx.advance(machine_ids, 1)
+        start = time.perf_counter()
+        streamer._collect_once()
+        elapsed += time.perf_counter() - start
+    stats = streamer.get_ingestion_stats()
+    stats["ms_per_cycle"] = elapsed / cycles * 1000
+    return stats
+
+
+def decode_rows(text):
+    """Previous decode path: one dict per row, then the feature array built from the dicts."""
+    from services.sensor_window import FEATURE_NAMES
+    
+    points = [
+        {"timestamp": parse_rfc3339(row["_time"]).isoformat(),
+         **{name: float(row.get(name, 0) or 0) for name in FEATURE_NAMES},
+         "machine_id": MACHINE_ID}
+        for row in parse_annotated_csv(text)
+    ]
+    return np.array([[point[name] for name in FEATURE_NAMES] for point in points], dtype=np.float32)
+
+
+def decode_columns(text):
+    from services.flux_csv import read_columns
+    from services.sensor_window import FEATURE_NAMES
+    return read_columns(text, FEATURE_NAMES)[1]
+
+
+def time_decode(fn, text, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(text)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(cycles=100):
+    for key, value in STARTUP_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    
+    results = {mode: run(mode, cycles) for mode in ("full", "delta")}
+    print(f"{cycles} collection cycles, 1 new point per cycle")
+    for mode, stats in results.items():
+        print(f"  {mode:5s}: {stats['avg_rows_per_cycle']:7.2f} rows/cycle, {stats['avg_bytes_per_cycle']:10,.0f} bytes/cycle, "
+              f"{stats['ms_per_cycle']:6.2f} ms/cycle ({stats['full_backfills']} full backfills, {stats['delta_queries']} delta queries)")
+    ratio = results["full"]["bytes_fetched"] / results["delta"]["bytes_fetched"]
+    print(f"\nBytes reduction: {ratio:.1f}x")
+    
+    print(f"\nFleet, delta mode, {cycles // 4} cycles")
+    for fleet_size in (1, 10, 50):
+        stats = run("delta", cycles // 4, [f"machine_{i}" for i in range(fleet_size)])
+        print(f"  {fleet_size:3d} machines: {stats['avg_queries_per_cycle']:.2f} queries/cycle, "
+              f"{stats['avg_rows_per_cycle']:8.2f} rows/cycle, {stats['ms_per_cycle']:6.2f} ms/cycle")
+    
+    influx = FakeInfluxClient()
+    influx.advance([MACHINE_ID], 240)
+    text = influx.render(f'range(start: -120m) r["machine_id"] == "{MACHINE_ID}" tail(n: 240)')
+    np.testing.assert_allclose(decode_columns(text), decode_rows(text))
+    rows_ms, columns_ms = time_decode(decode_rows, text), time_decode(decode_columns, text)
+    print(f"\nDecode 240-row response: row dicts {rows_ms:.3f} ms, columnar {columns_ms:.3f} ms "
+          f"({rows_ms / columns_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,83 @@
+# test_files/bench_json.py
+
+# Run with: python -m test_files.bench_json [repeats]
+
+# Build + encode time and payload size of the lookback and forecast responses: the previous path
+# (per-element float() calls and .tolist() arrays, then FastAPI's jsonable_encoder + stdlib json)
+# versus services.fast_json (NumPy arrays encoded natively by orjson, when installed).
+
+import json
+import sys
+import time
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from services import fast_json
+from services.sensor_window import SensorWindow, FEATURE_NAMES
+from fake_data.sensor_windows import generate_fake_sensor_window
+
+
+def stdlib_encode(content):
+    """What FastAPI did for a returned dict."""
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def forecast_previous(forecast, scaled, raw, timestamps):
+    return {
+        "predictions": [
+            {"step": i + 1, "timestamp": timestamps[i],
+             "current": float(forecast[i, 0]), "tempA": float(forecast[i, 1]), "tempB": float(forecast[i, 2]),
+             "accX": float(forecast[i, 3]), "accY": float(forecast[i, 4]), "accZ": float(forecast[i, 5])}
+            for i in range(forecast.shape[0])
+        ],
+        "scaled_forecast_array": scaled.tolist(),
+        "raw_forecast_array": raw.tolist(),
+    }
+
+
+def forecast_fast(forecast, scaled, raw, timestamps):
+    return {
+        "predictions": [
+            {"step": i + 1, "timestamp": timestamps[i], **dict(zip(FEATURE_NAMES, row))}
+            for i, row in enumerate(forecast.tolist())
+        ],
+        "scaled_forecast_array": scaled,
+        "raw_forecast_array": raw,
+    }
+
+
+def time_ms(fn, repeats):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main(repeats=200):
+    rng = np.random.default_rng(0)
+    window = SensorWindow.from_points(generate_fake_sensor_window(240, machine_id="machine_1", seed=0))
+    forecast = rng.normal(size=(60, 6))  # inverse_transform output (float64)
+    scaled = rng.normal(size=(60, 6)).astype(np.float32)
+    raw = rng.normal(size=(60, 6)).astype(np.float32)
+    timestamps = [window.timestamp_iso(-1)] * 60
+    
+    cases = {
+        "lookback (240 points)": (
+            lambda: stdlib_encode({"status": "success", "points_collected": len(window), "data": window.to_points()}),
+            lambda: fast_json.dumps({"status": "success", "points_collected": len(window), "data": window.to_points()}),
+        ),
+        "forecast (60x6 + arrays)": (
+            lambda: stdlib_encode(forecast_previous(forecast, scaled, raw, timestamps)),
+            lambda: fast_json.dumps(forecast_fast(forecast, scaled, raw, timestamps)),
+        ),
+    }
+    print(f"Encoder: {'orjson ' + fast_json.orjson.__version__ if fast_json.orjson else 'stdlib json (orjson not installed)'}")
+    for label, (previous, fast) in cases.items():
+        previous_ms, fast_ms = time_ms(previous, repeats), time_ms(fast, repeats)
+        previous_bytes, fast_bytes = len(previous()), len(fast())
+        print(f"  {label:25s}: {previous_ms:7.3f} ms -> {fast_ms:7.3f} ms ({previous_ms / fast_ms:4.1f}x), "
+              f"{previous_bytes:,} -> {fast_bytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
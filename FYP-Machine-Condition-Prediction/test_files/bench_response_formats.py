@@ -0,0 +1,59 @@
+# test_files/bench_response_formats.py
+
+# Run with: python -m test_files.bench_response_formats [repeats]
+
+# Encode time, decode time and payload size of the lookback response (240 points) in each format of
+# services.response_formats: the row-of-dicts JSON default versus columnar JSON, MessagePack and
+# Arrow IPC. Formats whose optional package is not installed are skipped.
+
+import json
+import sys
+import time
+from services import response_formats
+from services.response_formats import Columns
+from services.sensor_window import SensorWindow, FEATURE_NAMES
+from fake_data.sensor_windows import generate_fake_sensor_window
+
+
+def time_ms(fn, repeats):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def lookback_document(window, fmt):
+    if fmt == response_formats.JSON:
+        return {"status": "success", "points_collected": len(window), "data": window.to_points()}
+    return {"status": "success", "points_collected": len(window), "machine_id": window.machine_id,
+            "data": Columns.from_matrix(window.values, FEATURE_NAMES, window.timestamps)}
+
+
+def decoder(fmt):
+    if fmt == response_formats.MSGPACK:
+        return response_formats.msgpack.unpackb
+    if fmt == response_formats.ARROW:
+        return lambda body: response_formats.pyarrow.ipc.open_stream(body).read_all()
+    return json.loads
+
+
+def main(repeats=200):
+    window = SensorWindow.from_points(generate_fake_sensor_window(240, machine_id="machine_1", seed=0))
+    baseline = None
+    for fmt in response_formats.MEDIA_TYPES:
+        try:
+            response_formats.negotiate(fmt)
+        except response_formats.UnsupportedFormatError as e:
+            print(f"  {fmt:9s}: skipped ({e})")
+            continue
+        encode = lambda: response_formats.encode(lookback_document(window, fmt), fmt)
+        body, decode = encode(), decoder(fmt)
+        encode_ms, decode_ms = time_ms(encode, repeats), time_ms(lambda: decode(body), repeats)
+        baseline = baseline or len(body)
+        print(f"  {fmt:9s}: encode {encode_ms:6.3f} ms, decode {decode_ms:6.3f} ms, "
+              f"{len(body):7,} bytes ({len(body) / baseline:4.0%} of json)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,63 @@
+# test_files/bench_startup.py
+
+# Run with: python -m test_files.bench_startup [base_dir]
+
+# Measures service start-up in a fresh interpreter for each run:
+# - import: time to import app (FastAPI app + streamer construction, no model)
+# - first request: import + first /health/ready response (time-to-first-request)
+# - model ready: background model/scaler load + warm-up forward pass (streamer.load_model)
+# Without a base_dir a tiny randomly initialised PatchTST is used; pass the real
+# AI-Model-Artifacts/<variant> for production numbers.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from test_files.model_fixtures import build_tiny_artifacts
+from test_files.test_startup import PROJECT_DIR, STARTUP_ENV
+
+CHILD_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+status_code = TestClient(app.app).get("/health/ready").status_code
+first_request = time.perf_counter()
+registry = app.streamer.model_registry
+registry.root_dir, registry.default_variant = os.path.split(sys.argv[1])
+app.streamer.load_model()
+ready = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "first request": first_request - start,
+    "first status": status_code,
+    "model ready": ready - start,
+    "warm-up": app.streamer.warmup_ms / 1000,
+}))
+"""
+
+
+def main(base_dir=None, runs=5):
+    if base_dir is None:
+        base_dir = build_tiny_artifacts(tempfile.mkdtemp())
+    
+    env = {**os.environ, **STARTUP_ENV, "LOG_LEVEL": "WARNING"}
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT, os.path.abspath(base_dir)],
+            cwd=PROJECT_DIR, capture_output=True, text=True, env=env, check=True,
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    
+    print(f"Startup over {runs} fresh interpreters (first /health/ready status: {samples[0]['first status']})")
+    for key in ("import", "first request", "model ready", "warm-up"):
+        values = np.array([sample[key] for sample in samples]) * 1000
+        print(f"  {key:14s}: p50={np.median(values):8.1f} ms, max={values.max():8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,12 @@
+# test_files/conftest.py
+
+# configs.mongodb_config reads the Influx settings once, when it is first imported. Depending on the
+# collection order that happens while test modules are imported (e.g. test_email_access.py), before
+# any fixture could monkeypatch the environment, so the placeholders are set here, ahead of every
+# test module. Values already in the environment are kept.
+
+import os
+from test_files.test_startup import STARTUP_ENV
+
+for key, value in STARTUP_ENV.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,216 @@
+# test_files/fake_influx.py
+
+# In-memory stand-in for InfluxDBClient used by the ingestion tests and benchmarks.
+# It answers the streamer's pivoted Flux queries (relative or absolute range start, machine_id
+# equality or regex filter grouped into one table per machine, tail(n) per table)
+# with annotated CSV in the same layout InfluxDB returns from query_raw, so row and byte
+# counts are representative of the real HTTP responses. parse_annotated_csv()/parse_rfc3339() are
+# the row-at-a-time reference decoder that services.flux_csv.read_columns() is checked against.
+
+import asyncio
+import csv
+import io
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from fake_data.sensor_windows import generate_fake_sensor_point
+from services.flux_csv import FluxQueryError
+
+FIELDS = ['accX', 'accY', 'accZ', 'current', 'tempA', 'tempB']  # pivot() orders columns by name
+
+_RELATIVE_START = re.compile(r'range\(start:\s*-(\d+)m\)')
+_ABSOLUTE_START = re.compile(r'range\(start:\s*time\(v:\s*"([^"]+)"\)\)')
+_TAIL = re.compile(r'tail\(n:\s*(\d+)\)')
+_MACHINE = re.compile(r'r\["machine_id"\]\s*==\s*"([^"]*)"')
+_MACHINE_REGEX = re.compile(r'r\["machine_id"\]\s*=~\s*/(.*?)/\)')
+
+
+def _rfc3339(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ").replace(".000000Z", "Z")
+
+
+def parse_annotated_csv(text):
+    """
+    Parse annotated CSV into one dict per data row (column name -> raw string).
+
+    Tables are separated by blank lines and each starts with its own annotation rows (#datatype,
+    #group, #default) and header row, so the header is re-read after every boundary.
+
+    Args:
+        text (str): Response body
+
+    Returns:
+        list of dict
+    """
+    rows = []
+    header = None
+    for row in csv.reader(io.StringIO(text)):
+        if not row or not any(row):
+            header = None
+            continue
+        if row[0].startswith("#"):
+            header = None
+            continue
+        if header is None:
+            header = row
+            continue
+        record = dict(zip(header, row))
+        if "error" in header and "_time" not in header:
+            raise FluxQueryError(record.get("error") or "unknown Flux error")
+        rows.append(record)
+    return rows
+
+
+def parse_rfc3339(value):
+    """
+    Parse an RFC3339 timestamp from Flux (e.g. 2024-05-01T10:00:00.123456789Z) into an aware datetime.
+    Fractional seconds beyond microseconds are truncated.
+    """
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    dot = value.find(".")
+    if dot != -1:
+        end = dot + 1
+        while end < len(value) and value[end].isdigit():
+            end += 1
+        fraction = value[dot + 1:end][:6].ljust(6, "0")
+        value = f"{value[:dot]}.{fraction}{value[end:]}"
+    return datetime.fromisoformat(value)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def release_conn(self):
+        pass
+
+
+class FakeQueryApi:
+    def __init__(self, influx):
+        self.influx = influx
+
+    def query_raw(self, query, org=None, dialect=None, params=None):
+        self.influx.check_up()
+        return FakeResponse(self.influx.render(query).encode("utf-8"))
+
+
+class FakeAsyncQueryApi:
+    def __init__(self, influx):
+        self.influx = influx
+
+    async def query_raw(self, query, org=None, dialect=None, params=None):
+        await asyncio.sleep(0)
+        self.influx.check_up()
+        return self.influx.render(query)
+
+
+class FakeAsyncWriteApi:
+    def __init__(self, influx):
+        self.influx = influx
+
+    async def write(self, bucket, org=None, record=None, **kwargs):
+        from services.push_ingest import parse_line_protocol
+        await asyncio.sleep(0)
+        self.influx.writes.append(record)
+        for machine_id, window in parse_line_protocol(record).items():
+            for point in window.to_points():
+                moment = datetime.fromisoformat(point["timestamp"])
+                self.influx.add_point(machine_id, moment, {field: point[field] for field in FIELDS})
+        return True
+
+
+class FakeInfluxClientAsync:
+    """Stand-in for InfluxDBClientAsync sharing the points of a FakeInfluxClient."""
+
+    def __init__(self, influx):
+        self.influx = influx
+        self.closed = False
+
+    def query_api(self):
+        return FakeAsyncQueryApi(self.influx)
+
+    def write_api(self):
+        return FakeAsyncWriteApi(self.influx)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeInfluxClient:
+    """
+    Holds time-ordered points per machine and a controllable clock.
+
+    Args:
+        interval_seconds (int): Spacing of the points added by advance()
+        start (datetime): Clock start (UTC)
+        seed (int): Seed for the generated sensor values
+    """
+
+    def __init__(self, interval_seconds=10, start=None, seed=0):
+        self.interval_seconds = interval_seconds
+        self.rng = random.Random(seed)
+        self.now = start or datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.points = {}  # machine_id -> list of (time, {field: value})
+        self.queries = []
+        self.writes = []
+        self.down = False  # queries raise ConnectionError while True
+        self.failed_queries = 0
+        self.query_api_calls = 0
+
+    def query_api(self):
+        self.query_api_calls += 1
+        return FakeQueryApi(self)
+
+    def check_up(self):
+        if self.down:
+            self.failed_queries += 1
+            raise ConnectionError("InfluxDB unavailable")
+
+    def as_async(self):
+        return FakeInfluxClientAsync(self)
+
+    def add_point(self, machine_id, moment, values):
+        self.points.setdefault(machine_id, []).append((moment, values))
+
+    def advance(self, machine_ids, n_points=1):
+        """Move the clock forward by n_points intervals, writing one point per machine each step."""
+        for _ in range(n_points):
+            self.now += timedelta(seconds=self.interval_seconds)
+            for machine_id in machine_ids:
+                point = generate_fake_sensor_point(self.now, machine_id, self.rng)
+                self.add_point(machine_id, self.now, {field: point[field] for field in FIELDS})
+
+    def render(self, query):
+        """Evaluate the subset of Flux the streamer uses and return annotated CSV."""
+        self.queries.append(query)
+        relative = _RELATIVE_START.search(query)
+        if relative:
+            start = self.now - timedelta(minutes=int(relative.group(1)))
+        else:
+            start = datetime.fromisoformat(_ABSOLUTE_START.search(query).group(1).replace("Z", "+00:00"))
+        tail = _TAIL.search(query)
+        machine_ids = _MACHINE.findall(query)
+        machine_regex = _MACHINE_REGEX.search(query)
+        if machine_regex:
+            pattern = re.compile(machine_regex.group(1).replace("\\/", "/"))
+            machine_ids = [machine_id for machine_id in self.points if pattern.fullmatch(machine_id)]
+
+        lines = [
+            "#group,false,false,true,true,false,true,true," + ",".join(["false"] * len(FIELDS)),
+            "#datatype,string,long,dateTime:RFC3339,dateTime:RFC3339,dateTime:RFC3339,string,string,"
+            + ",".join(["double"] * len(FIELDS)),
+            "#default,_result,,,,,,," + "," * (len(FIELDS) - 1),
+            ",result,table,_start,_stop,_time,_measurement,machine_id," + ",".join(FIELDS),
+        ]
+        for table, machine_id in enumerate(machine_ids):
+            rows = [(moment, values) for moment, values in self.points.get(machine_id, [])
+                    if start <= moment <= self.now]
+            if tail:
+                rows = rows[-int(tail.group(1)):]
+            for moment, values in rows:
+                lines.append(
+                    f",,{table},{_rfc3339(start)},{_rfc3339(self.now)},{_rfc3339(moment)},machine_metrics,{machine_id},"
+                    + ",".join("" if values[field] is None else repr(float(values[field])) for field in FIELDS)
+                )
+        return "\r\n".join(lines) + "\r\n\r\n"
@@ -0,0 +1,43 @@
+# test_files/model_fixtures.py
+
+# Builds a tiny, randomly initialised PatchTST + fitted StandardScaler in the same layout as
+# AI-Model-Artifacts/<variant>/ so the inference pipeline can be tested without the real artifacts.
+
+import os
+import pickle
+import numpy as np
+import torch
+from sklearn.preprocessing import StandardScaler
+from transformers import PatchTSTConfig, PatchTSTForPrediction
+from fake_data.sensor_windows import generate_fake_sensor_window
+
+
+def build_tiny_artifacts(base_dir, seed=0):
+    """
+    Save a small PatchTST (context=240, prediction=60, 6 channels) and scaler.pkl into base_dir.
+    
+    Returns:
+        str: base_dir, ready to be passed to InferenceService(base_dir=...)
+    """
+    torch.manual_seed(seed)
+    config = PatchTSTConfig(
+        num_input_channels=6,
+        context_length=240,
+        prediction_length=60,
+        patch_length=16,
+        patch_stride=16,
+        d_model=16,
+        num_attention_heads=2,
+        num_hidden_layers=1,
+        ffn_dim=32,
+    )
+    model = PatchTSTForPrediction(config)
+    model.save_pretrained(os.path.join(base_dir, "patchtst_sensor_multivar"))
+    
+    fit_points = generate_fake_sensor_window(2000, seed=seed)
+    fit_data = np.array([[p[f] for f in ['current', 'tempA', 'tempB', 'accX', 'accY', 'accZ']] for p in fit_points])
+    scaler = StandardScaler().fit(fit_data)
+    with open(os.path.join(base_dir, "scaler.pkl"), "wb") as f:
+        pickle.dump(scaler, f)
+    
+    return base_dir
@@ -0,0 +1,78 @@
+# test_files/test_async_streamer.py
+
+# Run with: python -m pytest test_files/test_async_streamer.py
+
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from test_files.fake_influx import FakeInfluxClient
+from test_files.model_fixtures import build_tiny_artifacts
+from test_files.test_startup import STARTUP_ENV
+
+
+@pytest.fixture
+def streamer_class(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    return ScheduledInfluxInference
+
+
+def test_async_collection_matches_threaded(streamer_class):
+    machine_ids = [f"machine_{i}" for i in range(4)]
+    influx = FakeInfluxClient()
+    influx.advance(machine_ids, 260)
+    threaded = streamer_class(ingestion_mode="delta", machine_ids=machine_ids)
+    threaded.influx_client = influx
+    asynchronous = streamer_class(ingestion_mode="delta", machine_ids=machine_ids)
+    asynchronous.async_influx_client = influx.as_async()
+    
+    async def collect():
+        for _ in range(5):
+            influx.advance(machine_ids, 2)
+            threaded._collect_once()
+            await asynchronous._collect_once_async()
+    asyncio.run(collect())
+    
+    for machine_id in machine_ids:
+        np.testing.assert_array_equal(asynchronous._snapshot_buffer(machine_id=machine_id).values,
+                                      threaded._snapshot_buffer(machine_id=machine_id).values)
+    assert asynchronous.get_ingestion_stats()["bytes_fetched"] == threaded.get_ingestion_stats()["bytes_fetched"]
+
+
+def test_lifecycle_runs_fleet_on_tasks_and_cancels_cleanly(streamer_class, tmp_path):
+    machine_ids = [f"machine_{i}" for i in range(100)]
+    influx = FakeInfluxClient()
+    influx.advance(machine_ids, 240)
+    streamer = streamer_class(
+        inference_interval_seconds=0.05, data_collection_interval_seconds=0.01,
+        base_dir=build_tiny_artifacts(str(tmp_path / "CustomLoss")), ingestion_mode="delta", machine_ids=machine_ids
+    )
+    async_client = influx.as_async()
+    streamer.async_influx_client = async_client
+    baseline_threads = threading.active_count()
+    cpu_threads = set()  # threads the per-machine resampling/smoothing ran on
+    for name in ("_after_collect", "_inference_windows"):
+        method = getattr(streamer, name)
+        setattr(streamer, name, lambda *args, method=method: cpu_threads.add(threading.get_ident()) or method(*args))
+    
+    async def lifecycle():
+        await streamer.start_async()
+        deadline = time.monotonic() + 120
+        while streamer.inference_count < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        peak_threads = threading.active_count()
+        tasks = list(streamer._tasks)
+        await streamer.stop_async()
+        return peak_threads, tasks
+    peak_threads, tasks = asyncio.run(lifecycle())
+    
+    assert streamer.inference_count >= 2
+    assert all(machine.inference_count >= 1 for machine in streamer.machines.values())
+    assert peak_threads - baseline_threads < 10  # executor + a few to_thread workers, not one per machine
+    assert len(tasks) == 2 and all(task.done() for task in tasks)
+    assert cpu_threads and threading.get_ident() not in cpu_threads  # never on the event loop
+    assert async_client.closed and not streamer._tasks
+    streamer.inference_executor.shutdown()
@@ -0,0 +1,71 @@
+# test_files/test_batch_inference.py
+
+# Run with: python -m pytest test_files/test_batch_inference.py
+
+import numpy as np
+import pytest
+from services.inference_service_3 import InferenceService
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+@pytest.fixture(scope="module")
+def inference_service(tmp_path_factory):
+    base_dir = build_tiny_artifacts(str(tmp_path_factory.mktemp("artifacts")))
+    return InferenceService(base_dir=base_dir, cache_size=0)  # every call runs the model
+
+
+def test_batch_matches_single_window(inference_service):
+    windows = [generate_fake_sensor_window(240, machine_id=f"machine_{i}", seed=i) for i in range(4)]
+    
+    batch_outputs = inference_service.run_inference_batch(windows)
+    
+    assert len(batch_outputs) == len(windows)
+    for window, (batch_results, batch_alerts) in zip(windows, batch_outputs):
+        results, alerts = inference_service.run_inference(window)
+        for key in results:
+            np.testing.assert_allclose(batch_results[key], results[key], rtol=1e-5, atol=1e-5)
+        assert batch_alerts["status"] == alerts["status"]
+        assert batch_alerts["critical_features"] == alerts["critical_features"]
+        assert batch_alerts["anomaly_scores"] == alerts["anomaly_scores"]
+        assert batch_alerts["machine_id"] == window[0]["machine_id"]
+
+
+def test_batch_isolates_invalid_windows(inference_service):
+    windows = [
+        generate_fake_sensor_window(240, seed=1),
+        generate_fake_sensor_window(100, seed=2),
+        generate_fake_sensor_window(240, seed=3),
+    ]
+    
+    outputs = inference_service.run_inference_batch(windows)
+    
+    assert outputs[0][0] is not None
+    assert outputs[1][0] is None and outputs[1][1]["status"] == "error"
+    assert outputs[2][0] is not None
+
+
+def test_causal_smoothing_mode(tmp_path):
+    service = InferenceService(base_dir=build_tiny_artifacts(str(tmp_path)), smoothing_mode="causal")
+    stream = generate_fake_sensor_window(250, machine_id="machine_causal", seed=7)
+    
+    assert service.update_smoothing(stream[:240]) == 240
+    assert service.update_smoothing(stream[1:241]) == 1
+    results, alerts = service.run_inference(stream[10:250])
+    
+    assert results is not None and alerts["status"] in ("normal", "critical")
+    assert results["final_predictions"].shape == (60, 6)
+
+
+def test_trace_captures_intermediate_arrays(tmp_path):
+    service = InferenceService(base_dir=build_tiny_artifacts(str(tmp_path)), trace=True)
+    windows = [generate_fake_sensor_window(240, seed=i) for i in range(3)]
+    
+    service.run_inference(windows[0])
+    assert service.last_trace["raw"].shape == (1, 240, 6)
+    assert service.last_trace["final_predictions"].shape == (1, 60, 6)
+    
+    service.run_inference_batch(windows)
+    assert service.last_trace["scaled_input"].shape == (3, 240, 6)
+    assert service.last_trace["raw_predictions"].shape == (3, 60, 6)
+    assert service.last_trace["exceedance_percentages"].shape == (3, 6)
@@ -0,0 +1,127 @@
+# test_files/test_delta_ingestion.py
+
+# Run with: python -m pytest test_files/test_delta_ingestion.py
+
+import numpy as np
+import pytest
+from services.flux_csv import read_columns
+from test_files.fake_influx import FakeInfluxClient, parse_annotated_csv, parse_rfc3339
+from test_files.test_startup import STARTUP_ENV
+
+MACHINE_ID = "machine_1"
+
+
+@pytest.fixture
+def make_streamer(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    
+    def _make(influx, ingestion_mode, machine_ids=None):
+        streamer = ScheduledInfluxInference(data_collection_interval_seconds=10, ingestion_mode=ingestion_mode,
+                                             machine_ids=machine_ids or [MACHINE_ID])
+        streamer.influx_client = influx
+        return streamer
+    return _make
+
+
+def test_delta_buffer_matches_full_requery(make_streamer):
+    influx = FakeInfluxClient()
+    influx.advance([MACHINE_ID], 300)
+    full, delta = make_streamer(influx, "full"), make_streamer(influx, "delta")
+    
+    for step in range(30):
+        influx.advance([MACHINE_ID], 1 + step % 3)
+        full._collect_once()
+        delta._collect_once()
+        assert delta.get_buffer()[-240:] == full.get_buffer()[-240:]
+    
+    full_stats, delta_stats = full.get_ingestion_stats(), delta.get_ingestion_stats()
+    assert delta_stats["full_backfills"] == 1 and delta_stats["delta_queries"] == 29
+    assert delta_stats["rows_fetched"] < full_stats["rows_fetched"] / 20
+    assert delta_stats["bytes_fetched"] < full_stats["bytes_fetched"] / 10
+
+
+def test_cursor_row_is_not_duplicated(make_streamer):
+    influx = FakeInfluxClient()
+    influx.advance([MACHINE_ID], 240)
+    streamer = make_streamer(influx, "delta")
+    streamer._collect_once()
+    
+    streamer._collect_once()  # no new points: only the (inclusive) cursor row comes back
+    
+    timestamps = [point["timestamp"] for point in streamer.get_buffer()]
+    assert len(timestamps) == len(set(timestamps)) == 240
+    assert streamer.get_ingestion_stats()["points_appended"] == 0
+
+
+def test_restart_and_long_gap_trigger_full_backfill(make_streamer):
+    influx = FakeInfluxClient()
+    influx.advance([MACHINE_ID], 240)
+    streamer = make_streamer(influx, "delta")
+    assert streamer._needs_full_backfill()  # no cursor yet (startup/restart)
+    streamer._collect_once()
+    assert not streamer._needs_full_backfill()
+    
+    # No successful query for longer than the backfill range: re-query the last window
+    streamer._last_query_ok -= 3 * 3600
+    assert streamer._needs_full_backfill()
+
+
+def test_read_columns_multiple_tables():
+    text = (
+        "#datatype,string,long,dateTime:RFC3339,double\r\n"
+        ",result,table,_time,current\r\n"
+        ",,0,2025-01-01T00:00:00.123456789Z,2.5\r\n"
+        "\r\n"
+        "#datatype,string,long,dateTime:RFC3339,double\r\n"
+        ",result,table,_time,tempA\r\n"
+        ",,1,2025-01-01T00:00:10Z,\r\n"
+    )
+    rows = parse_annotated_csv(text)
+    timestamps, values = read_columns(text, ("current", "tempA"))
+    
+    assert [row["table"] for row in rows] == ["0", "1"]
+    assert rows[0]["current"] == "2.5" and rows[1]["tempA"] == ""
+    assert parse_rfc3339(rows[0]["_time"]).isoformat() == "2025-01-01T00:00:00.123456+00:00"
+    assert timestamps.tolist() == [1735689600123456789, 1735689610000000000]
+    np.testing.assert_array_equal(values, [[2.5, np.nan], [np.nan, np.nan]])  # missing cells/fields are NaN
+
+
+def test_fleet_uses_one_query_per_cycle(make_streamer):
+    machine_ids = [f"machine_{i}" for i in range(6)]
+    influx = FakeInfluxClient()
+    influx.advance(machine_ids, 260)
+    influx.advance(["machine_other"], 260)  # same bucket, not ingested
+    fleet = make_streamer(influx, "delta", machine_ids)
+    
+    for step in range(12):
+        influx.advance(machine_ids, 1 + step % 2)
+        fleet._collect_once()
+    
+    stats = fleet.get_ingestion_stats()
+    assert stats["queries"] == stats["cycles"] == 12
+    for machine_id in machine_ids:
+        window = fleet._snapshot_buffer(240, machine_id)
+        stored = influx.points[machine_id][-240:]
+        assert window.machine_id == machine_id
+        assert [point["timestamp"] for point in window.to_points()] == [moment.isoformat() for moment, _ in stored]
+        assert window.values[-1, 0] == pytest.approx(stored[-1][1]["current"], rel=1e-6)
+    assert "machine_other" not in fleet.machines
+    assert [entry["machine_id"] for entry in fleet.get_machines_status()] == machine_ids
+
+
+def test_stalled_machine_does_not_widen_delta_range(make_streamer):
+    influx = FakeInfluxClient()
+    influx.advance(["machine_live", "machine_stalled"], 240)
+    streamer = make_streamer(influx, "delta", ["machine_live", "machine_stalled"])
+    streamer._collect_once()
+    
+    influx.advance(["machine_live"], 1000)  # ~2.8 h without points from machine_stalled
+    for _ in range(5):
+        streamer._collect_once()
+    
+    live, stalled = streamer.machines["machine_live"], streamer.machines["machine_stalled"]
+    range_ns = streamer._backfill_range_minutes(240) * 60 * 10**9
+    assert streamer._delta_start() == live.cursor - range_ns > stalled.cursor
+    assert len(live.buffer) == 340 and len(stalled.buffer) == 240
@@ -0,0 +1,111 @@
+# test_files/test_event_broadcaster.py
+
+# Run with: python -m pytest test_files/test_event_broadcaster.py
+
+import asyncio
+import json
+import threading
+import numpy as np
+from services.event_broadcaster import EventBroadcaster
+from services.sensor_window import SensorWindow
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.test_startup import STARTUP_ENV
+
+
+def parse(frame):
+    """SSE frame -> (id, event, data)."""
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return int(fields["id"]), fields["event"], json.loads(fields["data"])
+
+
+async def subscribe(broadcaster, last_event_id=None):
+    stream = broadcaster.stream(last_event_id)
+    assert (await stream.__anext__()).startswith(b"retry: ")
+    return stream
+
+
+def test_each_event_is_serialized_once_for_all_subscribers():
+    broadcaster, serialized = EventBroadcaster(), []
+    
+    def payload():
+        serialized.append(1)
+        return {"forecast": np.arange(3, dtype=np.float32)}
+    
+    async def scenario():
+        assert broadcaster.publish("points", payload) is None and not serialized  # nobody listening
+        streams = [await subscribe(broadcaster) for _ in range(3)]
+        publisher = threading.Thread(target=broadcaster.publish, args=("prediction", payload), kwargs={"retain_key": "p"})
+        publisher.start()
+        publisher.join()
+        frames = [await stream.__anext__() for stream in streams]
+        late = await subscribe(broadcaster)
+        retained = await late.__anext__()
+        return frames, retained
+    frames, retained = asyncio.run(scenario())
+    
+    assert len(serialized) == 1 and frames[0] is frames[1] is frames[2] is retained
+    assert parse(frames[0]) == (2, "prediction", {"forecast": [0.0, 1.0, 2.0]})
+    assert broadcaster.stats()["published"] == {"prediction": 1}
+
+
+def test_reconnect_replays_missed_events_or_asks_for_resync():
+    broadcaster = EventBroadcaster(history_size=3)
+    
+    async def scenario():
+        stream = await subscribe(broadcaster)
+        for i in range(5):
+            broadcaster.publish("points", {"i": i})
+        await stream.aclose()
+        replayed = await subscribe(broadcaster, last_event_id="3")
+        gone = await subscribe(broadcaster, last_event_id="1")
+        return [await replayed.__anext__() for _ in range(2)], await gone.__anext__()
+    replayed, gone = asyncio.run(scenario())
+    
+    assert [parse(frame)[2] for frame in replayed] == [{"i": 3}, {"i": 4}]
+    assert parse(gone)[1] == "resync"
+
+
+def test_lagging_subscriber_is_disconnected():
+    broadcaster = EventBroadcaster(queue_size=2)
+    
+    async def scenario():
+        slow, fast = await subscribe(broadcaster), await subscribe(broadcaster)
+        received = []
+        for i in range(4):
+            broadcaster.publish("points", {"i": i})
+            await asyncio.sleep(0)  # deliveries run on the loop
+            received.append(parse(await fast.__anext__())[2]["i"])
+        return [frame async for frame in slow], received, broadcaster.stats()
+    slow_frames, fast_received, stats = asyncio.run(scenario())
+    
+    assert len(slow_frames) == 1 and fast_received == [0, 1, 2, 3]
+    assert stats["dropped_subscribers"] == 1 and stats["subscribers"] == 1
+
+
+def test_streamer_publishes_points_predictions_and_alert_transitions(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    streamer = ScheduledInfluxInference(ingestion_mode="push", machine_ids=["machine_1"])
+    window = SensorWindow.from_points(generate_fake_sensor_window(240, machine_id="machine_1", seed=4))
+    results = {"raw_predictions_scaled": np.zeros((60, 6), np.float32), "final_predictions": np.ones((60, 6), np.float32)}
+    
+    async def scenario():
+        stream = await subscribe(streamer.events)
+        streamer.ingest_windows({"machine_1": window[:230]})
+        streamer.ingest_windows({"machine_1": window})  # 10 new points (the rest are duplicates)
+        for status in ("normal", "normal", "warning"):
+            streamer._store_inference_result(window, results, {"status": status, "message": status, "timestamp": "t"})
+        await asyncio.sleep(0)
+        frames = [parse(await stream.__anext__()) for _ in range(7)]
+        streamer.events.close()
+        assert [frame async for frame in stream] == []
+        return frames
+    frames = asyncio.run(scenario())
+    
+    assert [event for _, event, _ in frames] == ["points", "points", "prediction", "alert", "prediction", "prediction", "alert"]
+    assert len(frames[0][2]["points"]) == 230 and len(frames[1][2]["points"]) == 10
+    assert frames[1][2]["points"][-1] == window.point(-1)
+    assert frames[6][2] == {"machine_id": "machine_1", "previous_status": "normal", "status": "warning",
+                            "message": "warning", "timestamp": "t"}
+    assert frames[5][2]["inference_count"] == 3 and np.array(frames[5][2]["scaled_forecast_array"]).shape == (60, 6)
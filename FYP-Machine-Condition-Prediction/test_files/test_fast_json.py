@@ -0,0 +1,58 @@
+# test_files/test_fast_json.py
+
+# Run with: python -m pytest test_files/test_fast_json.py
+
+import dataclasses
+import json
+import numpy as np
+from services import fast_json
+from services.sensor_window import epoch_ns_to_datetime, epoch_ns_to_iso
+
+
+@dataclasses.dataclass
+class Alert:
+    status: str
+    score: float
+
+
+def test_numpy_and_dataclasses_encode_without_tolist():
+    forecast = np.linspace(-1, 1, 360, dtype=np.float32).reshape(60, 6)
+    content = {
+        "array": forecast,
+        "column": forecast[:, 2],  # non-contiguous view
+        "half": np.ones(3, dtype=np.float16),
+        "missing": np.array([1.5, np.nan], dtype=np.float32),
+        "scalars": [np.float32(0.25), np.int64(7), np.bool_(True)],
+        "alert": Alert("critical", 0.75),
+    }
+    
+    decoded = json.loads(fast_json.dumps(content))
+    
+    np.testing.assert_array_equal(np.array(decoded["array"], dtype=np.float32), forecast)  # float32 round-trips exactly
+    np.testing.assert_array_equal(np.array(decoded["column"], dtype=np.float32), forecast[:, 2])
+    assert decoded["half"] == [1.0, 1.0, 1.0] and decoded["missing"] == [1.5, None]
+    assert decoded["scalars"] == [0.25, 7, True] and decoded["alert"] == {"status": "critical", "score": 0.75}
+
+
+def test_stdlib_fallback_writes_null_for_nan(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    content = {
+        "missing": np.array([[1.5, np.nan]], dtype=np.float32),
+        "scalar": np.float64(np.inf),
+        "values": [float("nan"), 2.0, (float("-inf"),)],
+        "alert": Alert("warning", float("nan")),
+    }
+    
+    decoded = json.loads(fast_json.dumps(content))
+    
+    assert decoded == {"missing": [[1.5, None]], "scalar": None, "values": [None, 2.0, [None]],
+                       "alert": {"status": "warning", "score": None}}
+
+
+def test_vectorized_iso_timestamps_match_datetime_isoformat():
+    timestamps = np.array([1735689600, 1735689610, 1735689620], dtype=np.int64) * 1_000_000_000
+    timestamps[1] += 123_456_789
+    timestamps[2] += 5_999
+    
+    assert epoch_ns_to_iso(timestamps) == [epoch_ns_to_datetime(ns).isoformat() for ns in timestamps.tolist()]
+    assert epoch_ns_to_iso(timestamps)[0] == "2025-01-01T00:00:00+00:00"
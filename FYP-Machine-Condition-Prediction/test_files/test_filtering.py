@@ -0,0 +1,45 @@
+# test_files/test_filtering.py
+
+# Run with: python -m pytest test_files/test_filtering.py
+
+import numpy as np
+from scipy.signal import butter, filtfilt, sosfilt
+from services.filtering import design_lowpass, design_lowpass_sos, zero_phase_lowpass, CausalLowpassSmoother
+
+
+def test_zero_phase_matches_per_column_filtfilt():
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal((240, 6)) * 3 + 30).astype(np.float32)
+    
+    b, a = butter(2, 0.3, btype='low', analog=False)
+    expected = np.zeros_like(data)
+    for i in range(data.shape[1]):
+        expected[:, i] = filtfilt(b, a, data[:, i])
+    
+    assert np.array_equal(zero_phase_lowpass(data, 0.3, 2), expected)
+
+
+def test_filter_design_is_cached():
+    design_lowpass.cache_clear()
+    for _ in range(5):
+        design_lowpass(0.3, 2)
+    
+    assert design_lowpass.cache_info().hits == 4
+    assert design_lowpass(0.3, 2) is design_lowpass(0.3, 2)
+
+
+def test_causal_smoother_filters_each_point_once():
+    rng = np.random.default_rng(1)
+    stream = rng.standard_normal((400, 6)) + 10
+    timestamps = list(range(400))
+    smoother = CausalLowpassSmoother(0.3, 2, history_length=340, num_features=6)
+    
+    # Initial window of 240, then sliding windows advancing one point per cycle
+    assert smoother.update(timestamps[:240], stream[:240]) == 240
+    for end in range(241, 401):
+        assert smoother.update(timestamps[end - 240:end], stream[end - 240:end]) == 1
+    
+    sos, unit_zi = design_lowpass_sos(0.3, 2)
+    expected, _ = sosfilt(sos, stream, axis=0, zi=unit_zi[:, :, np.newaxis] * stream[0])
+    np.testing.assert_allclose(smoother.window(240), expected[-240:], rtol=1e-5, atol=1e-4)
+    assert smoother.window(341) is None
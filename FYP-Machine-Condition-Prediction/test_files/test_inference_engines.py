@@ -0,0 +1,65 @@
+# test_files/test_inference_engines.py
+
+# Run with: python -m pytest test_files/test_inference_engines.py
+
+import os
+import numpy as np
+import pytest
+from services.inference_service_3 import InferenceService
+from services.inference_engines import build_engine
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+@pytest.fixture(scope="module")
+def base_dir(tmp_path_factory):
+    return build_tiny_artifacts(str(tmp_path_factory.mktemp("artifacts")))
+
+
+@pytest.fixture(scope="module")
+def eager_service(base_dir):
+    return InferenceService(base_dir=base_dir)
+
+
+@pytest.mark.parametrize("engine", ["torchscript", "compile", "onnx"])
+def test_engine_matches_eager(base_dir, eager_service, engine):
+    if engine == "onnx":
+        pytest.importorskip("onnxruntime")
+    service = InferenceService(base_dir=base_dir, engine=engine)
+    assert service.engine.name == engine
+    
+    windows = [generate_fake_sensor_window(240, machine_id=f"machine_{i}", seed=i) for i in range(3)]
+    for (results, alerts), (expected, expected_alerts) in zip(
+        service.run_inference_batch(windows), eager_service.run_inference_batch(windows)
+    ):
+        np.testing.assert_allclose(results["raw_predictions_scaled"], expected["raw_predictions_scaled"], rtol=1e-4, atol=1e-4)
+        assert alerts["critical_features"] == expected_alerts["critical_features"]
+
+
+def test_exported_artifact_is_reused(base_dir):
+    InferenceService(base_dir=base_dir, engine="torchscript")
+    engines_dir = os.path.join(base_dir, "engines")
+    artifacts = sorted(os.listdir(engines_dir))
+    mtimes = [os.stat(os.path.join(engines_dir, name)).st_mtime_ns for name in artifacts]
+    
+    service = InferenceService(base_dir=base_dir, engine="torchscript")
+    
+    assert service.engine.name == "torchscript"
+    assert sorted(os.listdir(engines_dir)) == artifacts
+    assert [os.stat(os.path.join(engines_dir, name)).st_mtime_ns for name in artifacts] == mtimes
+
+
+def test_failed_engine_falls_back_to_eager(eager_service, tmp_path):
+    # A model path whose parent is a file makes the export cache unwritable
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    engine = build_engine(
+        "torchscript", eager_service.model, eager_service.device, str(blocker / "model"),
+        eager_service.context_length, eager_service.num_features
+    )
+    assert engine.name == "eager"
+
+
+def test_unknown_engine_rejected(base_dir):
+    with pytest.raises(ValueError):
+        InferenceService(base_dir=base_dir, engine="tensorrt")
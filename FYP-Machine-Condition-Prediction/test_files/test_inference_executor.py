@@ -0,0 +1,53 @@
+# test_files/test_inference_executor.py
+
+# Run with: python -m pytest test_files/test_inference_executor.py
+
+import queue
+import threading
+import pytest
+import torch
+from services.inference_executor import InferenceExecutor, parse_cpu_list
+
+
+def test_jobs_run_on_worker_thread_in_order():
+    executor = InferenceExecutor(num_threads=torch.get_num_threads())
+    futures = [executor.submit(lambda i=i: (i, threading.current_thread().name)) for i in range(5)]
+    
+    results = [future.result(timeout=10) for future in futures]
+    
+    assert [i for i, _ in results] == list(range(5))
+    assert {name for _, name in results} == {"inference-executor"}
+    assert executor.stats()["jobs_completed"] == 5
+    executor.shutdown()
+
+
+def test_exceptions_are_propagated():
+    executor = InferenceExecutor()
+    
+    with pytest.raises(ZeroDivisionError):
+        executor.run(lambda: 1 / 0)
+    assert executor.run(lambda: "still running") == "still running"
+    executor.shutdown()
+
+
+def test_submit_nowait_rejects_when_queue_is_full():
+    executor = InferenceExecutor(max_queue=1)
+    release = threading.Event()
+    running = executor.submit(release.wait)
+    while executor.stats()["queue_depth"]:  # wait until the worker has taken the job
+        release.wait(0.01)
+    
+    queued = executor.submit_nowait(lambda: "queued")
+    with pytest.raises(queue.Full):
+        executor.submit_nowait(lambda: "rejected")
+    release.set()
+    
+    assert running.result(timeout=10) and queued.result(timeout=10) == "queued"
+    executor.shutdown()
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-2,5") == [0, 1, 2, 5]
+    assert parse_cpu_list(" 3, 1 ") == [1, 3]
+    assert parse_cpu_list("") is None
+    assert parse_cpu_list(None) is None
@@ -0,0 +1,87 @@
+# test_files/test_inference_scheduler.py
+
+# Run with: python -m pytest test_files/test_inference_scheduler.py
+
+import asyncio
+import threading
+import time
+import pytest
+from services.inference_scheduler import InferenceScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fixed_rate_ticks_and_coalescing():
+    clock = FakeClock()
+    scheduler = InferenceScheduler(1.0, clock=clock)
+    
+    assert scheduler._poll() == ("timer", 0.0)  # first run immediately
+    clock.now = 0.5
+    assert scheduler._poll() == (None, 0.5)
+    clock.now = 1.3  # cycle ran long: the next tick stays on the grid (2.0), not at 2.3
+    assert scheduler._poll()[0] == "timer" and scheduler.last_lag == pytest.approx(0.3)
+    clock.now = 5.4  # ticks 2, 3, 4 and 5 missed: one run, three coalesced
+    assert scheduler._poll()[0] == "timer"
+    assert scheduler.coalesced_ticks == 3 and scheduler.next_run_in() == pytest.approx(0.6)
+    
+    stats = scheduler.stats()
+    assert stats["timer_runs"] == 3 and stats["max_lag_ms"] == pytest.approx(3400)
+
+
+def test_data_trigger_runs_early_and_skips_idle_ticks():
+    clock = FakeClock()
+    scheduler = InferenceScheduler(60.0, trigger_points=5, clock=clock)
+    scheduler._poll()
+    
+    scheduler.notify_points("machine_1", 3)
+    scheduler.notify_points("machine_2", 4)
+    clock.now = 10
+    assert scheduler._poll() == (None, 50.0)
+    scheduler.notify_points("machine_2", 1)  # machine_2 reaches 5 new points
+    clock.now = 10.2
+    assert scheduler._poll() == ("data", 0.0) and scheduler.last_lag == pytest.approx(0.2)
+    
+    clock.now = 60  # timer tick with no new point since the data run
+    assert scheduler._poll() == (None, 60.0)
+    scheduler.notify_points("machine_1", 1)
+    clock.now = 120
+    assert scheduler._poll()[0] == "timer"
+    
+    stats = scheduler.stats()
+    assert (stats["timer_runs"], stats["data_runs"], stats["idle_ticks"]) == (2, 1, 1)
+
+
+def test_trigger_wakes_blocked_waiters_promptly():
+    scheduler = InferenceScheduler(60.0, trigger_points=3)
+    assert scheduler.wait() == "timer"
+    
+    threading.Timer(0.05, scheduler.notify_points, args=("machine_1", 3)).start()
+    start = time.monotonic()
+    assert scheduler.wait() == "data"
+    assert time.monotonic() - start < 1.0
+    
+    async def wait_async():
+        asyncio.get_running_loop().call_later(0.05, threading.Thread(target=scheduler.notify_points,
+                                                                   args=("machine_1", 3)).start)
+        return await scheduler.wait_async()
+    start = time.monotonic()
+    assert asyncio.run(wait_async()) == "data"
+    assert time.monotonic() - start < 1.0
+
+
+def test_period_does_not_drift_with_cycle_time():
+    scheduler = InferenceScheduler(0.1)
+    start = time.monotonic()
+    for _ in range(6):
+        scheduler.wait()
+        time.sleep(0.06)  # inference + email time
+    
+    # sleep-after-work would take 6 * 0.16 s; fixed rate finishes the 6th cycle at ~0.5 + 0.06 s
+    assert time.monotonic() - start < 0.8
+    assert scheduler.coalesced_ticks == 0
@@ -0,0 +1,85 @@
+# test_files/test_influx_gateway.py
+
+# Run with: python -m pytest test_files/test_influx_gateway.py
+
+import pytest
+from services.influx_gateway import CircuitBreaker
+from test_files.fake_influx import FakeInfluxClient
+from test_files.test_startup import STARTUP_ENV
+
+MACHINE_ID = "machine_1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_backs_off_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, base_delay=10, max_delay=25, jitter=0.5, clock=clock)
+    
+    assert [breaker.record_failure(ConnectionError("down")) for _ in range(2)] == [0.0, 0.0]
+    assert breaker.allow() and breaker.state == "closed"
+    first_delay = breaker.record_failure(ConnectionError("down"))
+    assert breaker.state == "open" and 5 <= first_delay <= 10
+    assert not breaker.allow()
+    
+    clock.now += first_delay
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # only one trial query
+    second_delay = breaker.record_failure(TimeoutError("timed out"))
+    assert breaker.state == "open" and 10 <= second_delay <= 20
+    for _ in range(5):
+        breaker.record_failure(TimeoutError("timed out"))
+    assert breaker.retry_in() <= 25  # capped
+    
+    clock.now += 25
+    assert breaker.allow()
+    breaker.record_success()
+    status = breaker.status()
+    assert status["state"] == "closed" and status["consecutive_failures"] == 0
+    assert status["total_failures"] == 9 and status["times_opened"] == 1 and status["refused_queries"] == 2
+    assert status["last_error"] == "TimeoutError: timed out"
+
+
+@pytest.fixture
+def streamer(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    streamer = ScheduledInfluxInference(data_collection_interval_seconds=10, ingestion_mode="delta",
+                                        machine_ids=[MACHINE_ID], breaker_failure_threshold=2)
+    streamer.influx.breaker._clock = FakeClock()
+    return streamer
+
+
+def test_outage_serves_last_buffer_without_hammering_influx(streamer):
+    influx = FakeInfluxClient()
+    influx.advance([MACHINE_ID], 240)
+    streamer.influx_client = influx
+    clock = streamer.influx.breaker._clock
+    streamer._collect_once()
+    buffer_before = streamer.get_buffer()
+    
+    influx.down = True
+    for _ in range(12):
+        influx.advance([MACHINE_ID], 1)
+        streamer._collect_once()
+        clock.now += 1
+    
+    assert influx.failed_queries == 3  # two to open the circuit, one half-open trial; 9 cycles refused
+    assert streamer.get_buffer() == buffer_before
+    status = streamer.get_inference_status()
+    assert status["influx"]["state"] == "open" and status["serving_stale_buffer"]
+    
+    influx.down = False
+    clock.now += streamer.influx.breaker.retry_in()
+    streamer._collect_once()
+    
+    assert streamer.get_inference_status()["influx"]["state"] == "closed"
+    assert streamer.get_buffer()[-1]["timestamp"] == influx.now.isoformat()
+    assert influx.query_api_calls == 1  # one shared query API for every query
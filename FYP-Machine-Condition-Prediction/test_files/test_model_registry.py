@@ -0,0 +1,88 @@
+# test_files/test_model_registry.py
+
+# Run with: python -m pytest test_files/test_model_registry.py
+
+import os
+import threading
+import pytest
+import torch
+from transformers import PatchTSTForPrediction
+from services.model_registry import ModelRegistry
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+@pytest.fixture(scope="module")
+def artifacts_root(tmp_path_factory):
+    root = tmp_path_factory.mktemp("AI-Model-Artifacts")
+    build_tiny_artifacts(str(root / "CustomLoss"), seed=0)
+    build_tiny_artifacts(str(root / "X-std"), seed=1)
+    (root / "not-a-model").mkdir()
+    return str(root)
+
+
+def test_discovers_variants(artifacts_root):
+    registry = ModelRegistry(root_dir=artifacts_root)
+    
+    variants = registry.discover()
+    
+    assert [variant["name"] for variant in variants] == ["CustomLoss", "X-std"]
+    assert all(variant["weights"] == "safetensors" and variant["has_scaler"] for variant in variants)
+
+
+def test_weights_are_memory_mapped_and_match_from_pretrained(artifacts_root):
+    service = ModelRegistry(root_dir=artifacts_root).load("CustomLoss")
+    reference = PatchTSTForPrediction.from_pretrained(
+        os.path.join(artifacts_root, "CustomLoss", "patchtst_sensor_multivar")
+    )
+    
+    reference_state = reference.state_dict()
+    for name, tensor in service.model.state_dict().items():
+        assert torch.equal(tensor, reference_state[name]), name
+
+
+def test_hot_swap_records_version_and_keeps_in_flight_cycle(artifacts_root):
+    registry = ModelRegistry(root_dir=artifacts_root)
+    old_service = registry.activate("CustomLoss")
+    window = generate_fake_sensor_window(240, seed=3)
+    
+    _, alerts = registry.active.run_inference(window)
+    assert alerts["model_version"].startswith("CustomLoss@")
+    
+    # A cycle that already took the old reference finishes on it while the swap happens
+    results = {}
+    in_flight = threading.Thread(target=lambda: results.update(old=old_service.run_inference(window)))
+    in_flight.start()
+    registry.activate("X-std")
+    in_flight.join()
+    
+    assert results["old"][1]["model_version"] == alerts["model_version"]
+    _, new_alerts = registry.active.run_inference(window)
+    assert new_alerts["model_version"].startswith("X-std@")
+    assert registry.status()["swap_count"] == 2
+
+
+def test_failed_load_keeps_active_model(artifacts_root):
+    registry = ModelRegistry(root_dir=artifacts_root)
+    registry.activate("CustomLoss")
+    
+    with pytest.raises(ValueError):
+        registry.activate("not-a-model")
+    
+    assert registry.active.model_variant == "CustomLoss"
+    assert "not-a-model" in registry.status()["last_error"]
+
+
+def test_async_swap_runs_on_the_executor(artifacts_root):
+    from services.inference_executor import InferenceExecutor
+    executor = InferenceExecutor()
+    registry = ModelRegistry(root_dir=artifacts_root, executor=executor)
+    registry.activate("CustomLoss")
+    
+    assert registry.activate_async("X-std")
+    assert not registry.activate_async("CustomLoss")  # the first load still holds the claim
+    executor.run(lambda: None)  # queued behind the load
+    
+    assert registry.active.model_variant == "X-std" and registry.loading_variant is None
+    assert executor.stats()["jobs_completed"] == 2
+    executor.shutdown()
@@ -0,0 +1,148 @@
+# test_files/test_postprocessing.py
+
+# Run with: python -m pytest test_files/test_postprocessing.py
+
+# Checks that the vectorized post-processing kernels reproduce the original per-column loops exactly.
+
+import numpy as np
+import pytest
+from services.postprocessing import (
+    remove_prediction_outliers,
+    scale_predictions_to_context,
+    calculate_exceedance,
+    THRESHOLD_MIN,
+    THRESHOLD_MAX,
+)
+
+
+# ------------------------------------------------------------------
+# Reference per-column implementations (original InferenceService loops)
+# ------------------------------------------------------------------
+def reference_remove_outliers(predictions, threshold=3.0):
+    cleaned = predictions.copy()
+    for i in range(predictions.shape[1]):
+        col = predictions[:, i]
+        mean = np.mean(col)
+        std = np.std(col)
+        if std > 1e-8:
+            outlier_mask = np.abs((col - mean) / std) > threshold
+            if np.sum(outlier_mask) > 0:
+                col_cleaned = col.copy()
+                col_cleaned[outlier_mask] = np.nan
+                nans = np.isnan(col_cleaned)
+                x = np.arange(len(col_cleaned))
+                if np.sum(~nans) >= 2:
+                    col_cleaned[nans] = np.interp(x[nans], x[~nans], col_cleaned[~nans])
+                else:
+                    col_cleaned[nans] = mean
+                cleaned[:, i] = col_cleaned
+    return cleaned
+
+
+def reference_scale_to_context(predictions, context, method):
+    scaled = np.zeros_like(predictions)
+    recent_context = context[-int(context.shape[0] * 0.15):, :]
+    for i in range(predictions.shape[1]):
+        pred_col = predictions[:, i]
+        ctx_col = recent_context[:, i]
+        if method == 'minmax':
+            pred_min = np.percentile(pred_col, 5)
+            pred_max = np.percentile(pred_col, 95)
+            if (pred_max - pred_min) < 1e-8:
+                pred_min = pred_col.min()
+                pred_max = pred_col.max()
+            ctx_min = ctx_col.min()
+            ctx_max = ctx_col.max()
+            if (pred_max - pred_min) > 1e-8:
+                scaled[:, i] = (pred_col - pred_min) / (pred_max - pred_min) * (ctx_max - ctx_min) + ctx_min
+            else:
+                scaled[:, i] = np.full_like(pred_col, (ctx_max + ctx_min) / 2)
+        elif method == 'robust':
+            pred_median = np.median(pred_col)
+            pred_iqr = np.percentile(pred_col, 75) - np.percentile(pred_col, 25)
+            ctx_median = np.median(ctx_col)
+            ctx_iqr = np.percentile(ctx_col, 75) - np.percentile(ctx_col, 25)
+            if pred_iqr > 1e-8:
+                scaled[:, i] = (pred_col - pred_median) / pred_iqr * ctx_iqr + ctx_median
+            else:
+                scaled[:, i] = np.full_like(pred_col, ctx_median)
+        elif method == 'zscore':
+            pred_mean, pred_std = pred_col.mean(), pred_col.std()
+            ctx_mean, ctx_std = ctx_col.mean(), ctx_col.std()
+            if pred_std > 1e-8:
+                scaled[:, i] = (pred_col - pred_mean) / pred_std * ctx_std + ctx_mean
+            else:
+                scaled[:, i] = np.full_like(pred_col, ctx_mean)
+    return scaled
+
+
+def reference_exceedance(predictions_raw):
+    counts = []
+    for i in range(predictions_raw.shape[1]):
+        values = predictions_raw[:, i]
+        if np.isfinite(THRESHOLD_MIN[i]):
+            counts.append(np.sum((values < THRESHOLD_MIN[i]) | (values > THRESHOLD_MAX[i])))
+        else:
+            counts.append(np.sum(values > THRESHOLD_MAX[i]))
+    counts = np.array(counts)
+    return counts, (counts / predictions_raw.shape[0]) * 100
+
+
+def make_block(rng, batch=8, steps=60):
+    block = (rng.standard_normal((batch, steps, 6)) * rng.uniform(0.1, 5.0, size=(batch, 1, 6))).astype(np.float32)
+    block[0, 10, 2] = 40.0   # single spike -> outlier
+    block[1, :, 4] = 0.25    # flat series -> std too small
+    block[2, 5:8, 0] = -30.0  # cluster of outliers
+    return block
+
+
+# ------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------
+def test_outlier_removal_matches_reference():
+    rng = np.random.default_rng(0)
+    block = make_block(rng)
+    
+    cleaned, outlier_counts, _ = remove_prediction_outliers(block, threshold=3.0)
+    
+    assert outlier_counts[0, 2] >= 1
+    for b in range(block.shape[0]):
+        assert np.array_equal(cleaned[b], reference_remove_outliers(block[b]))
+
+
+@pytest.mark.parametrize("method", ["minmax", "robust", "zscore"])
+def test_context_scaling_matches_reference(method):
+    rng = np.random.default_rng(1)
+    block = make_block(rng, steps=57)
+    context = (rng.standard_normal((block.shape[0], 240, 6)) * 2).astype(np.float32)
+    
+    scaled, _ = scale_predictions_to_context(block, context, method=method)
+    
+    for b in range(block.shape[0]):
+        expected = reference_scale_to_context(block[b], context[b], method)
+        assert scaled.dtype == expected.dtype
+        assert np.array_equal(scaled[b], expected)
+
+
+def test_exceedance_matches_reference():
+    rng = np.random.default_rng(2)
+    centre = np.array([3.0, 40.0, 40.0, -1.5, -1.5, 10.5])
+    block = centre + rng.standard_normal((8, 60, 6)) * np.array([0.6, 6.0, 6.0, 2.0, 2.0, 2.0])
+    
+    counts, percentages = calculate_exceedance(block)
+    
+    for b in range(block.shape[0]):
+        expected_counts, expected_percentages = reference_exceedance(block[b])
+        assert np.array_equal(counts[b], expected_counts)
+        assert np.array_equal(percentages[b], expected_percentages)
+
+
+def test_single_window_shapes():
+    rng = np.random.default_rng(3)
+    forecast = make_block(rng, batch=3)[0]
+    
+    cleaned, outlier_counts, std_ok = remove_prediction_outliers(forecast)
+    scaled, stats = scale_predictions_to_context(forecast, forecast, method='minmax')
+    
+    assert cleaned.shape == forecast.shape and outlier_counts.shape == (6,) and std_ok.shape == (6,)
+    assert scaled.shape == forecast.shape and stats["ctx_low"].shape == (6,)
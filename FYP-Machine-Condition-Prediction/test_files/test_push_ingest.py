@@ -0,0 +1,137 @@
+# test_files/test_push_ingest.py
+
+# Run with: python -m pytest test_files/test_push_ingest.py
+
+import asyncio
+import importlib
+import numpy as np
+import pytest
+from services.push_ingest import parse_line_protocol, parse_json_readings, to_line_protocol, PushFormatError
+from services.sensor_window import SensorWindow
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.fake_influx import FakeInfluxClient
+from test_files.test_startup import STARTUP_ENV
+
+LINES = (
+    "machine_metrics,machine_id=m\\ 1 current=2.5,tempA=35.25,tempB=34.5,accX=-0.5,accY=0.25,accZ=9.75 1735689610\n"
+    "machine_metrics,machine_id=m\\ 1 current=2.0,tempA=35,tempB=34,accX=-1,accY=0,accZ=10i 1735689600\n"
+    "other_measurement,machine_id=m2 current=1 1735689600\n"
+    "machine_metrics,machine_id=m2,site=a tempA=30.5 1735689600\n"
+)
+
+
+def test_line_protocol_and_json_parse_to_the_same_windows():
+    from_lines = parse_line_protocol(LINES, precision="s")
+    from_json = parse_json_readings({
+        "m 1": [
+            {"timestamp": "2025-01-01T00:00:10+00:00", "current": 2.5, "tempA": 35.25, "tempB": 34.5,
+             "accX": -0.5, "accY": 0.25, "accZ": 9.75},
+            {"timestamp": 1735689600000, "current": 2.0, "tempA": 35, "tempB": 34, "accX": -1, "accY": 0, "accZ": 10},
+        ],
+    }, precision="ms")
+    flat = parse_json_readings([{"machine_id": "m2", "timestamp": 1735689600, "tempA": 30.5}], precision="s")
+    
+    assert set(from_lines) == {"m 1", "m2"}
+    for parsed in (from_lines["m 1"], from_json["m 1"]):
+        assert parsed.timestamps.tolist() == [1735689600 * 10**9, 1735689610 * 10**9]  # sorted by time
+        assert parsed.values[0].tolist() == [2.0, 35.0, 34.0, -1.0, 0.0, 10.0]
+    np.testing.assert_array_equal(from_lines["m2"].values, flat["m2"].values)
+    
+    round_trip = parse_line_protocol(to_line_protocol(from_lines))
+    np.testing.assert_array_equal(round_trip["m 1"].values, from_lines["m 1"].values)
+    
+    with pytest.raises(PushFormatError, match="line 1"):
+        parse_line_protocol("machine_metrics current=1 1")
+    with pytest.raises(PushFormatError, match="precision"):
+        parse_json_readings([], precision="h")
+
+
+def test_repeated_timestamps_keep_the_last_reading_and_non_finite_values_are_missing():
+    lines = (
+        "machine_metrics,machine_id=m1 current=1,tempA=inf 10\n"
+        "machine_metrics,machine_id=m1 current=2,tempA=30 20\n"
+        "machine_metrics,machine_id=m1 current=3,tempA=31 10\n"  # resent reading for t=10
+    )
+    window = parse_line_protocol(lines, precision="s")["m1"]
+    readings = parse_json_readings([
+        {"machine_id": "m1", "timestamp": 10, "current": 1.0, "tempA": float("-inf")},
+        {"machine_id": "m1", "timestamp": 10, "current": 3.0, "tempA": float("nan"), "accX": 1e39},
+    ], precision="s")["m1"]
+    
+    assert window.timestamps.tolist() == [10 * 10**9, 20 * 10**9]
+    assert window.values[:, :2].tolist() == [[3.0, 31.0], [2.0, 30.0]]
+    assert len(readings) == 1 and readings.values[0, 0] == 3.0
+    assert np.isnan(readings.values[0, 1:]).all()  # NaN, and a value that overflows float32
+    
+    values = np.full((2, 6), np.inf, dtype=np.float32)
+    values[0, 0] = 2.5
+    lines = to_line_protocol({"m1": SensorWindow(np.array([1, 2]), values, "m1")}).splitlines()
+    assert lines == ["machine_metrics,machine_id=m1 current=2.5 1"]  # the all-infinite point is not written
+
+
+def make_streamer(monkeypatch, **kwargs):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    return ScheduledInfluxInference(ingestion_mode="push", machine_ids=["machine_1", "machine_2"], **kwargs)
+
+
+def test_push_mode_fills_buffers_without_polling(monkeypatch):
+    influx = FakeInfluxClient()
+    streamer = make_streamer(monkeypatch)
+    streamer.influx_client = influx
+    window = SensorWindow.from_points(generate_fake_sensor_window(250, machine_id="machine_1", seed=1))
+    
+    first = streamer.ingest_windows({"machine_1": window[:200], "machine_9": window[:5]})
+    second = streamer.ingest_windows({"machine_1": window[190:]})  # overlaps the first push by 10 points
+    for _ in range(3):
+        streamer._collect_once()
+    
+    assert first["accepted"] == 200 and first["unknown_machines"] == ["machine_9"]
+    assert second["accepted"] == 50 and second["duplicates"] == 10
+    np.testing.assert_array_equal(streamer._snapshot_buffer(240).values, window[-240:].values)
+    assert streamer._ready_machine_ids() == ["machine_1"]
+    assert influx.queries == []  # no InfluxDB reads in push mode
+    assert streamer.get_ingestion_stats()["points_pushed"] == 250
+    
+    held = streamer._snapshot_buffer()  # what an API thread serializes while new points arrive
+    later = SensorWindow.from_points(generate_fake_sensor_window(400, machine_id="machine_1", seed=2))
+    streamer.ingest_windows({"machine_1": SensorWindow(later.timestamps - later.timestamps[0] + window.latest_timestamp + 1,
+                                                       later.values, "machine_1")})
+    np.testing.assert_array_equal(held.values, window.values)
+
+
+def test_write_through_reaches_influx(monkeypatch):
+    influx = FakeInfluxClient()
+    streamer = make_streamer(monkeypatch, write_through=True)
+    streamer.async_influx_client = influx.as_async()
+    windows = parse_line_protocol(LINES.replace("m\\ 1", "machine_1"), precision="s")
+    
+    async def push():
+        result = streamer.ingest_windows(windows)
+        assert streamer.schedule_write_through(result["windows"])
+        await asyncio.gather(*streamer._write_tasks)
+    asyncio.run(push())
+    
+    assert len(influx.writes) == 1
+    assert [moment.timestamp() for moment, _ in influx.points["machine_1"]] == [1735689600, 1735689610]
+    assert streamer.get_ingestion_stats()["write_through_points"] == 2
+
+
+def test_ingest_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+    for key, value in {**STARTUP_ENV, "MACHINE_IDS": "machine_1", "INGESTION_MODE": "push"}.items():
+        monkeypatch.setenv(key, value)
+    app_module = importlib.import_module("app")
+    client = TestClient(app_module.app)  # no lifespan: the background tasks are not started
+    
+    response = client.post("/ingest?precision=s", content=LINES.replace("m\\ 1", "machine_1"),
+                           headers={"Content-Type": "text/plain"})
+    assert response.status_code == 200
+    assert response.json()["accepted"] == 2 and response.json()["unknown_machines"] == ["m2"]
+    
+    response = client.post("/ingest", json=[{"machine_id": "machine_1", "timestamp": "2025-01-01T00:00:20Z", "current": 3}])
+    assert response.json()["accepted"] == 1
+    assert app_module.streamer.get_latest_point()["current"] == 3.0
+    
+    assert client.post("/ingest", content="garbage", headers={"Content-Type": "text/plain"}).status_code == 400
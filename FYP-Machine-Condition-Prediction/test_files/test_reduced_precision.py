@@ -0,0 +1,63 @@
+# test_files/test_reduced_precision.py
+
+# Run with: python -m pytest test_files/test_reduced_precision.py
+
+import numpy as np
+import pytest
+from services.inference_service_3 import InferenceService
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+# Bounds against fp32, in scaled units after _scale_predictions_to_context / percent of horizon
+FINAL_PREDICTION_ATOL = 0.1
+ANOMALY_SCORE_ATOL = 5.0
+
+
+def _windows():
+    """Mix of normal windows and windows pushed over the current/tempA limits."""
+    windows = []
+    for i in range(12):
+        window = generate_fake_sensor_window(240, machine_id=f"machine_{i}", seed=i)
+        for k, point in enumerate(window[-60:]):
+            point["tempA"] += (i % 4) * 4.0 + k * 0.05
+            point["current"] += (i % 3) * 0.8
+        windows.append(window)
+    return windows
+
+
+@pytest.fixture(scope="module")
+def base_dir(tmp_path_factory):
+    return build_tiny_artifacts(str(tmp_path_factory.mktemp("artifacts")))
+
+
+@pytest.fixture(scope="module")
+def fp32_outputs(base_dir):
+    return InferenceService(base_dir=base_dir).run_inference_batch(_windows())
+
+
+@pytest.mark.parametrize("precision", ["int8", "bf16"])
+def test_reduced_precision_matches_fp32(base_dir, fp32_outputs, precision):
+    service = InferenceService(base_dir=base_dir, precision=precision)
+    assert service.precision == precision
+    
+    outputs = service.run_inference_batch(_windows())
+    
+    assert any(alerts["critical_features"] for _, alerts in fp32_outputs)
+    for (results, alerts), (expected, expected_alerts) in zip(outputs, fp32_outputs):
+        np.testing.assert_allclose(
+            results["final_predictions"], expected["final_predictions"], atol=FINAL_PREDICTION_ATOL
+        )
+        for feature, score in alerts["anomaly_scores"].items():
+            assert abs(score - expected_alerts["anomaly_scores"][feature]) <= ANOMALY_SCORE_ATOL
+        assert alerts["critical_features"] == expected_alerts["critical_features"]
+        assert alerts["status"] == expected_alerts["status"]
+
+
+def test_reduced_precision_uses_eager_engine(base_dir):
+    service = InferenceService(base_dir=base_dir, engine="torchscript", precision="int8")
+    assert service.engine.name == "eager"
+
+
+def test_unknown_precision_rejected(base_dir):
+    with pytest.raises(ValueError):
+        InferenceService(base_dir=base_dir, precision="fp16")
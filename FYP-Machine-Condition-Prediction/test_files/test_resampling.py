@@ -0,0 +1,86 @@
+# test_files/test_resampling.py
+
+# Run with: python -m pytest test_files/test_resampling.py
+
+import numpy as np
+import pytest
+from services.resampling import resample_to_grid
+from services.sensor_window import SensorWindow
+from test_files.fake_influx import FakeInfluxClient
+from test_files.test_startup import STARTUP_ENV
+
+NS = 1_000_000_000
+
+
+def make_window(seconds, values=None):
+    seconds = np.asarray(seconds, dtype=np.float64)
+    if values is None:
+        values = np.repeat(seconds[:, None], 6, axis=1)  # every field equals the reading time
+    return SensorWindow((seconds * NS).astype(np.int64), values, "machine_1")
+
+
+def test_jittered_points_land_on_the_grid():
+    rng = np.random.default_rng(0)
+    seconds = np.arange(1000, 1300, 10) + rng.uniform(-3, 3, 30)
+    
+    resampled = resample_to_grid(make_window(seconds), 10, 25, max_gap_seconds=60)
+    
+    assert resampled.coverage == 1.0 and not resampled.masked.any()
+    assert resampled.window.timestamps[-1] == 1290 * NS
+    assert np.diff(resampled.window.timestamps).tolist() == [10 * NS] * 24
+    np.testing.assert_allclose(resampled.window.values[:, 0], seconds[-25:], rtol=1e-6)
+
+
+def test_short_gaps_interpolated_long_gaps_masked():
+    seconds = [0, 10, 20, 49, 50, 60] + list(range(200, 260, 10))  # 20 s gap, then a 130 s outage
+    values = np.repeat(np.asarray(seconds, dtype=np.float32)[:, None], 6, axis=1)
+    values[1, 2] = np.nan  # one missing field
+    window = make_window(seconds, values)  # 49 s and 50 s share a slot: the newer reading wins
+    
+    resampled = resample_to_grid(window, 10, 26, max_gap_seconds=60)
+    values = resampled.window.values
+    
+    assert resampled.window.timestamps[0] == 0 and resampled.window.timestamps[-1] == 250 * NS
+    assert values[3:5, 0].tolist() == [30, 40]  # interpolated
+    assert values[1, 2] == 10  # missing field interpolated from its neighbours
+    assert values[5, 0] == 50
+    assert np.isnan(values[7:20]).all() and resampled.masked.sum() == 13
+    report = resampled.report(10)
+    assert report == {"coverage": round(11 / 26, 4), "observed": 11, "interpolated": 2,
+                      "masked": 13, "longest_gap_seconds": 130.0}
+    
+    filled = resampled.filled()
+    assert not np.isnan(filled.values).any()
+    np.testing.assert_allclose(filled.values[:, 1], np.arange(0, 260, 10))
+    assert np.isnan(resampled.window.values[10, 0])  # filled() does not modify the grid window
+
+
+def test_empty_window_has_no_coverage():
+    resampled = resample_to_grid(SensorWindow.empty("machine_1"), 10, 5, max_gap_seconds=60)
+    assert resampled.coverage == 0.0 and resampled.masked.all()
+
+
+def test_streamer_skips_low_coverage_windows_after_an_outage(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    influx = FakeInfluxClient()
+    streamer = ScheduledInfluxInference(data_collection_interval_seconds=10, ingestion_mode="delta",
+                                        machine_ids=["machine_1", "machine_2"])
+    streamer.influx_client = influx
+    influx.advance(["machine_1", "machine_2"], 300)
+    streamer._collect_once()
+    
+    influx.advance(["machine_1"], 60)  # machine_2 is offline for 10 minutes
+    influx.advance(["machine_1", "machine_2"], 20)
+    streamer._collect_once()
+    
+    windows = streamer._inference_windows(["machine_1", "machine_2"])
+    
+    assert [window.machine_id for window in windows] == ["machine_1"]
+    assert len(windows[0]) == streamer.context_length and not np.isnan(windows[0].values).any()
+    machine_2 = streamer.machines["machine_2"]
+    assert machine_2.skipped_inferences == 1
+    assert machine_2.coverage["coverage"] == pytest.approx(1 - 60 / 240, abs=1e-3)
+    assert machine_2.coverage["masked"] == 60 and machine_2.coverage["longest_gap_seconds"] == 600.0
+    assert streamer.machines["machine_1"].coverage["coverage"] == 1.0
@@ -0,0 +1,99 @@
+# test_files/test_response_formats.py
+
+# Run with: python -m pytest test_files/test_response_formats.py
+
+import importlib
+import json
+import numpy as np
+import pytest
+from services import response_formats
+from services.response_formats import Columns, UnsupportedFormatError, negotiate, encode
+from services.sensor_window import SensorWindow, FEATURE_NAMES
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.test_startup import STARTUP_ENV
+
+
+def lookback_window():
+    window = SensorWindow.from_points(generate_fake_sensor_window(240, machine_id="machine_1", seed=3))
+    values = window.values.copy()
+    values[5, 1] = np.nan  # missing reading
+    return SensorWindow(window.timestamps, values, "machine_1")
+
+
+def test_negotiation():
+    assert negotiate() == "json" and negotiate("Columnar") == "columnar"
+    assert negotiate(accept="application/x-msgpack;q=0.9, */*") == "msgpack"
+    assert negotiate("json", accept="application/vnd.apache.arrow.stream") == "json"  # ?format= wins
+    with pytest.raises(UnsupportedFormatError):
+        negotiate("csv")
+
+
+def test_columnar_json_matches_the_row_form():
+    window = lookback_window()
+    rows = window.to_points()
+    
+    columns = json.loads(encode({"data": Columns.from_matrix(window.values, FEATURE_NAMES, window.timestamps)}, "columnar"))["data"]
+    
+    assert list(columns) == ["timestamp", *FEATURE_NAMES]
+    assert columns["timestamp"] == [row["timestamp"] for row in rows]
+    for name in FEATURE_NAMES:
+        assert columns[name] == pytest.approx([row[name] for row in rows], nan_ok=True)
+    assert columns["tempA"][5] is None
+
+
+def test_binary_formats_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    pyarrow = pytest.importorskip("pyarrow")
+    window = lookback_window()
+    document = {"status": "success", "alerts": {"score": np.float32(0.5)},
+                "data": Columns.from_matrix(window.values, FEATURE_NAMES, window.timestamps)}
+    
+    unpacked = msgpack.unpackb(encode(document, "msgpack"))
+    assert unpacked["alerts"] == {"score": 0.5} and unpacked["data"]["tempA"][5] is None
+    np.testing.assert_array_equal(np.array(unpacked["data"]["accZ"], dtype=np.float32), window.values[:, 5])
+    
+    table = pyarrow.ipc.open_stream(encode(document, "arrow")).read_all()
+    assert table.column_names == ["timestamp", *FEATURE_NAMES] and table.num_rows == 240
+    np.testing.assert_array_equal(table["timestamp"].to_numpy().view(np.int64), window.timestamps)
+    assert table["tempA"].null_count == 1 and table["current"].type == pyarrow.float32()
+    assert json.loads(table.schema.metadata[b"response"]) == {"status": "success", "alerts": {"score": 0.5}, "data": None}
+
+
+def test_missing_optional_package_is_reported(monkeypatch):
+    monkeypatch.setattr(response_formats, "pyarrow", None)
+    with pytest.raises(UnsupportedFormatError, match="pyarrow"):
+        negotiate("arrow")
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    for key, value in {**STARTUP_ENV, "MACHINE_IDS": "machine_1"}.items():
+        monkeypatch.setenv(key, value)
+    return importlib.import_module("app")
+
+
+def test_endpoints_negotiate_formats(app_module):
+    from fastapi.testclient import TestClient
+    client = TestClient(app_module.app)  # no lifespan: the background tasks are not started
+    streamer = app_module.streamer
+    streamer.last_lookback = lookback_window()
+    streamer.previous_scaled_forecast = np.arange(360, dtype=np.float32).reshape(60, 6)
+    streamer.inference_version += 1
+    
+    rows = client.get("/sensor/last-lookback")
+    columnar = client.get("/sensor/last-lookback?format=columnar")
+    assert rows.headers["etag"] != columnar.headers["etag"] and len(columnar.content) < len(rows.content) / 2
+    assert np.float32(columnar.json()["data"]["current"][0]) == np.float32(rows.json()["data"][0]["current"])
+    assert client.get("/sensor/last-lookback?format=columnar",
+                      headers={"If-None-Match": columnar.headers["etag"]}).status_code == 304
+    
+    forecast = client.get("/inference/previous-forecast?format=columnar").json()["previous_forecast"]
+    assert forecast["index"][:2] == [0, 1] and forecast["current"][1] == 6.0
+    
+    if response_formats.msgpack is not None:
+        packed = client.get("/sensor/last-lookback", headers={"Accept": "application/msgpack"})
+        assert packed.headers["content-type"] == "application/msgpack"
+        assert response_formats.msgpack.unpackb(packed.content)["points_collected"] == 240
+    
+    unknown = client.get("/sensor/last-lookback?format=xml")
+    assert unknown.status_code == 406 and "xml" in unknown.json()["message"]
@@ -0,0 +1,82 @@
+# test_files/test_result_cache.py
+
+# Run with: python -m pytest test_files/test_result_cache.py
+
+import time
+import numpy as np
+import pytest
+from services.inference_service_3 import InferenceService
+from services.result_cache import InferenceResultCache
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+@pytest.fixture(scope="module")
+def base_dir(tmp_path_factory):
+    return build_tiny_artifacts(str(tmp_path_factory.mktemp("artifacts")))
+
+
+def test_repeated_window_is_served_from_cache(base_dir):
+    service = InferenceService(base_dir=base_dir)
+    window = generate_fake_sensor_window(240, seed=0)
+    
+    results, alerts = service.run_inference(window)
+    time.sleep(0.01)
+    cached_results, cached_alerts = service.run_inference(window)
+    
+    assert service.cache_stats()["hits"] == 1 and service.cache_stats()["misses"] == 1
+    assert cached_alerts["timestamp"] > alerts["timestamp"]  # stamped by the hit, not the original run
+    assert {**cached_alerts, "timestamp": None} == {**alerts, "timestamp": None}
+    assert service.run_inference(window)[1] is not cached_alerts
+    for key in results:
+        np.testing.assert_array_equal(cached_results[key], results[key])
+    
+    results["final_predictions"][:] = 0  # the caller's arrays are not the cached ones
+    with pytest.raises(ValueError):
+        cached_results["final_predictions"][0, 0] = 1.0  # hits share read-only arrays
+    np.testing.assert_array_equal(service.run_inference(window)[0]["final_predictions"], cached_results["final_predictions"])
+    assert cached_results["final_predictions"].any()
+
+
+def test_changed_window_misses_cache(base_dir):
+    service = InferenceService(base_dir=base_dir)
+    window = generate_fake_sensor_window(240, seed=0)
+    service.run_inference(window)
+    
+    shifted = [dict(point) for point in window]
+    shifted[-1]["tempA"] += 0.5
+    service.run_inference(shifted)
+    
+    assert service.cache_stats()["hits"] == 0 and service.cache_stats()["misses"] == 2
+
+
+def test_batch_mixes_cached_and_new_windows(base_dir):
+    service = InferenceService(base_dir=base_dir)
+    windows = [generate_fake_sensor_window(240, machine_id=f"machine_{i}", seed=i) for i in range(3)]
+    expected = service.run_inference_batch(windows)
+    
+    new_window = generate_fake_sensor_window(240, machine_id="machine_new", seed=10)
+    outputs = service.run_inference_batch(windows + [new_window])
+    
+    assert service.cache_stats()["hits"] == 3
+    for (results, alerts), (expected_results, expected_alerts) in zip(outputs, expected):
+        assert {**alerts, "timestamp": None} == {**expected_alerts, "timestamp": None}
+        np.testing.assert_array_equal(results["final_predictions"], expected_results["final_predictions"])
+    assert outputs[3][1]["machine_id"] == "machine_new"
+
+
+def test_cache_disabled_in_causal_mode(base_dir):
+    assert InferenceService(base_dir=base_dir, smoothing_mode="causal").cache_stats() is None
+    assert InferenceService(base_dir=base_dir, cache_size=0).cache_stats() is None
+
+
+def test_lru_eviction():
+    cache = InferenceResultCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, {"k": key}, {"status": "normal"})
+    cache.get("a")  # "b" becomes least recently used
+    cache.put("c", {"k": "c"}, {"status": "normal"})
+    
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == {"k": "a"}
+    assert cache.stats()["evictions"] == 1
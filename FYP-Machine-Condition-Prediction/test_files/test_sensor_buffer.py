@@ -0,0 +1,57 @@
+# test_files/test_sensor_buffer.py
+
+# Run with: python -m pytest test_files/test_sensor_buffer.py
+
+import numpy as np
+from services.sensor_buffer import SensorRingBuffer
+from services.sensor_window import SensorWindow
+
+
+def make_window(start, count, machine_id="machine_1"):
+    timestamps = np.arange(start, start + count, dtype=np.int64) * 10_000_000_000
+    values = np.arange(start * 6, (start + count) * 6, dtype=np.float32).reshape(count, 6)
+    return SensorWindow(timestamps, values, machine_id)
+
+
+def test_windows_are_contiguous_views_across_wraparound():
+    buffer = SensorRingBuffer(capacity=8)
+    reference = make_window(0, 30)
+
+    for i in range(30):
+        buffer.append(reference.timestamps[i], reference.values[i])
+        window = buffer.window(5)
+        expected = reference[max(0, i - 4):i + 1]
+        np.testing.assert_array_equal(window.timestamps, expected.timestamps)
+        np.testing.assert_array_equal(window.values, expected.values)
+        assert window.values.flags["C_CONTIGUOUS"]
+        assert np.shares_memory(window.values, buffer._values)  # no copy
+
+    assert len(buffer) == 8 and buffer.total_appended == 30
+    assert buffer.latest_timestamp == int(reference.timestamps[-1])
+
+
+def test_extend_matches_single_appends_and_keeps_newest():
+    single, batched = SensorRingBuffer(capacity=10), SensorRingBuffer(capacity=10)
+    reference = make_window(0, 37)
+    for i in range(37):
+        single.append(reference.timestamps[i], reference.values[i])
+    for start, stop in ((0, 3), (3, 20), (20, 21), (21, 37)):
+        batched.extend(reference[start:stop])
+
+    np.testing.assert_array_equal(batched.window().values, single.window().values)
+    np.testing.assert_array_equal(batched.window().timestamps, reference.timestamps[-10:])
+
+
+def test_reset_uses_fresh_storage_and_view_survives_appends():
+    buffer = SensorRingBuffer(capacity=12)
+    buffer.extend(make_window(0, 12))
+    view = buffer.window(8)
+    held = view.values.copy()
+
+    buffer.extend(make_window(12, 4))  # capacity - n appends leave the view untouched
+    np.testing.assert_array_equal(view.values, held)
+
+    buffer.reset(make_window(100, 5))
+    np.testing.assert_array_equal(view.values, held)
+    assert len(buffer) == 5 and buffer.window().timestamps[0] == 100 * 10_000_000_000
+    assert buffer.nbytes == 2 * 12 * (8 + 6 * 4)
@@ -0,0 +1,69 @@
+# test_files/test_sensor_window.py
+
+# Run with: python -m pytest test_files/test_sensor_window.py
+
+import numpy as np
+import pytest
+from services.flux_csv import read_columns, FluxQueryError
+from services.sensor_window import SensorWindow, FEATURE_NAMES, datetime_to_epoch_ns
+from services.inference_service_3 import InferenceService
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.fake_influx import FakeInfluxClient, parse_annotated_csv, parse_rfc3339
+from test_files.model_fixtures import build_tiny_artifacts
+
+
+def test_read_columns_matches_row_parser():
+    influx = FakeInfluxClient()
+    influx.advance(["machine_1"], 50)
+    text = influx.render('range(start: -60m) r["machine_id"] == "machine_1" tail(n: 40)')
+
+    timestamps, values = read_columns(text, FEATURE_NAMES)
+    rows = parse_annotated_csv(text)
+
+    assert timestamps.dtype == np.int64 and values.dtype == np.float32
+    assert values.shape == (40, 6)
+    assert timestamps.tolist() == [datetime_to_epoch_ns(parse_rfc3339(row["_time"])) for row in rows]
+    expected = np.array([[float(row[name]) for name in FEATURE_NAMES] for row in rows], dtype=np.float32)
+    np.testing.assert_array_equal(values, expected)
+
+
+def test_read_columns_nanoseconds_missing_values_and_errors():
+    text = (
+        "#datatype,string,long,dateTime:RFC3339,double\r\n"
+        ",result,table,_time,current\r\n"
+        ",,0,2025-01-01T00:00:00.123456789Z,2.5\r\n"
+        ",,0,2025-01-01T00:00:10Z,\r\n"
+    )
+    timestamps, values = read_columns(text, ("current", "tempA"))
+
+    assert timestamps[0] % 1_000_000_000 == 123456789
+    np.testing.assert_array_equal(values, [[2.5, np.nan], [np.nan, np.nan]])
+
+    with pytest.raises(FluxQueryError, match="bucket not found"):
+        read_columns(",error,reference\r\n,bucket not found,\r\n", FEATURE_NAMES)
+
+
+def test_window_round_trip_and_append():
+    points = generate_fake_sensor_window(30, machine_id="machine_7", seed=3)
+    window = SensorWindow.from_points(points)
+
+    assert window.to_points()[0]["timestamp"] == points[0]["timestamp"]
+    assert window[-1]["machine_id"] == "machine_7"
+    np.testing.assert_allclose([p["accZ"] for p in window.to_points()], [p["accZ"] for p in points], rtol=1e-6)
+
+    head, tail = window[:20], window[15:]
+    merged = head.append(tail.newer_than(head.latest_timestamp), max_size=25)
+    assert len(merged) == 25
+    np.testing.assert_array_equal(merged.timestamps, window.timestamps[-25:])
+
+
+def test_inference_on_window_matches_point_dicts(tmp_path):
+    service = InferenceService(base_dir=build_tiny_artifacts(str(tmp_path)), cache_size=0)
+    points = generate_fake_sensor_window(240, machine_id="machine_2", seed=5)
+
+    results, alerts = service.run_inference(points)
+    window_results, window_alerts = service.run_inference(SensorWindow.from_points(points))
+
+    np.testing.assert_allclose(window_results["final_predictions"], results["final_predictions"], rtol=1e-6)
+    assert window_alerts["machine_id"] == alerts["machine_id"] == "machine_2"
+    assert window_alerts["status"] == alerts["status"]
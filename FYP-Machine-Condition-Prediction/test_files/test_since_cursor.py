@@ -0,0 +1,79 @@
+# test_files/test_since_cursor.py
+
+# Run with: python -m pytest test_files/test_since_cursor.py
+
+import importlib
+import numpy as np
+import pytest
+from services.sensor_window import SensorWindow
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.test_startup import STARTUP_ENV
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    for key, value in {**STARTUP_ENV, "MACHINE_IDS": "machine_1", "INGESTION_MODE": "push"}.items():
+        monkeypatch.setenv(key, value)
+    return importlib.import_module("app")
+
+
+def test_lookback_since_returns_only_new_grid_points(app_module):
+    from fastapi.testclient import TestClient
+    client = TestClient(app_module.app)  # no lifespan: the background tasks are not started
+    streamer = app_module.streamer
+    points = SensorWindow.from_points(generate_fake_sensor_window(250, machine_id="machine_1", seed=6))
+    # two days later than the other tests' lookbacks: the app's streamer is shared, and a lookback
+    # that changed slots a client holds makes the next delta start at those slots
+    points = SensorWindow(points.timestamps + 2 * 86400 * 10**9, points.values, "machine_1")
+    streamer.last_lookback = points[:240]
+    streamer.inference_version += 1
+    
+    full = client.get("/sensor/last-lookback").json()
+    assert full["points_collected"] == 240
+    
+    streamer.last_lookback = points[10:]  # next inference cycle: the window slid by 10 grid slots
+    streamer.inference_version += 1
+    delta = client.get(f"/sensor/last-lookback?since={full['seq']}").json()
+    assert delta["resync"] is False and delta["points_collected"] == 10
+    assert delta["data"] == points[240:].to_points() and delta["seq"] == full["seq"] + 10
+    
+    by_time = client.get("/sensor/last-lookback", params={"since": full["data"][-1]["timestamp"], "format": "columnar"}).json()
+    assert by_time["points_collected"] == 10 and len(by_time["data"]["current"]) == 10
+    
+    stale = client.get(f"/sensor/last-lookback?since={full['seq'] - 235}").json()
+    assert stale["resync"] is True and stale["points_collected"] == 240
+    assert client.get("/sensor/last-lookback?since=yesterday").status_code == 400
+
+
+def merge(held, delta):
+    """What the dashboard does with a delta: replace the held points from its first timestamp on."""
+    if not delta:
+        return held
+    return ([point for point in held if point["timestamp"] < delta[0]["timestamp"]] + delta)[-len(held):]
+
+
+def test_incremental_lookback_matches_full_after_a_late_point_fills_a_gap(app_module):
+    from fastapi.testclient import TestClient
+    client = TestClient(app_module.app)
+    streamer = app_module.streamer
+    points = SensorWindow.from_points(generate_fake_sensor_window(260, machine_id="machine_1", seed=7))
+    # later than the other tests' lookbacks (see above)
+    points = SensorWindow(points.timestamps + 3 * 86400 * 10**9, points.values, "machine_1")
+    gapped = points.values.copy()
+    gapped[230:233] = np.nan  # masked slots: their readings arrive late
+    streamer.last_lookback = SensorWindow(points.timestamps[:240], gapped[:240], "machine_1")
+    streamer.inference_version += 1
+    held = client.get("/sensor/last-lookback").json()
+    
+    streamer.last_lookback = points[10:250]  # next cycle: 10 new slots, and the gap is now observed
+    streamer.inference_version += 1
+    delta = client.get(f"/sensor/last-lookback?since={held['seq']}").json()
+    full = client.get("/sensor/last-lookback").json()
+    
+    assert delta["resync"] is False and delta["points_collected"] == 20  # from the first changed slot
+    assert merge(held["data"], delta["data"]) == full["data"]
+    
+    streamer.last_lookback = points[20:260]
+    streamer.inference_version += 1
+    again = client.get(f"/sensor/last-lookback?since={delta['seq']}").json()
+    assert again["points_collected"] == 10  # a client that already had the fix only gets new slots
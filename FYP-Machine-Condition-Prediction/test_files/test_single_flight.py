@@ -0,0 +1,109 @@
+# test_files/test_single_flight.py
+
+# Run with: python -m pytest test_files/test_single_flight.py
+
+import asyncio
+import threading
+import time
+import pytest
+from services.single_flight import SingleFlight
+from test_files.fake_influx import FakeInfluxClient
+from test_files.test_startup import STARTUP_ENV
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flights = SingleFlight(ttl_seconds=0)
+    calls, results = [], []
+    release = threading.Event()
+    
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"rows": 240}
+    threads = [threading.Thread(target=lambda: results.append(flights.do("query", fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1 and len(results) == 8
+    assert all(result is results[0] for result in results)
+    assert flights.stats()["shared_in_flight"] == 7
+
+
+def test_ttl_reuse_is_per_consumer_and_errors_are_not_cached():
+    clock = FakeClock()
+    flights = SingleFlight(ttl_seconds=2, clock=clock)
+    counter = iter(range(100))
+    
+    first = flights.do("query", lambda: next(counter), consumer="prefill")
+    assert flights.do("query", lambda: next(counter), consumer="collection") == first  # reused
+    assert flights.do("query", lambda: next(counter), consumer="collection") != first  # never its own stale copy
+    clock.now = 2.5
+    assert flights.do("query", lambda: next(counter), consumer="inference") == 2  # expired
+    
+    def fail():
+        raise ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        flights.do("other", fail, consumer="prefill")
+    assert flights.do("other", lambda: "ok", consumer="collection") == "ok"
+    assert flights.stats()["executions"] == 5 and flights.stats()["ttl_hits"] == 1
+
+
+def test_restart_backfills_share_one_query(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    machine_ids = [f"machine_{i}" for i in range(50)]
+    influx = FakeInfluxClient()
+    influx.advance(machine_ids, 240)
+    streamer = ScheduledInfluxInference(ingestion_mode="delta", machine_ids=machine_ids)
+    streamer.async_influx_client = influx.as_async()
+    
+    async def restart():
+        return await asyncio.gather(*[streamer._query_last_n_points_async(240, consumer)
+                                      for consumer in ("prefill", "collection", "inference")])
+    prefill, collection, inference = asyncio.run(restart())
+    
+    assert len(influx.queries) == 1
+    assert prefill is collection is inference and len(prefill) == 50
+    stats = streamer.get_ingestion_stats()
+    assert stats["queries"] == 1 and stats["single_flight"]["shared_in_flight"] == 2
+    
+    streamer.influx_client = influx
+    streamer._prefill_buffers(streamer._query_last_n_points(240, "prefill"))  # already had that result: queries again
+    streamer._apply_inference_backfill(streamer._query_last_n_points(240, "inference"))  # within the TTL: reused
+    assert len(influx.queries) == 2 and streamer.get_ingestion_stats()["single_flight"]["ttl_hits"] == 1
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    flights = SingleFlight(ttl_seconds=0)
+    started = []
+    
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return len(started)
+    
+    async def scenario():
+        leader = asyncio.create_task(flights.do_async("query", fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(flights.do_async("query", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+    
+    assert asyncio.run(scenario()) == [2, 2]  # one waiter re-ran the query, the other shared it
+    assert flights.stats()["executions"] == 2
@@ -0,0 +1,65 @@
+# test_files/test_snapshot_cache.py
+
+# Run with: python -m pytest test_files/test_snapshot_cache.py
+
+import importlib
+import json
+import numpy as np
+import pytest
+from services.sensor_window import SensorWindow
+from services.snapshot_cache import SnapshotCache, etag_matches
+from fake_data.sensor_windows import generate_fake_sensor_window
+from test_files.test_startup import STARTUP_ENV
+
+
+def test_renders_once_per_version():
+    cache, renders = SnapshotCache(), []
+    
+    def render():
+        renders.append(1)
+        return {"value": np.float64(len(renders))}
+    first = cache.get("endpoint", 1, render)
+    again = cache.get("endpoint", 1, render)
+    changed = cache.get("endpoint", 2, render)
+    
+    assert first is again and len(renders) == 2
+    assert json.loads(first.body) == {"value": 1.0} and changed.etag != first.etag
+    assert etag_matches(f'W/{first.etag}, "other"', first.etag) and etag_matches("*", first.etag)
+    assert not etag_matches(changed.etag, first.etag) and not etag_matches(None, first.etag)
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    for key, value in {**STARTUP_ENV, "MACHINE_IDS": "machine_1"}.items():
+        monkeypatch.setenv(key, value)
+    return importlib.import_module("app")
+
+
+def test_endpoints_serve_snapshots_with_etag_revalidation(app_module):
+    from fastapi.testclient import TestClient
+    client = TestClient(app_module.app)  # no lifespan: the background tasks are not started
+    streamer = app_module.streamer
+    streamer.last_lookback = SensorWindow.from_points(generate_fake_sensor_window(240, machine_id="machine_1", seed=2))
+    streamer.previous_scaled_forecast = np.arange(360, dtype=np.float32).reshape(60, 6)
+    streamer.inference_version += 1
+    renders_before = app_module.snapshots.renders
+    
+    first = client.get("/sensor/last-lookback")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["points_collected"] == 240
+    for _ in range(5):
+        revalidated = client.get("/sensor/last-lookback", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304 and revalidated.content == b"" and revalidated.headers["etag"] == etag
+    assert client.get("/sensor/last-lookback").content == first.content
+    
+    forecast = client.get("/inference/previous-forecast").json()
+    assert forecast["previous_forecast"][1]["current"] == 6.0
+    assert app_module.snapshots.renders - renders_before == 2
+    
+    streamer.previous_scaled_forecast = streamer.previous_scaled_forecast + 1
+    streamer.inference_version += 1  # next inference cycle invalidates the snapshots
+    refreshed = client.get("/inference/previous-forecast", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.json()["previous_forecast"][1]["current"] == 7.0
+    # Re-rendered for the new version, but the bytes (and so the ETag) are unchanged: still 304
+    assert client.get("/sensor/last-lookback", headers={"If-None-Match": etag}).status_code == 304
+    assert app_module.snapshots.renders - renders_before == 4
@@ -0,0 +1,65 @@
+# test_files/test_startup.py
+
+# Run with: python -m pytest test_files/test_startup.py
+
+import os
+import subprocess
+import sys
+import pytest
+from test_files.model_fixtures import build_tiny_artifacts
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Placeholder connection settings: nothing here connects at import/construction time
+STARTUP_ENV = {
+    "INFLUX_URL": "http://localhost:8086",
+    "INFLUX_TOKEN": "test-token",
+    "INFLUX_ORG": "test-org",
+    "INFLUX_BUCKET": "test-bucket",
+}
+
+HEAVY_MODULES = ("torch", "transformers", "matplotlib", "pymongo")
+
+
+@pytest.fixture
+def startup_env(monkeypatch):
+    for key, value in STARTUP_ENV.items():
+        monkeypatch.setenv(key, value)
+
+
+def test_app_import_defers_heavy_modules():
+    script = (
+        "import sys, app; "
+        f"print('loaded:', [m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={**os.environ, **STARTUP_ENV}, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "loaded: []"
+
+
+def test_model_loads_in_background_and_reports_ready(startup_env, tmp_path):
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    
+    streamer = ScheduledInfluxInference(base_dir=build_tiny_artifacts(str(tmp_path)))
+    assert streamer.get_readiness()["model"] == "loading"
+    assert streamer.inference_service is None
+    
+    assert streamer.load_model()
+    readiness = streamer.get_readiness()
+    assert readiness["ready"] and readiness["model"] == "ready"
+    assert readiness["warmup_ms"] is not None
+    assert streamer.get_inference_status()["model_ready"]
+
+
+def test_failed_model_load_is_reported(startup_env, tmp_path):
+    from services.real_influx_streamer_4 import ScheduledInfluxInference
+    
+    streamer = ScheduledInfluxInference(base_dir=str(tmp_path / "missing"))
+    
+    assert not streamer.load_model()
+    readiness = streamer.get_readiness()
+    assert not readiness["ready"] and readiness["model"] == "failed"
+    assert readiness["model_load_error"]
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { fetchInferenceStatus } from '../services/api';
+import { fetchInferenceStatus, isEventStreamOpen, subscribeToEvents } from '../services/api';
 
 const InferenceStatus = () => {
     const [status, setStatus] = useState(null);
@@ -21,9 +21,19 @@ const InferenceStatus = () => {
         };
 
         getStatus();
-        const intervalId = setInterval(getStatus, 10000); // Update every 10 seconds
+        // Refresh right after each inference (pushed over /events); while the stream is open the
+        // timer only refreshes the countdown every minute, otherwise every 10 seconds
+        const unsubscribe = subscribeToEvents('prediction', getStatus);
+        let ticks = 0;
+        const intervalId = setInterval(() => {
+            ticks += 1;
+            if (!isEventStreamOpen() || ticks % 6 === 0) getStatus();
+        }, 10000);
 
-        return () => clearInterval(intervalId);
+        return () => {
+            clearInterval(intervalId);
+            unsubscribe();
+        };
     }, []);
 
     if (loading) {
@@ -1,5 +1,5 @@
 import { useEffect, useState, useCallback } from 'react';
-import { fetchForecastData, fetchLastLookback, fetchPreviousForecast } from '../services/api';
+import { fetchForecastData, fetchLastLookback, fetchPreviousForecast, isEventStreamOpen, subscribeToEvents } from '../services/api';
 
 const useForecast = () => {
     const [lookbackData, setLookbackData] = useState([]);
@@ -39,10 +39,19 @@ const useForecast = () => {
 
     useEffect(() => {
         fetchData();
-        // Fetch every 30 seconds to get updated data
-        const intervalId = setInterval(fetchData, 30000);
+        // Refetch as soon as a new prediction is pushed over /events
+        const unsubscribePrediction = subscribeToEvents('prediction', fetchData);
+        const unsubscribeResync = subscribeToEvents('resync', fetchData);
+        // Fall back to polling every 30 seconds while the event stream is down
+        const intervalId = setInterval(() => {
+            if (!isEventStreamOpen()) fetchData();
+        }, 30000);
 
-        return () => clearInterval(intervalId);
+        return () => {
+            clearInterval(intervalId);
+            unsubscribePrediction();
+            unsubscribeResync();
+        };
     }, [fetchData]);
 
     return { 
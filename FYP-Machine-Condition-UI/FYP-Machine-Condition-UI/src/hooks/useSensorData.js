@@ -1,5 +1,7 @@
 import { useEffect, useState } from 'react';
-import { fetchSensorBuffer } from '../services/api';
+import { fetchSensorBuffer, isEventStreamOpen, subscribeToEvents } from '../services/api';
+
+const BUFFER_SIZE = 340; // matches the streamer's rolling buffer
 
 const useSensorData = () => {
     const [sensorData, setSensorData] = useState([]);
@@ -20,10 +22,29 @@ const useSensorData = () => {
             }
         };
 
+        // New points are pushed over /events and appended to the buffer (same machine only)
+        const appendPoints = ({ machine_id, points }) => {
+            setSensorData((previous) => {
+                if (previous.length > 0 && previous[previous.length - 1].machine_id !== machine_id) {
+                    return previous;
+                }
+                return [...previous, ...points].slice(-BUFFER_SIZE);
+            });
+        };
+
         fetchData();
-        const intervalId = setInterval(fetchData, 10000); // Fetch every 10 seconds
+        const unsubscribePoints = subscribeToEvents('points', appendPoints);
+        const unsubscribeResync = subscribeToEvents('resync', fetchData);
+        // Fall back to polling every 10 seconds while the event stream is down
+        const intervalId = setInterval(() => {
+            if (!isEventStreamOpen()) fetchData();
+        }, 10000);
 
-        return () => clearInterval(intervalId); // Cleanup on unmount
+        return () => { // Cleanup on unmount
+            clearInterval(intervalId);
+            unsubscribePoints();
+            unsubscribeResync();
+        };
     }, []);
 
     return { sensorData, loading, error };
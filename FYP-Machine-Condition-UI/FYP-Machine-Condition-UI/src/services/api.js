@@ -5,11 +5,28 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000
 // Feature names matching the backend (current, tempA, tempB, accX, accY, accZ)
 export const FEATURE_NAMES = ['current', 'tempA', 'tempB', 'accX', 'accY', 'accZ'];
 
+// Lookback held by the dashboard and its ?since= cursor: after the first load only the grid
+// points added or changed since the previous response are transferred (the full window again on resync)
+let lookbackCache = { seq: null, size: 0, points: [] };
+
+// A delta starts at the oldest changed slot: held points from there on are replaced, not kept
+const mergeLookback = (held, delta, size) => {
+    const first = Date.parse(delta[0].timestamp);
+    return [...held.filter((point) => Date.parse(point.timestamp) < first), ...delta].slice(-size);
+};
+
 // Fetch the last lookback window (240 points used for inference)
 export const fetchLastLookback = async () => {
     try {
-        const response = await axios.get(`${API_BASE_URL}/sensor/last-lookback`);
-        return response.data.data || [];
+        const params = lookbackCache.seq !== null ? { since: lookbackCache.seq } : {};
+        const response = await axios.get(`${API_BASE_URL}/sensor/last-lookback`, { params });
+        const { data = [], seq = null, resync = true } = response.data;
+        if (resync) {
+            lookbackCache = { seq, size: data.length, points: data };
+        } else if (data.length > 0) {
+            lookbackCache = { ...lookbackCache, seq, points: mergeLookback(lookbackCache.points, data, lookbackCache.size) };
+        }
+        return lookbackCache.points;
     } catch (error) {
         console.error("Error fetching last lookback:", error);
         throw error;
@@ -101,4 +118,38 @@ export const fetchPreviousForecast = async () => {
         console.error("Error fetching previous forecast:", error);
         return [];
     }
-};
\ No newline at end of file
+};
+
+// Server-sent events (GET /events): one EventSource shared by every hook, opened on the
+// first subscription and closed after the last one. Events: points, prediction, alert, resync.
+let eventSource = null;
+const eventListeners = new Map();
+
+export const isEventStreamOpen = () => eventSource !== null && eventSource.readyState === EventSource.OPEN;
+
+export const subscribeToEvents = (eventName, handler) => {
+    if (typeof EventSource === 'undefined') {
+        return () => {}; // no SSE support: the hooks keep polling
+    }
+    if (eventSource === null) {
+        eventSource = new EventSource(`${API_BASE_URL}/events`);
+    }
+    if (!eventListeners.has(eventName)) {
+        eventListeners.set(eventName, new Set());
+        eventSource.addEventListener(eventName, (message) => {
+            const data = JSON.parse(message.data);
+            eventListeners.get(eventName)?.forEach((listener) => listener(data));
+        });
+    }
+    eventListeners.get(eventName).add(handler);
+
+    return () => {
+        eventListeners.get(eventName)?.delete(handler);
+        const remaining = [...eventListeners.values()].reduce((count, listeners) => count + listeners.size, 0);
+        if (remaining === 0 && eventSource !== null) {
+            eventSource.close();
+            eventSource = null;
+            eventListeners.clear();
+        }
+    };
+};